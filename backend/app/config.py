@@ -14,8 +14,51 @@ class Settings(BaseSettings):
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
     DEFAULT_TEST_PASSWORD: str = 'faz o L'
+    # Processos do hashing de senhas em cada worker do uvicorn; 0 executa em threads.
+    HASH_PROCESSOS: int = 2
+    HASH_FILA_MAXIMA: int = 256
+    # Cache token -> usuário usado em get_current_usuario
+    CACHE_USUARIOS_TTL_SEGUNDOS: int = 60
+    CACHE_USUARIOS_TAMANHO: int = 1024
+    # Cache de Status e Laboratório: 'memoria' (por processo) ou 'redis'
+    CACHE_BACKEND: str = 'memoria'
+    CACHE_REDIS_URL: str = 'redis://localhost:6379/0'
+    CACHE_REFERENCIAS_TTL_SEGUNDOS: int = 300
+    CACHE_REFERENCIAS_TAMANHO: int = 1024
 
-    DATABASE_URL: str = 'sqlite://'
+    # Arquivo, não `sqlite://`: as engines síncrona e assíncrona abrem conexões
+    # próprias, e cada conexão a um SQLite em memória teria um banco diferente.
+    DATABASE_URL: str = 'sqlite:///gestao_labs.db'
+    # Pool de conexões (ignorado no SQLite)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SEGUNDOS: int = 30
+    DB_POOL_RECYCLE_SEGUNDOS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # PRAGMAs aplicados a cada conexão de um SQLite em arquivo
+    SQLITE_JOURNAL_MODE: str = 'WAL'
+    SQLITE_SYNCHRONOUS: str = 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
+    # Diagnóstico de consultas (app/database/instrumentacao.py)
+    SQL_LENTA_MS: float = 200
+    SQL_LOG_PARAMETROS: bool = True
+    SQL_N_MAIS_UM_REPETICOES: int = 10
+    # 'erro', 'avisar', 'amostrar' ou 'desligado'; vazio escolhe pelo LOCALHOST_ENV
+    SQL_N_MAIS_UM_MODO: str | None = None
+    SQL_AMOSTRAGEM: float = 0.01
+    # Cadastra os dados de exemplo quando a API inicia com o banco vazio
+    POPULAR_BANCO_VAZIO: bool = True
+    # Duração da reserva de relatos na fila de trabalho dos técnicos
+    RELATO_RESERVA_MINUTOS: int = 15
+    # Stream de eventos (SSE e WebSocket): eventos guardados por cliente antes de
+    # descartar os mais antigos, intervalo dos heartbeats e limite de conexões
+    EVENTOS_BUFFER: int = 256
+    EVENTOS_HEARTBEAT_SEGUNDOS: float = 15
+    EVENTOS_MAXIMO_ASSINATURAS: int = 1000
+    # Intervalo do recálculo em lote de `dias_desde_alteracao`; 0 desativa.
+    RECALCULO_DIAS_INTERVALO_SEGUNDOS: int = 0
     BIG_FILES_DIR: str | None = None
 
     LOCAL_AWS_SERVER_PUBLIC_KEY: str = 'mock_public_key'
@@ -29,3 +29,34 @@ class TipoSistemaOperacional(str, Enum):
     linux = "linux"
     windows = "windows"
 
+
+# Coleções com contador de versão (ETags das respostas)
+class Colecao(str, Enum):
+    computadores = "computadores"
+    laboratorios = "laboratorios"
+    alteracoes = "alteracoes"
+    relatos = "relatos"
+    usuarios = "usuarios"
+
+
+# Entidades cobertas pela busca textual (`GET /busca`)
+class TipoResultadoBusca(str, Enum):
+    computador = "computador"
+    laboratorio = "laboratorio"
+    relato = "relato"
+
+
+# Resultado de cada relato na auditoria em lote
+class ResultadoAuditoria(str, Enum):
+    auditado = "auditado"
+    nao_encontrado = "nao_encontrado"
+    ja_auditado = "ja_auditado"
+    reservado = "reservado"
+
+
+# Eventos publicados em `GET /eventos` (SSE) e `/eventos/ws`
+class TipoEvento(str, Enum):
+    computador_status = "computador.status"
+    alteracao_criada = "alteracao.criada"
+    relato_criado = "relato.criado"
+    relato_atualizado = "relato.atualizado"
@@ -0,0 +1,134 @@
+"""Esquema do banco antes do controle de versões, usado pela migração 1.
+
+As tabelas são uma cópia congelada dos modelos daquela época, independente de
+`app/database/models.py`: mudanças nos modelos não alteram o que a migração 1
+cria, e toda alteração de esquema entra como uma nova migração. Não edite.
+"""
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    Enum,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+)
+
+metadata = MetaData()
+
+status = Table(
+    "status",
+    metadata,
+    Column(
+        "nome",
+        Enum("disponivel", "em_manutencao", "reservado", "desativado", name="statuscomputador"),
+        nullable=False,
+    ),
+    Column("descricao", String, nullable=False),
+    Column("id", Integer, primary_key=True),
+)
+
+usuario = Table(
+    "usuario",
+    metadata,
+    Column("nome", String, nullable=False),
+    Column("email", String, nullable=False, unique=True, index=True),
+    Column("id", Integer, primary_key=True),
+    Column("senha_hash", String),
+)
+
+administrador = Table(
+    "administrador",
+    metadata,
+    Column("matricula", String, nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id"), nullable=False, index=True),
+)
+
+aluno = Table(
+    "aluno",
+    metadata,
+    Column("matricula", String, nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id"), nullable=False, index=True),
+)
+
+laboratorio = Table(
+    "laboratorio",
+    metadata,
+    Column("nome", String, nullable=False),
+    Column("local", String, nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("administrador_id", Integer, ForeignKey("administrador.id"), nullable=False, index=True),
+)
+
+professor = Table(
+    "professor",
+    metadata,
+    Column("matricula", String, nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id"), nullable=False, index=True),
+    Column("administrador_id", Integer, ForeignKey("administrador.id"), nullable=False, index=True),
+)
+
+tecnico = Table(
+    "tecnico",
+    metadata,
+    Column("matricula", String, nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id"), nullable=False, index=True),
+    Column("administrador_id", Integer, ForeignKey("administrador.id"), nullable=False, index=True),
+)
+
+computador = Table(
+    "computador",
+    metadata,
+    Column("patrimonio", String, nullable=False),
+    Column("hostname", String, nullable=False),
+    Column("marca", String, nullable=False),
+    Column("ano_aquisicao", Integer, nullable=False),
+    Column(
+        "sistema_operacional",
+        Enum("macos", "linux", "windows", name="tiposistemaoperacional"),
+        nullable=False,
+    ),
+    Column("data_ultima_alteracao", Date),
+    Column("dias_desde_alteracao", Integer, nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("status_id", Integer, ForeignKey("status.id")),
+    Column("laboratorio_id", Integer, ForeignKey("laboratorio.id")),
+    Column("tecnico_id", Integer, ForeignKey("tecnico.id")),
+)
+
+historico_alteracao = Table(
+    "historico_alteracao",
+    metadata,
+    Column(
+        "tipo_alteracao",
+        Enum("cadastro", "manutencao", "alteracao", "exclusao", name="tipoalteracao"),
+        nullable=False,
+    ),
+    Column("data_alteracao", Date, nullable=False),
+    Column("observacao", String),
+    Column("id", Integer, primary_key=True),
+    Column("computador_id", Integer, ForeignKey("computador.id")),
+    Column("tecnico_id", Integer, ForeignKey("tecnico.id")),
+    Column("status_id", Integer, ForeignKey("status.id")),
+)
+
+relato_problema = Table(
+    "relato_problema",
+    metadata,
+    Column("data_relato", Date, nullable=False),
+    Column("descricao", String),
+    Column("computador_patrimonio", String),
+    Column("id", Integer, primary_key=True),
+    Column("computador_id", Integer, ForeignKey("computador.id")),
+    Column("usuario_id", Integer, ForeignKey("usuario.id")),
+    Column("tecnico_id", Integer, ForeignKey("tecnico.id")),
+    Column("auditada", Boolean, nullable=False),
+    Column("data_auditada", Date),
+    Column("aceita", Boolean),
+)
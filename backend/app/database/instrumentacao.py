@@ -0,0 +1,162 @@
+"""Instrumentação das consultas SQL: métricas por requisição, log de consultas
+lentas e detector de N+1.
+
+`instrumentar` é chamada por `get_engine`/`get_async_engine`, o único lugar
+que registra eventos nas engines da aplicação, e mede todo comando enviado ao
+banco:
+
+- dentro de uma requisição (`rastrear_consultas`, aberto pelo middleware de
+  métricas), o número de comandos e o tempo no banco são somados em
+  `ConsultasRequisicao`, que o middleware publica em `/metrics`;
+- comandos acima de `SQL_LENTA_MS` vão para o logger `app.sql`, com a rota e
+  os parâmetros;
+- na mesma requisição, um mesmo SELECT executado mais de
+  `SQL_N_MAIS_UM_REPETICOES` vezes indica um N+1, em geral um relacionamento
+  sem eager load.
+
+O que fazer com um N+1 depende de `SQL_N_MAIS_UM_MODO`: `erro` levanta
+`ConsultaRepetida`, `avisar` emite um `warnings.warn`, `amostrar` analisa só
+uma fração (`SQL_AMOSTRAGEM`) das requisições e registra no log, `desligado`
+não analisa. O padrão é `avisar` em desenvolvimento (`LOCALHOST_ENV`) e
+`amostrar` em produção.
+"""
+import logging
+import random
+import time
+import warnings
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import Engine, event
+
+from app.config import settings
+
+logger = logging.getLogger('app.sql')
+
+TAMANHO_MAXIMO_LOG = 500
+
+
+class ConsultaRepetida(RuntimeError):
+    """N+1: o mesmo SELECT foi executado vezes demais em uma requisição."""
+
+
+def modo_n_mais_um() -> str:
+    if settings.SQL_N_MAIS_UM_MODO:
+        return settings.SQL_N_MAIS_UM_MODO
+    return 'avisar' if settings.LOCALHOST_ENV == 'true' else 'amostrar'
+
+
+@dataclass
+class ConsultasRequisicao:
+    """Comandos executados durante uma requisição: totais e, se `analisar`, o
+    número de execuções de cada texto de SQL."""
+    rota: Callable[[], str]
+    analisar: bool
+    consultas: int = 0
+    segundos: float = 0.0
+    formatos: Counter[str] = field(default_factory=Counter)
+
+
+consultas_atuais: ContextVar[ConsultasRequisicao | None] = ContextVar('consultas_atuais', default=None)
+
+
+@contextmanager
+def rastrear_consultas(rota: Callable[[], str]) -> Iterator[ConsultasRequisicao]:
+    """Associa os comandos executados no bloco a `rota()` (avaliada só quando necessário)."""
+    modo = modo_n_mais_um()
+    analisar = modo in ('erro', 'avisar') or (
+        modo == 'amostrar' and random.random() < settings.SQL_AMOSTRAGEM
+    )
+    consultas = ConsultasRequisicao(rota, analisar)
+    token = consultas_atuais.set(consultas)
+    try:
+        yield consultas
+    finally:
+        consultas_atuais.reset(token)
+
+
+def _resumir(valor: object) -> str:
+    texto = repr(valor) if settings.SQL_LOG_PARAMETROS else '<omitidos>'
+    return texto if len(texto) <= TAMANHO_MAXIMO_LOG else texto[:TAMANHO_MAXIMO_LOG] + '...'
+
+
+def _rota_atual() -> str:
+    consultas = consultas_atuais.get()
+    return consultas.rota() if consultas is not None else '-'
+
+
+def _registrar_repeticao(consultas: ConsultasRequisicao, statement: str, vezes: int) -> None:
+    mensagem = (
+        f'Possível N+1 em {consultas.rota()}: o mesmo SELECT foi executado {vezes} vezes '
+        f'(limite {settings.SQL_N_MAIS_UM_REPETICOES}). Carregue o relacionamento junto '
+        f'da consulta principal. SQL: {statement[:TAMANHO_MAXIMO_LOG]}'
+    )
+    modo = modo_n_mais_um()
+    if modo == 'erro':
+        raise ConsultaRepetida(mensagem)
+    if modo == 'avisar':
+        warnings.warn(mensagem, RuntimeWarning, stacklevel=2)
+    else:
+        logger.warning(mensagem)
+
+
+def instrumentar(engine: Engine) -> None:
+    """Registra os eventos de instrumentação em `engine` (síncrona ou `AsyncEngine.sync_engine`)."""
+    @event.listens_for(engine, 'before_cursor_execute')
+    def antes(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+        conn.info.setdefault('inicio_consultas', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def depois(conn, _cursor, statement, parameters, _context, executemany) -> None:
+        segundos = time.perf_counter() - conn.info['inicio_consultas'].pop()
+        consultas = consultas_atuais.get()
+        if consultas is not None:
+            consultas.consultas += 1
+            consultas.segundos += segundos
+
+        milissegundos = segundos * 1000
+        if milissegundos >= settings.SQL_LENTA_MS:
+            logger.warning(
+                'SQL lenta (%.1f ms) em %s: %s | parâmetros: %s',
+                milissegundos,
+                _rota_atual(),
+                statement[:TAMANHO_MAXIMO_LOG],
+                _resumir(parameters),
+            )
+
+        if consultas is None or not consultas.analisar or executemany:
+            return
+        if statement.lstrip()[:6].upper() != 'SELECT':
+            return
+        consultas.formatos[statement] += 1
+        vezes = consultas.formatos[statement]
+        # Avisa uma vez por formato, ao passar do limite
+        if vezes == settings.SQL_N_MAIS_UM_REPETICOES + 1:
+            _registrar_repeticao(consultas, statement, vezes)
+
+    @event.listens_for(engine, 'handle_error')
+    def erro(contexto) -> None:
+        # Comandos que falham não disparam `after_cursor_execute`
+        if contexto.connection is not None and contexto.connection.info.get('inicio_consultas'):
+            contexto.connection.info['inicio_consultas'].pop()
+
+
+@contextmanager
+def contar_consultas(engine: Engine) -> Iterator[list[str]]:
+    """Lista, na ordem, os comandos que `engine` executar dentro do bloco.
+
+    Base de `assert_max_queries` nos testes; também útil em scripts.
+    """
+    comandos: list[str] = []
+
+    def registrar(_conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+        comandos.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', registrar)
+    try:
+        yield comandos
+    finally:
+        event.remove(engine, 'before_cursor_execute', registrar)
@@ -0,0 +1,286 @@
+"""Migrações versionadas do esquema do banco.
+
+Cada migração tem um número de versão crescente e é aplicada uma única vez; as
+versões aplicadas ficam registradas na tabela `versao_schema`. As migrações
+rodam na inicialização da API (`init_db`) e também podem ser executadas
+manualmente::
+
+    python -m app.database.migracoes            # aplica as pendentes
+    python -m app.database.migracoes --listar   # mostra o estado de cada versão
+"""
+import argparse
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import Connection, Index, Table, func, insert, inspect, literal, select, text, union_all
+from sqlalchemy.schema import CreateColumn
+from sqlmodel import SQLModel
+
+from app.database.enums import Colecao, TipoUsuario
+from app.database.esquema_inicial import metadata as metadata_inicial
+from app.database.models import (
+    Administrador,
+    MatriculaFuncionario,
+    Professor,
+    RelatoProblema,
+    ResumoLaboratorio,
+    Tecnico,
+    VersaoColecao,
+    VersaoSchema,
+)
+from app.services.busca import criar_indice_busca, reconstruir_indice_busca
+from app.services.resumo import recalcular_resumos
+
+
+class ErroMigracao(RuntimeError):
+    """A migração não pode ser aplicada sem intervenção no banco."""
+
+
+@dataclass(frozen=True)
+class Migracao:
+    versao: int
+    descricao: str
+    aplicar: Callable[[Connection], None]
+
+
+def _indice(nome: str) -> Index:
+    for tabela in SQLModel.metadata.tables.values():
+        for indice in tabela.indexes:
+            if indice.name == nome:
+                return indice
+    raise LookupError(f"Índice {nome} não está declarado nos modelos.")
+
+
+def verificar_duplicatas(conn: Connection, indice: Index, exemplos: int = 5) -> None:
+    """Falha com `ErroMigracao` se a tabela já tiver valores que violam o índice único."""
+    colunas = list(indice.columns)
+    repetidos = conn.execute(
+        select(*colunas, func.count().label("linhas"))
+        .group_by(*colunas)
+        .having(func.count() > 1)
+        .limit(exemplos)
+    ).all()
+    if not repetidos:
+        return
+    nomes = ", ".join(coluna.name for coluna in colunas)
+    valores = "; ".join(
+        f"{tuple(linha[:-1]) if len(colunas) > 1 else linha[0]!r} ({linha[-1]} linhas)"
+        for linha in repetidos
+    )
+    raise ErroMigracao(
+        f"Não é possível criar o índice único {indice.name}: a tabela {indice.table.name} "
+        f"tem valores repetidos em ({nomes}), por exemplo {valores}. Corrija ou remova "
+        "as linhas duplicadas e execute `python -m app.database.migracoes` novamente."
+    )
+
+
+def criar_indices(*nomes: str) -> Callable[[Connection], None]:
+    """Cria os índices declarados nos modelos que ainda não existirem no banco.
+
+    Antes de um índice único, confere se os dados existentes o respeitam:
+    bancos anteriores à migração podem ter duplicatas, e o erro do banco não
+    diria quais são.
+    """
+    def aplicar(conn: Connection) -> None:
+        for nome in nomes:
+            indice = _indice(nome)
+            existentes = {i["name"] for i in inspect(conn).get_indexes(indice.table.name)}
+            if nome in existentes:
+                continue
+            if indice.unique:
+                verificar_duplicatas(conn, indice)
+            indice.create(conn)
+    return aplicar
+
+
+def adicionar_colunas(tabela: Table, *nomes: str) -> Callable[[Connection], None]:
+    """Adiciona as colunas declaradas nos modelos que ainda não existirem na tabela.
+
+    Chaves estrangeiras não são adicionadas (o SQLite não permite).
+    """
+    def aplicar(conn: Connection) -> None:
+        existentes = {coluna["name"] for coluna in inspect(conn).get_columns(tabela.name)}
+        for nome in nomes:
+            if nome not in existentes:
+                definicao = CreateColumn(tabela.c[nome]).compile(dialect=conn.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {tabela.name} ADD COLUMN {definicao}")
+    return aplicar
+
+
+def esquema_inicial(conn: Connection) -> None:
+    # Bancos anteriores ao controle de versões já têm as tabelas: `create_all`
+    # só cria o que estiver faltando. O esquema é o congelado, não o dos modelos.
+    metadata_inicial.create_all(conn)
+
+
+def versoes_colecoes(conn: Connection) -> None:
+    VersaoColecao.__table__.create(conn, checkfirst=True)
+    existentes = set(conn.execute(select(VersaoColecao.nome)).scalars())
+    novas = [{"nome": c.value, "versao": 0} for c in Colecao if c.value not in existentes]
+    if novas:
+        conn.execute(VersaoColecao.__table__.insert(), novas)
+
+
+def resumo_laboratorios(conn: Connection) -> None:
+    ResumoLaboratorio.__table__.create(conn, checkfirst=True)
+    recalcular_resumos(conn)
+
+
+def indice_busca(conn: Connection) -> None:
+    criar_indice_busca(conn)
+    reconstruir_indice_busca(conn)
+
+
+def matriculas_funcionarios():
+    """Matrícula, tipo e id de todos os técnicos, administradores e professores."""
+    tipo_coluna = MatriculaFuncionario.__table__.c.tipo_usuario.type
+    tabelas = [
+        (Administrador, TipoUsuario.administrador),
+        (Tecnico, TipoUsuario.tecnico),
+        (Professor, TipoUsuario.professor),
+    ]
+    return union_all(*(
+        select(
+            tabela.matricula,
+            literal(tipo, tipo_coluna).label("tipo_usuario"),
+            tabela.id.label("funcionario_id"),
+        )
+        for tabela, tipo in tabelas
+    )).subquery()
+
+
+def verificar_matriculas(conn: Connection, exemplos: int = 5) -> None:
+    """Falha com `ErroMigracao` se uma matrícula pertencer a mais de um funcionário."""
+    funcionarios = matriculas_funcionarios()
+    repetidas = conn.execute(
+        select(funcionarios.c.matricula)
+        .group_by(funcionarios.c.matricula)
+        .having(func.count() > 1)
+        .order_by(funcionarios.c.matricula)
+        .limit(exemplos)
+    ).scalars().all()
+    if not repetidas:
+        return
+    donos: dict[str, list[str]] = {matricula: [] for matricula in repetidas}
+    for matricula, tipo in conn.execute(
+        select(funcionarios.c.matricula, funcionarios.c.tipo_usuario)
+        .where(funcionarios.c.matricula.in_(repetidas))
+        .order_by(funcionarios.c.matricula, funcionarios.c.tipo_usuario, funcionarios.c.funcionario_id)
+    ):
+        donos[matricula].append(TipoUsuario(tipo).name)
+    valores = "; ".join(f"{matricula!r} ({', '.join(tipos)})" for matricula, tipos in donos.items())
+    raise ErroMigracao(
+        "Não é possível criar o registro único de matrículas: há matrículas repetidas "
+        f"entre técnicos, administradores e professores, por exemplo {valores}. Altere "
+        "as matrículas repetidas e execute `python -m app.database.migracoes` novamente."
+    )
+
+
+def preencher_matriculas(conn: Connection) -> None:
+    """Registra as matrículas dos funcionários que ainda não estão no registro único."""
+    funcionarios = matriculas_funcionarios()
+    registradas = select(MatriculaFuncionario.matricula)
+    conn.execute(
+        insert(MatriculaFuncionario).from_select(
+            ["matricula", "tipo_usuario", "funcionario_id"],
+            select(funcionarios).where(funcionarios.c.matricula.not_in(registradas)),
+        )
+    )
+
+
+def registro_matriculas(conn: Connection) -> None:
+    verificar_matriculas(conn)
+    MatriculaFuncionario.__table__.create(conn, checkfirst=True)
+    preencher_matriculas(conn)
+
+
+MIGRACOES: list[Migracao] = [
+    Migracao(1, "Esquema inicial", esquema_inicial),
+    Migracao(
+        2,
+        "Índices das consultas mais frequentes",
+        criar_indices(
+            "ix_computador_patrimonio",
+            "ix_computador_hostname",
+            "ix_laboratorio_nome_local",
+            "ix_status_nome_descricao",
+            "ix_relato_problema_pendentes",
+            "ix_relato_problema_computador_id",
+            "ix_historico_alteracao_computador_data",
+        ),
+    ),
+    Migracao(3, "Versões das coleções (ETags)", versoes_colecoes),
+    Migracao(4, "Resumo dos laboratórios", resumo_laboratorios),
+    Migracao(5, "Índice de busca textual", indice_busca),
+    Migracao(
+        6,
+        "Reservas da fila de relatos",
+        adicionar_colunas(RelatoProblema.__table__, "reservado_por_id", "reservado_ate"),
+    ),
+    Migracao(7, "Registro único de matrículas", registro_matriculas),
+]
+VERSAO_ATUAL = MIGRACOES[-1].versao
+
+
+def versoes_aplicadas(conn: Connection) -> set[int]:
+    VersaoSchema.__table__.create(conn, checkfirst=True)
+    return set(conn.execute(select(VersaoSchema.versao)).scalars())
+
+
+def migrar(conn: Connection, ate: int = VERSAO_ATUAL) -> list[int]:
+    """Aplica as migrações pendentes até a versão `ate`, na ordem.
+
+    Deve ser chamada dentro de uma transação, que o chamador confirma. Retorna
+    as versões aplicadas.
+    """
+    aplicadas = versoes_aplicadas(conn)
+    if all(m.versao in aplicadas for m in MIGRACOES if m.versao <= ate):
+        # Caso comum na inicialização: nada a fazer, sem lock nem DDL
+        return []
+
+    if conn.dialect.name == "postgresql":
+        # Impede que vários workers iniciando juntos migrem ao mesmo tempo.
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('versao_schema'))"))
+        aplicadas = versoes_aplicadas(conn)
+
+    novas = []
+    for migracao in MIGRACOES:
+        if migracao.versao > ate or migracao.versao in aplicadas:
+            continue
+        migracao.aplicar(conn)
+        conn.execute(
+            VersaoSchema.__table__.insert().values(
+                versao=migracao.versao,
+                descricao=migracao.descricao,
+                aplicada_em=datetime.utcnow(),
+            )
+        )
+        novas.append(migracao.versao)
+    return novas
+
+
+def main() -> None:
+    from app.database.utils import engine
+
+    parser = argparse.ArgumentParser(description="Aplica as migrações do banco.")
+    parser.add_argument("--ate", type=int, default=VERSAO_ATUAL, help="última versão a aplicar")
+    parser.add_argument("--listar", action="store_true", help="só mostra as versões")
+    args = parser.parse_args()
+
+    try:
+        with engine.begin() as conn:
+            if args.listar:
+                aplicadas = versoes_aplicadas(conn)
+                for migracao in MIGRACOES:
+                    estado = "aplicada" if migracao.versao in aplicadas else "pendente"
+                    print(f"{migracao.versao:>4}  {estado:<9} {migracao.descricao}")
+                return
+            novas = migrar(conn, args.ate)
+    except ErroMigracao as erro:
+        parser.exit(1, f"{erro}\n")
+    print(f"Migrações aplicadas: {novas}" if novas else "Banco já está atualizado.")
+
+
+if __name__ == "__main__":
+    main()
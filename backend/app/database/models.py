@@ -1,14 +1,17 @@
 from datetime import date
 from typing import List, Optional
 
-from pydantic import EmailStr
+from pydantic import EmailStr, model_validator
+from sqlalchemy import DateTime, Index, text
 from sqlmodel import Field, Relationship, SQLModel, func
 from datetime import datetime
 
 from app.database.enums import (
     TipoUsuario,
     TipoAlteracao,
+    ResultadoAuditoria,
     StatusComputador,
+    TipoResultadoBusca,
     TipoSistemaOperacional,
 )
 
@@ -62,7 +65,7 @@ class AdministradorCreate(AdministradorBase, UsuarioCreate):
 
 class AdministradorPublic(AdministradorBase):
     id: int
-    usuario: 'Usuario'
+    usuario: UsuarioPublic
 
 
 # --------------------------------------------------------------------------------
@@ -83,7 +86,10 @@ class Tecnico(TecnicoBase, table=True):
     usuario: 'Usuario' = Relationship()
     administrador: 'Administrador' = Relationship(back_populates='tecnicos')
     computadores: list["Computador"] = Relationship(back_populates="tecnico")
-    relato_problemas: list["RelatoProblema"] = Relationship(back_populates="tecnico")
+    relato_problemas: list["RelatoProblema"] = Relationship(
+        back_populates="tecnico",
+        sa_relationship_kwargs={"foreign_keys": "RelatoProblema.tecnico_id"},
+    )
     historico_alteracoes: list["HistoricoAlteracao"] = Relationship(back_populates="tecnico")
 
 
@@ -93,7 +99,7 @@ class TecnicoCreate(TecnicoBase, UsuarioCreate):
 
 class TecnicoPublic(TecnicoBase):
     id: int
-    usuario: 'Usuario'
+    usuario: UsuarioPublic
 
 # --------------------------------------------------------------------------------
 # Professor
@@ -120,7 +126,7 @@ class ProfessorCreate(ProfessorBase, UsuarioCreate):
 
 class ProfessorPublic(ProfessorBase):
     id: int
-    usuario: 'Usuario'
+    usuario: UsuarioPublic
 
 
 # --------------------------------------------------------------------------------
@@ -130,6 +136,19 @@ Funcionario = Administrador | Tecnico | Professor
 FuncionarioCreate = AdministradorCreate | TecnicoCreate | ProfessorCreate
 FuncionarioPublic = AdministradorPublic | TecnicoPublic | ProfessorPublic
 
+
+class MatriculaFuncionario(SQLModel, table=True):
+    """Registro único das matrículas de Técnicos, Administradores e Professores.
+
+    A chave primária em `matricula` garante a unicidade entre as três tabelas
+    e permite localizar qualquer funcionário com uma única busca indexada.
+    """
+    __tablename__ = "matricula_funcionario"
+
+    matricula: str = Field(primary_key=True)
+    tipo_usuario: TipoUsuario
+    funcionario_id: int
+
 # --------------------------------------------------------------------------------
 # Aluno
 
@@ -152,7 +171,7 @@ class AlunoCreate(AlunoBase, UsuarioCreate):
 
 class AlunoPublic(AlunoBase):
     id: int
-    usuario: 'Usuario'
+    usuario: UsuarioPublic
 
 
 # --------------------------------------------------------------------------------
@@ -165,6 +184,10 @@ class LaboratorioBase(SQLModel):
 
 class Laboratorio(LaboratorioBase, table=True):
     __tablename__ = "laboratorio"
+    __table_args__ = (
+        # Usado para localizar o laboratório no cadastro de computadores
+        Index("ix_laboratorio_nome_local", "nome", "local", unique=True),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     administrador_id: int = Field(index=True, foreign_key="administrador.id")
@@ -179,7 +202,7 @@ class LaboratorioCreate(LaboratorioBase):
 
 class LaboratorioPublic(LaboratorioBase):
     id: int
-    computadores: list["Computador"]
+    computadores: list["ComputadorResumo"]
     administrador: "Administrador"
 
 # --------------------------------------------------------------------------------
@@ -192,6 +215,9 @@ class StatusBase(SQLModel):
 
 class Status(StatusBase, table=True):
     __tablename__ = "status"
+    __table_args__ = (
+        Index("ix_status_nome_descricao", "nome", "descricao", unique=True),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
 
@@ -213,8 +239,8 @@ class StatusDesc(SQLModel):
 # Computador
 
 class ComputadorBase(SQLModel):
-    patrimonio: str
-    hostname: str
+    patrimonio: str = Field(unique=True, index=True)
+    hostname: str = Field(index=True)
     marca: str
     ano_aquisicao: int
     sistema_operacional: TipoSistemaOperacional
@@ -243,8 +269,28 @@ class ComputadorCreate(ComputadorBase):
     tecnico_id: int
 
 
-class ComputadorPublic(ComputadorBase):
+class ComputadorLeitura(ComputadorBase):
+    """Base das respostas de leitura de computador.
+
+    `dias_desde_alteracao` é derivado de `data_ultima_alteracao` no momento da
+    serialização, então leituras nunca precisam escrever no banco.
+    """
     id: int
+
+    @model_validator(mode="after")
+    def calcular_dias_desde_alteracao(self) -> "ComputadorLeitura":
+        if self.data_ultima_alteracao is not None:
+            self.dias_desde_alteracao = (date.today() - self.data_ultima_alteracao).days
+        return self
+
+
+class ComputadorResumo(ComputadorLeitura):
+    status_id: int | None
+    laboratorio_id: int | None
+    tecnico_id: int | None
+
+
+class ComputadorPublic(ComputadorLeitura):
     status: "Status"
     laboratorio: "Laboratorio"
     tecnico: "Tecnico"
@@ -262,6 +308,19 @@ class ComputadorCreateNew(SQLModel):
     laboratorio_local: str
     tecnico_id: int
 
+
+class ErroImportacao(SQLModel):
+    linha: int
+    erro: str
+
+
+class ResultadoImportacao(SQLModel):
+    total: int = 0
+    inseridos: int = 0
+    # Só as primeiras linhas com erro são listadas; `total_erros` conta todas
+    total_erros: int = 0
+    erros: list[ErroImportacao] = []
+
 # --------------------------------------------------------------------------------
 # Histórico de Alteração
 
@@ -273,6 +332,9 @@ class HistoricoAlteracaoBase(SQLModel):
 
 class HistoricoAlteracao(HistoricoAlteracaoBase, table=True):
     __tablename__ = "historico_alteracao"
+    __table_args__ = (
+        Index("ix_historico_alteracao_computador_data", "computador_id", "data_alteracao"),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     computador_id: int | None = Field(default=None, foreign_key="computador.id")
@@ -292,7 +354,7 @@ class HistoricoAlteracaoCreate(HistoricoAlteracaoBase):
 
 class HistoricoAlteracaoPublic(HistoricoAlteracaoBase):
     id: int
-    computador: "Computador"
+    computador: "ComputadorResumo"
     tecnico: "Tecnico"
     status: "Status"
 
@@ -318,18 +380,33 @@ class RelatoProblemaBase(SQLModel):
 
 class RelatoProblema(RelatoProblemaBase, table=True):
     __tablename__ = "relato_problema"
+    __table_args__ = (
+        # Índice parcial: só os relatos pendentes, que são os consultados com frequência.
+        # Os predicados seguem a forma que cada planner reconhece em `auditada == False`.
+        Index(
+            "ix_relato_problema_pendentes",
+            "id",
+            sqlite_where=text("auditada = 0"),
+            postgresql_where=text("NOT auditada"),
+        ),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
-    computador_id: int | None = Field(default=None, foreign_key="computador.id")
+    computador_id: int | None = Field(default=None, index=True, foreign_key="computador.id")
     usuario_id: int | None = Field(default=None, foreign_key="usuario.id")
     tecnico_id: Optional[int] = Field(default=None, foreign_key="tecnico.id")
     auditada: bool = Field(default=False)
     data_auditada: date | None = None
     aceita: bool | None = None
+    # Reserva na fila de trabalho (`POST /relato-problemas/claim`); vale até `reservado_ate` (UTC)
+    reservado_por_id: int | None = Field(default=None, foreign_key="tecnico.id")
+    reservado_ate: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
 
     computador: "Computador" = Relationship(back_populates="relato_problemas")
     usuario: "Usuario" = Relationship(back_populates="relato_problemas")
-    tecnico: Optional["Tecnico"] = Relationship()
+    tecnico: Optional["Tecnico"] = Relationship(
+        sa_relationship_kwargs={"foreign_keys": "RelatoProblema.tecnico_id"},
+    )
 
 
 class RelatoProblemaCreate(RelatoProblemaBase):
@@ -340,17 +417,69 @@ class RelatoProblemaCreate(RelatoProblemaBase):
 
 class RelatoProblemaPublic(RelatoProblemaBase):
     id: int
-    computador: "Computador"
-    usuario: "Usuario"
+    computador: "ComputadorResumo"
+    usuario: "UsuarioPublic"
     auditada: bool
     tecnico: Optional["Tecnico"]
 
+
+class ReservaRelatos(SQLModel):
+    reservado_ate: datetime
+    relatos: list[RelatoProblemaPublic]
+
+
 class RelatoProblemaUpdate(SQLModel):
     aceita: bool
-    tecnico_id: int
     auditada: bool
     data_auditada: date
 
+
+class ItemAuditoriaLote(SQLModel):
+    id: int
+    aceita: bool
+    tecnico_id: int
+
+
+class FiltroAuditoriaLote(SQLModel):
+    """Relatos abertos de um computador e/ou de um laboratório."""
+    computador_id: int | None = None
+    laboratorio_id: int | None = None
+
+
+class AuditoriaLote(SQLModel):
+    """Auditoria de vários relatos: uma lista de `itens` ou um `filtro`.
+
+    Com `filtro`, todos os relatos abertos encontrados recebem `aceita` e
+    `tecnico_id`. `data_auditada` vale para o lote inteiro (padrão: hoje).
+    """
+    itens: list[ItemAuditoriaLote] = Field(default=[], max_length=1000)
+    filtro: FiltroAuditoriaLote | None = None
+    aceita: bool | None = None
+    tecnico_id: int | None = None
+    data_auditada: date | None = None
+
+    @model_validator(mode="after")
+    def validar_modo(self) -> "AuditoriaLote":
+        if bool(self.itens) == (self.filtro is not None):
+            raise ValueError("Informe `itens` ou `filtro`, não os dois.")
+        if self.filtro is not None:
+            if self.filtro.computador_id is None and self.filtro.laboratorio_id is None:
+                raise ValueError("O filtro precisa de `computador_id` ou `laboratorio_id`.")
+            if self.aceita is None or self.tecnico_id is None:
+                raise ValueError("Com `filtro`, `aceita` e `tecnico_id` são obrigatórios.")
+        return self
+
+
+class ResultadoItemAuditoria(SQLModel):
+    id: int
+    resultado: ResultadoAuditoria
+
+
+class ResultadoAuditoriaLote(SQLModel):
+    data_auditada: date
+    auditados: int
+    itens: list[ResultadoItemAuditoria]
+
 # --------------------------------------------------------------------------------
 # Auth
 
@@ -390,4 +519,57 @@ class RecuperacaoSenha(SQLModel):
 
 class TrocaSenha(SQLModel):
     senha_atual: str
-    nova_senha: str = Field(min_length=8)
\ No newline at end of file
+    nova_senha: str = Field(min_length=8)
+
+# --------------------------------------------------------------------------------
+# Controle de versão do esquema (ver app/database/migracoes.py)
+
+class VersaoSchema(SQLModel, table=True):
+    __tablename__ = "versao_schema"
+
+    versao: int = Field(primary_key=True)
+    descricao: str
+    aplicada_em: datetime = Field(default_factory=datetime.utcnow)
+
+
+class VersaoColecao(SQLModel, table=True):
+    """Contador incrementado a cada escrita em uma coleção, usado nos ETags."""
+    __tablename__ = "versao_colecao"
+
+    nome: str = Field(primary_key=True)
+    versao: int = Field(default=0)
+
+
+class ResumoLaboratorio(SQLModel, table=True):
+    """Contadores do painel por laboratório, mantidos a cada escrita.
+
+    As colunas de status têm o nome dos membros de `StatusComputador`.
+    """
+    __tablename__ = "resumo_laboratorio"
+
+    laboratorio_id: int = Field(primary_key=True, foreign_key="laboratorio.id")
+    total_computadores: int = Field(default=0)
+    disponivel: int = Field(default=0)
+    em_manutencao: int = Field(default=0)
+    reservado: int = Field(default=0)
+    desativado: int = Field(default=0)
+    relatos_abertos: int = Field(default=0)
+
+
+class ResumoLaboratorioPublic(SQLModel):
+    laboratorio_id: int
+    nome: str
+    local: str
+    total_computadores: int
+    computadores_por_status: dict[StatusComputador, int]
+    relatos_abertos: int
+
+
+# --------------------------------------------------------------------------------
+# Busca textual
+
+class ResultadoBusca(SQLModel):
+    tipo: TipoResultadoBusca
+    id: int
+    titulo: str
+    relevancia: float
@@ -0,0 +1,375 @@
+"""Gerador de dados sintéticos para testes de carga e planejamento de capacidade.
+
+Gera um campus inteiro proporcional a um fator de escala. Na escala 1 são mil
+laboratórios, 100 mil computadores, 1 milhão de históricos e 500 mil relatos.
+As distribuições são assimétricas, como na prática:
+
+- poucos laboratórios concentram muitas máquinas (Zipf);
+- poucas máquinas concentram a maior parte dos históricos e relatos (Pareto);
+- quase todos os computadores estão disponíveis;
+- relatos antigos já foram auditados, os recentes em geral não.
+
+As linhas são inseridas em lotes de `TAMANHO_LOTE` com executemany, em uma
+única transação, no SQLite e no Postgres. Cada tabela usa um gerador
+aleatório próprio derivado de `--semente`, então a mesma semente, escala e
+data de referência geram os mesmos dados em um banco vazio. Os dados são
+acrescentados aos que já existirem no banco.
+
+Uso (a partir de `backend/`)::
+
+    python -m app.database.sintetico --escala 0.1
+    python -m app.database.sintetico --escala 5 --semente 7 --database-url postgresql+psycopg://...
+
+Todos os usuários gerados têm a senha `sintetico`.
+"""
+import argparse
+import itertools
+import random
+import time
+from collections.abc import Iterable, Iterator
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import Connection, func, select, text, update
+
+from app.database.enums import (
+    StatusComputador,
+    TipoAlteracao,
+    TipoSistemaOperacional,
+    TipoUsuario,
+)
+from app.database.migracoes import migrar
+from app.database.models import (
+    Administrador,
+    Aluno,
+    Computador,
+    HistoricoAlteracao,
+    Laboratorio,
+    MatriculaFuncionario,
+    Professor,
+    RelatoProblema,
+    Status,
+    Tecnico,
+    Usuario,
+    VersaoColecao,
+)
+from app.services.busca import indexacao_adiada
+from app.services.resumo import recalcular_resumos
+
+# Quantidade de cada entidade na escala 1
+VOLUMES_BASE = {
+    'administradores': 20,
+    'tecnicos': 200,
+    'professores': 500,
+    'alunos': 5_000,
+    'laboratorios': 1_000,
+    'computadores': 100_000,
+    'historicos': 1_000_000,
+    'relatos': 500_000,
+}
+TAMANHO_LOTE = 10_000
+DIAS_DE_HISTORICO = 3 * 365
+
+SENHA_SINTETICA = 'sintetico'
+# pbkdf2_sha256 de SENHA_SINTETICA com sal fixo, calculado uma vez: gerar
+# milhares de usuários não custa um PBKDF2 por usuário e o resultado é
+# reprodutível.
+SENHA_HASH_SINTETICA = (
+    '$pbkdf2-sha256$29000$Z2VzdGFvLWxhYnMtc2ludGV0aWNv$WFjcLGTuh.v0sZx5FryAkWaS4eoKKByPBlEKnkItkGk'
+)
+
+PESOS_STATUS = {
+    StatusComputador.disponivel: 80,
+    StatusComputador.em_manutencao: 12,
+    StatusComputador.reservado: 5,
+    StatusComputador.desativado: 3,
+}
+PESOS_SISTEMA = {
+    TipoSistemaOperacional.windows: 60,
+    TipoSistemaOperacional.linux: 35,
+    TipoSistemaOperacional.macos: 5,
+}
+PESOS_ALTERACAO = {
+    TipoAlteracao.manutencao: 60,
+    TipoAlteracao.alteracao: 30,
+    TipoAlteracao.cadastro: 8,
+    TipoAlteracao.exclusao: 2,
+}
+MARCAS = ['Dell', 'HP', 'Lenovo', 'Positivo', 'Acer', 'Apple']
+PESOS_MARCAS = [35, 25, 20, 12, 6, 2]
+LOCAIS = ['STI', 'CCET', 'CCBS', 'CCSA', 'CECH', 'DCOMP', 'Didática', 'Biblioteca']
+NOMES = ['Ana', 'Bruno', 'Carla', 'Daniel', 'Elisa', 'Fábio', 'Gabriela', 'Heitor',
+         'Iara', 'João', 'Karina', 'Lucas', 'Marina', 'Nilton', 'Otávio', 'Paula']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Costa', 'Menezes',
+              'Andrade', 'Barbosa', 'Conceição', 'Paiva', 'Lara', 'Mahin', 'Botto']
+PROBLEMAS = ['Não liga', 'Tela azul', 'Sem rede', 'Teclado com defeito', 'Mouse não funciona',
+             'Muito lento', 'Sem som', 'Monitor piscando', 'Software desatualizado']
+OBSERVACOES = [None, None, 'Troca de memória', 'Formatação', 'Limpeza interna',
+               'Troca de fonte', 'Atualização do sistema', 'Troca de HD por SSD']
+
+
+def volumes(escala: float) -> dict[str, int]:
+    return {nome: max(1, round(base * escala)) for nome, base in VOLUMES_BASE.items()}
+
+
+def _lotes(linhas: Iterable[dict[str, Any]]) -> Iterator[list[dict[str, Any]]]:
+    linhas = iter(linhas)
+    while lote := list(itertools.islice(linhas, TAMANHO_LOTE)):
+        yield lote
+
+
+def _pesos_acumulados(pesos: Iterable[float]) -> list[float]:
+    return list(itertools.accumulate(pesos))
+
+
+class GeradorSintetico:
+    """Insere um campus sintético através de `conn` (dentro de uma transação)."""
+
+    def __init__(self, conn: Connection, escala: float, semente: int, hoje: date) -> None:
+        self.conn = conn
+        self.volumes = volumes(escala)
+        self.semente = semente
+        self.hoje = hoje
+        self.inseridos: dict[str, int] = {}
+
+    def _rng(self, tabela: str) -> random.Random:
+        # Um gerador por tabela: mudar o volume de uma não altera as demais.
+        return random.Random(f'{self.semente}:{tabela}')
+
+    def _proximo_id(self, model: type) -> int:
+        return (self.conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+    def _inserir(self, model: type, linhas: Iterable[dict[str, Any]]) -> None:
+        tabela = model.__table__
+        total = 0
+        for lote in _lotes(linhas):
+            self.conn.execute(tabela.insert(), lote)
+            total += len(lote)
+        self.inseridos[tabela.name] = self.inseridos.get(tabela.name, 0) + total
+
+    def _data(self, rng: random.Random, dias: int = DIAS_DE_HISTORICO) -> date:
+        # Datas mais recentes são mais frequentes
+        return self.hoje - timedelta(days=min(dias, int(rng.expovariate(3 / dias))))
+
+    def gerar(self) -> dict[str, int]:
+        with indexacao_adiada(self.conn):
+            self.gerar_usuarios()
+            self.gerar_status()
+            self.gerar_laboratorios()
+            self.gerar_computadores()
+            self.gerar_historicos()
+            self.gerar_relatos()
+        self.finalizar()
+        return self.inseridos
+
+    def gerar_usuarios(self) -> None:
+        rng = self._rng('usuario')
+        primeiro_usuario = self._proximo_id(Usuario)
+        papeis = [
+            (Administrador, TipoUsuario.administrador, self.volumes['administradores']),
+            (Tecnico, TipoUsuario.tecnico, self.volumes['tecnicos']),
+            (Professor, TipoUsuario.professor, self.volumes['professores']),
+            (Aluno, TipoUsuario.aluno, self.volumes['alunos']),
+        ]
+        total = sum(quantidade for _, _, quantidade in papeis)
+        self.usuarios = range(primeiro_usuario, primeiro_usuario + total)
+        self._inserir(Usuario, (
+            {
+                'id': usuario_id,
+                'nome': f'{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}',
+                'email': f'sintetico{usuario_id}@exemplo.com',
+                'senha_hash': SENHA_HASH_SINTETICA,
+            }
+            for usuario_id in self.usuarios
+        ))
+
+        usuario_id = primeiro_usuario
+        for model, tipo, quantidade in papeis:
+            primeiro = self._proximo_id(model)
+            ids = range(primeiro, primeiro + quantidade)
+            linhas = []
+            for funcionario_id in ids:
+                linha = {'id': funcionario_id, 'usuario_id': usuario_id, 'matricula': f'S{usuario_id:08d}'}
+                if model in (Tecnico, Professor):
+                    linha['administrador_id'] = rng.choice(self.administradores)
+                linhas.append(linha)
+                usuario_id += 1
+            self._inserir(model, linhas)
+            if tipo != TipoUsuario.aluno:
+                self._inserir(MatriculaFuncionario, (
+                    {'matricula': linha['matricula'], 'tipo_usuario': tipo, 'funcionario_id': linha['id']}
+                    for linha in linhas
+                ))
+            if model is Administrador:
+                self.administradores = list(ids)
+            elif model is Tecnico:
+                self.tecnicos = list(ids)
+
+    def _status_existentes(self) -> dict[StatusComputador, int]:
+        # Em ordem decrescente de id: com nomes repetidos, vale o status mais antigo
+        statement = select(Status.nome, Status.id).order_by(Status.id.desc())
+        return dict(self.conn.execute(statement).tuples().all())
+
+    def gerar_status(self) -> None:
+        existentes = self._status_existentes()
+        faltantes = [
+            {'nome': nome, 'descricao': nome.value} for nome in StatusComputador if nome not in existentes
+        ]
+        if faltantes:
+            self._inserir(Status, faltantes)
+            existentes = self._status_existentes()
+        self.status_ids = [existentes[nome] for nome in PESOS_STATUS]
+        self.status_pesos = _pesos_acumulados(PESOS_STATUS.values())
+
+    def gerar_laboratorios(self) -> None:
+        rng = self._rng('laboratorio')
+        primeiro = self._proximo_id(Laboratorio)
+        self.laboratorios = list(range(primeiro, primeiro + self.volumes['laboratorios']))
+        self._inserir(Laboratorio, (
+            {
+                'id': laboratorio_id,
+                'nome': f'Laboratório S{laboratorio_id}',
+                'local': f'{rng.choice(LOCAIS)} - Bloco {rng.randint(1, 12)}',
+                'administrador_id': rng.choice(self.administradores),
+            }
+            for laboratorio_id in self.laboratorios
+        ))
+
+    def gerar_computadores(self) -> None:
+        rng = self._rng('computador')
+        # Zipf sobre uma ordem embaralhada dos laboratórios
+        ordem = self.laboratorios[:]
+        rng.shuffle(ordem)
+        pesos_laboratorios = _pesos_acumulados(1 / posicao ** 1.1 for posicao in range(1, len(ordem) + 1))
+        tecnico_do_laboratorio = {lab: rng.choice(self.tecnicos) for lab in self.laboratorios}
+        sistemas = list(PESOS_SISTEMA)
+        pesos_sistemas = _pesos_acumulados(PESOS_SISTEMA.values())
+        pesos_marcas = _pesos_acumulados(PESOS_MARCAS)
+
+        primeiro = self._proximo_id(Computador)
+        self.computadores = range(primeiro, primeiro + self.volumes['computadores'])
+        maquinas_por_laboratorio: dict[int, int] = {}
+
+        def linhas() -> Iterator[dict[str, Any]]:
+            for computador_id in self.computadores:
+                laboratorio_id = rng.choices(ordem, cum_weights=pesos_laboratorios)[0]
+                numero = maquinas_por_laboratorio[laboratorio_id] = maquinas_por_laboratorio.get(laboratorio_id, 0) + 1
+                alteracao = self._data(rng)
+                yield {
+                    'id': computador_id,
+                    'patrimonio': f'S{computador_id:08d}',
+                    'hostname': f'LAB{laboratorio_id:04d}-PC{numero:03d}',
+                    'marca': rng.choices(MARCAS, cum_weights=pesos_marcas)[0],
+                    'ano_aquisicao': self.hoje.year - min(12, int(rng.expovariate(1 / 4))),
+                    'sistema_operacional': rng.choices(sistemas, cum_weights=pesos_sistemas)[0],
+                    'status_id': rng.choices(self.status_ids, cum_weights=self.status_pesos)[0],
+                    'laboratorio_id': laboratorio_id,
+                    'tecnico_id': tecnico_do_laboratorio[laboratorio_id],
+                    'data_ultima_alteracao': alteracao,
+                    'dias_desde_alteracao': (self.hoje - alteracao).days,
+                }
+
+        self._inserir(Computador, linhas())
+        # Máquinas "problemáticas": peso de Pareto usado por históricos e relatos
+        self.pesos_computadores = _pesos_acumulados(
+            rng.paretovariate(1.2) for _ in self.computadores
+        )
+
+    def _sortear_computadores(self, rng: random.Random, quantidade: int) -> list[int]:
+        return rng.choices(self.computadores, cum_weights=self.pesos_computadores, k=quantidade)
+
+    def gerar_historicos(self) -> None:
+        rng = self._rng('historico_alteracao')
+        tipos = list(PESOS_ALTERACAO)
+        pesos_tipos = _pesos_acumulados(PESOS_ALTERACAO.values())
+        primeiro = self._proximo_id(HistoricoAlteracao)
+        total = self.volumes['historicos']
+
+        def linhas() -> Iterator[dict[str, Any]]:
+            for inicio in range(0, total, TAMANHO_LOTE):
+                quantidade = min(TAMANHO_LOTE, total - inicio)
+                for deslocamento, computador_id in enumerate(self._sortear_computadores(rng, quantidade)):
+                    yield {
+                        'id': primeiro + inicio + deslocamento,
+                        'computador_id': computador_id,
+                        'tecnico_id': rng.choice(self.tecnicos),
+                        'status_id': rng.choices(self.status_ids, cum_weights=self.status_pesos)[0],
+                        'tipo_alteracao': rng.choices(tipos, cum_weights=pesos_tipos)[0],
+                        'data_alteracao': self._data(rng),
+                        'observacao': rng.choice(OBSERVACOES),
+                    }
+
+        self._inserir(HistoricoAlteracao, linhas())
+
+    def gerar_relatos(self) -> None:
+        rng = self._rng('relato_problema')
+        primeiro = self._proximo_id(RelatoProblema)
+        total = self.volumes['relatos']
+
+        def linhas() -> Iterator[dict[str, Any]]:
+            for inicio in range(0, total, TAMANHO_LOTE):
+                quantidade = min(TAMANHO_LOTE, total - inicio)
+                for deslocamento, computador_id in enumerate(self._sortear_computadores(rng, quantidade)):
+                    data_relato = self._data(rng)
+                    idade = (self.hoje - data_relato).days
+                    auditada = rng.random() < (0.97 if idade > 30 else 0.3)
+                    yield {
+                        'id': primeiro + inicio + deslocamento,
+                        'data_relato': data_relato,
+                        'usuario_id': rng.choice(self.usuarios),
+                        'descricao': rng.choice(PROBLEMAS),
+                        'computador_patrimonio': f'S{computador_id:08d}',
+                        'computador_id': computador_id,
+                        'tecnico_id': rng.choice(self.tecnicos) if auditada else None,
+                        'auditada': auditada,
+                        'data_auditada': (
+                            min(self.hoje, data_relato + timedelta(days=rng.randint(0, 20)))
+                            if auditada else None
+                        ),
+                        'aceita': rng.random() < 0.9 if auditada else None,
+                    }
+
+        self._inserir(RelatoProblema, linhas())
+
+    def finalizar(self) -> None:
+        if self.conn.dialect.name == 'postgresql':
+            # Os ids foram informados explicitamente: as sequências precisam alcançá-los
+            for model in (Usuario, Administrador, Tecnico, Professor, Aluno, Status,
+                          Laboratorio, Computador, HistoricoAlteracao, RelatoProblema):
+                tabela = model.__tablename__
+                self.conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {tabela}))"
+                ))
+        recalcular_resumos(self.conn)
+        # Invalida os ETags emitidos antes da carga
+        self.conn.execute(update(VersaoColecao).values(versao=VersaoColecao.versao + 1))
+
+
+def main() -> None:
+    from app.database.utils import get_engine
+
+    parser = argparse.ArgumentParser(description="Popula o banco com dados sintéticos.")
+    parser.add_argument("--escala", type=float, default=1.0,
+                        help="fator de escala (1 = mil laboratórios e 100 mil computadores)")
+    parser.add_argument("--semente", type=int, default=42, help="semente dos geradores aleatórios")
+    parser.add_argument("--hoje", type=date.fromisoformat, default=date.today(),
+                        help="data de referência (AAAA-MM-DD) para datas reprodutíveis")
+    parser.add_argument("--database-url", help="banco de destino (padrão: DATABASE_URL)")
+    args = parser.parse_args()
+
+    engine = get_engine(args.database_url)
+    inicio = time.perf_counter()
+    with engine.begin() as conn:
+        migrar(conn)
+        inseridos = GeradorSintetico(conn, args.escala, args.semente, args.hoje).gerar()
+    duracao = time.perf_counter() - inicio
+
+    for tabela, quantidade in inseridos.items():
+        print(f"{tabela:<24} {quantidade:>12,}")
+    total = sum(inseridos.values())
+    print(f"{'total':<24} {total:>12,}  ({duracao:.1f}s, {total / duracao:,.0f} linhas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,14 @@
-from sqlmodel import Session, create_engine, select, func
+from sqlmodel import Session, StaticPool, create_engine, select
 from datetime import datetime
 from enum import Enum
+from typing import Any
 
-from sqlalchemy import Engine
+from sqlalchemy import URL, Engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
 from app.database.enums import StatusComputador, TipoSistemaOperacional
 from app.config import settings
 from app.database.models import (
-    SQLModel,
     Laboratorio,
     Usuario,
     Computador,
@@ -15,35 +16,131 @@ from app.database.models import (
     Administrador,
     Tecnico,
     Professor,
-    Aluno
+    Aluno,
 )
 
-from app.services.usuarios import hash_password
+from app.database.instrumentacao import instrumentar
+from app.database.migracoes import migrar, preencher_matriculas
+from app.services.resumo import recalcular_resumos
 
 
 # Connection
-def get_engine() -> Engine:
-    return create_engine(settings.DATABASE_URL)
+def sqlite_em_memoria(url: URL) -> bool:
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def opcoes_engine(url: URL) -> dict[str, Any]:
+    """Parâmetros de `create_engine` adequados ao banco de `url`."""
+    if url.get_backend_name() == 'sqlite':
+        opcoes: dict[str, Any] = {'connect_args': {'check_same_thread': False}}
+        if sqlite_em_memoria(url):
+            # Banco em memória: todas as sessões precisam compartilhar a mesma conexão.
+            opcoes['poolclass'] = StaticPool
+        return opcoes
+    return {
+        'pool_size': settings.DB_POOL_SIZE,
+        'max_overflow': settings.DB_MAX_OVERFLOW,
+        'pool_timeout': settings.DB_POOL_TIMEOUT_SEGUNDOS,
+        'pool_recycle': settings.DB_POOL_RECYCLE_SEGUNDOS,
+        'pool_pre_ping': settings.DB_POOL_PRE_PING,
+    }
+
+
+def pragmas_sqlite() -> list[str]:
+    return [
+        f'PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}',
+        f'PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}',
+        f'PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}',
+        # Valor negativo: tamanho em KiB em vez de páginas
+        f'PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}',
+        f'PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_BYTES}',
+    ]
+
+
+def configurar_sqlite(engine: Engine) -> None:
+    """Aplica `pragmas_sqlite()` em toda conexão nova de `engine`.
+
+    Com WAL, leitores não bloqueiam o escritor e `busy_timeout` faz escritas
+    concorrentes esperarem pelo lock em vez de falhar com "database is locked".
+    """
+    comandos = pragmas_sqlite()
+
+    @event.listens_for(engine, 'connect')
+    def aplicar_pragmas(dbapi_connection, _connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for comando in comandos:
+            cursor.execute(comando)
+        cursor.close()
+
+
+def get_engine(database_url: str | None = None) -> Engine:
+    url = make_url(database_url or settings.DATABASE_URL)
+    engine = create_engine(url, **opcoes_engine(url))
+    if url.get_backend_name() == 'sqlite' and not sqlite_em_memoria(url):
+        configurar_sqlite(engine)
+    instrumentar(engine)
+    return engine
+
+
+def get_async_url(url: str) -> URL:
+    """Converte a URL do banco para o driver assíncrono equivalente."""
+    async_url = make_url(url)
+    if async_url.drivername == 'sqlite':
+        return async_url.set(drivername='sqlite+aiosqlite')
+    if async_url.drivername in ('postgresql', 'postgresql+psycopg2'):
+        return async_url.set(drivername='postgresql+psycopg')
+    return async_url
+
+
+def get_async_engine(database_url: str | None = None) -> AsyncEngine:
+    url = get_async_url(database_url or settings.DATABASE_URL)
+    engine = create_async_engine(url, **opcoes_engine(url))
+    if url.get_backend_name() == 'sqlite' and not sqlite_em_memoria(url):
+        configurar_sqlite(engine.sync_engine)
+    instrumentar(engine.sync_engine)
+    return engine
 
 
 engine = get_engine()
+async_engine = get_async_engine()
 
 
 # Initialization
-def init_db() -> None:
-    SQLModel.metadata.create_all(engine)
-    with Session(engine) as db:
-        if not has_any(Computador, db):
-            populate_db(db)
+def init_db(db: Session) -> None:
+    """Aplica as migrações pendentes e popula o banco vazio.
+
+    Síncrona para poder ser usada tanto com `Session` quanto através de
+    `AsyncSession.run_sync`.
+    """
+    migrar(db.connection())
+    db.commit()
+    if settings.POPULAR_BANCO_VAZIO and not has_any(Computador, db):
+        populate_db(db)
+        recalcular_resumos(db.connection())
+        db.commit()
 
 
 # Helpers
 def has_any(table: type, db: Session) -> bool:
-    stmt = func.count(table.id)
-    return db.exec(stmt).scalar() or 0
+    # LIMIT 1 em vez de COUNT: a inicialização não varre tabelas grandes
+    return db.exec(select(table.id).limit(1)).first() is not None
 
 
 # Populate Functions
+
+# Hashes (pbkdf2_sha256, sal fixo) das senhas dos usuários de exemplo, iguais aos
+# nomes. Pré-calculados para o cadastro inicial não gastar um PBKDF2 por usuário
+# antes do servidor aceitar requisições.
+SENHAS_EXEMPLO = {
+    'rodolfo': '$pbkdf2-sha256$29000$ZXhlbXBsby1yb2RvbGZv$wkJoRnwWl.SQuxAchmZQJvv750S0Ha542lnuR4VN1zw',
+    'ivone': '$pbkdf2-sha256$29000$ZXhlbXBsby1pdm9uZQ$1Utt311VnXqwV9x1QxTI.frBY27/aV3sWWoExwoIZ6Q',
+    'patricia': '$pbkdf2-sha256$29000$ZXhlbXBsby1wYXRyaWNpYQ$fjlk0Qc.hioTy.JC6TRY8sbr3VVA6F9veUxph8FlPFY',
+    'nilton': '$pbkdf2-sha256$29000$ZXhlbXBsby1uaWx0b24$ajxGZo4hbk.QK8IOrNugSaV44aFHIupEiUChcISg4LA',
+    'julio': '$pbkdf2-sha256$29000$ZXhlbXBsby1qdWxpbw$kVR46wR6RWEs0LM3H76pKXluCcmK67.6Q.HYHIF/JVM',
+    'caio': '$pbkdf2-sha256$29000$ZXhlbXBsby1jYWlv$SRzLI85HrzJlxd0cAryONS2m6xx3bsEO0A3HMBydYyE',
+    'gustavo': '$pbkdf2-sha256$29000$ZXhlbXBsby1ndXN0YXZv$ZRkq6hA1vvEKPy.kFEMumkNJEvABoPR7Lack55n7L4M',
+    'luisa': '$pbkdf2-sha256$29000$ZXhlbXBsby1sdWlzYQ$Vi8.7nSVOXyPIKDPDgYAgSQOHabdbrVxrrsbXEBDocg',
+}
 def populate_status(db: Session):
     data = [
         {"nome": StatusComputador.disponivel.value, "descricao": "Disponível"},
@@ -84,49 +181,49 @@ def populate_usuario(db: Session) -> None:
             # Professor
             'nome': 'Rodolfo Botto',
             'email': 'rodolfo@exemplo.com',
-            'senha_hash': hash_password('rodolfo'),
+            'senha_hash': SENHAS_EXEMPLO['rodolfo'],
         },
         {
             # Professor
             'nome': 'Ivone Lara',
             'email': 'ivone@exemplo.com',
-            'senha_hash': hash_password('ivone'),
+            'senha_hash': SENHAS_EXEMPLO['ivone'],
         },
         {
             # Técnico
             'nome': 'Patrícia Menezes',
             'email': 'patricia@exemplo.com',
-            'senha_hash': hash_password('patricia'),
+            'senha_hash': SENHAS_EXEMPLO['patricia'],
         },
         {
             # Técnico
             'nome': 'José Nilton',
             'email': 'nilton@exemplo.com',
-            'senha_hash': hash_password('nilton'),
+            'senha_hash': SENHAS_EXEMPLO['nilton'],
         },
         {
             # Administrador
             'nome': 'Júlio César',
             'email': 'julio@exemplo.com',
-            'senha_hash': hash_password('julio'),
+            'senha_hash': SENHAS_EXEMPLO['julio'],
         },
         {
             # Administrador
             'nome': 'Caio Conceição',
             'email': 'caio@exemplo.com',
-            'senha_hash': hash_password('caio'),
+            'senha_hash': SENHAS_EXEMPLO['caio'],
         },
         {
             # Aluno
             'nome': 'Gustavo Paiva',
             'email': 'gustavo@exemplo.com',
-            'senha_hash': hash_password('gustavo'),
+            'senha_hash': SENHAS_EXEMPLO['gustavo'],
         },
         {
             # Aluno
             'nome': 'Luísa Mahin',
             'email': 'luisa@exemplo.com',
-            'senha_hash': hash_password('luisa'),
+            'senha_hash': SENHAS_EXEMPLO['luisa'],
         },
     ]
 
@@ -199,6 +296,11 @@ def populate_aluno(db: Session) -> None:
     db.add(aluno_1)
 
 
+def populate_matriculas(db: Session) -> None:
+    """Preenche o registro único de matrículas a partir das tabelas de funcionários."""
+    preencher_matriculas(db.connection())
+
+
 def populate_computadores(db: Session):
     laboratorios = db.exec(select(Laboratorio)).all()
     status = db.exec(select(Status)).all()
@@ -239,6 +341,7 @@ def populate_db(db: Session) -> None:
         populate_tecnico,
         populate_aluno,
         populate_professor,
+        populate_matriculas,
         populate_status,
         populate_laboratorios,
         populate_computadores,
@@ -1,26 +1,25 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Callable, Generator
 from typing import Annotated
+from urllib.parse import urlencode
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
-from app.database.enums import TipoUsuario
+from app.database.enums import Colecao, TipoUsuario
 from app.database.models import (
-    Administrador,
-    Professor,
-    Tecnico,
     TokenPayload,
-    Usuario,
-    Aluno,
     UsuarioPublic,
 )
-from app.database.utils import engine
-from app.services.usuarios import get_user_by_email, usuario_especifico
+from app.database.utils import async_engine, engine
+from app.services.paginacao import Paginacao, parametros_paginacao
+from app.services.usuarios import PapelUsuario, cache_usuarios, get_user_by_email
+from app.services.versoes import calcular_etag, etag_corresponde, obter_versoes
 
 credentials_exception = HTTPException(
     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -34,63 +33,114 @@ reusable_oauth2 = OAuth2PasswordBearer(
 
 
 def get_db() -> Generator[Session]:
-    """Retorna uma Session."""
+    """Retorna uma Session síncrona. Prefira `AsyncSessionDep` nas rotas."""
     with Session(engine) as db:
         yield db
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession]:
+    """Retorna uma AsyncSession.
+
+    `expire_on_commit=False` evita recargas implícitas (e portanto I/O fora de
+    um `await`) ao acessar atributos depois do commit.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as db:
+        yield db
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
+PaginacaoDep = Annotated[Paginacao, Depends(parametros_paginacao)]
+
 
+def condicional(*colecoes: Colecao) -> Callable:
+    """Dependência de rotas GET que responde com ETag das `colecoes` exibidas.
 
-def get_current_usuario(session: SessionDep, token: TokenDep) -> Usuario:
-    """Retorna o usuário associado ao token."""
+    Quando o `If-None-Match` da requisição ainda é válido, responde 304 sem
+    executar a rota: só os contadores de versão são lidos do banco.
+    """
+    async def verificar_etag(request: Request, response: Response, session: AsyncSessionDep) -> None:
+        versoes = await obter_versoes(session, colecoes)
+        query = urlencode(sorted(request.query_params.multi_items()))
+        etag = calcular_etag(request.url.path, query, versoes)
+        if etag_corresponde(request.headers.get('if-none-match'), etag):
+            raise HTTPException(status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response.headers['ETag'] = etag
+
+    return verificar_etag
+
+
+def get_token_payload(token: TokenDep) -> TokenPayload:
+    """Decodifica e valida o token, retornando suas claims."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        token_data = TokenPayload(**payload)
-        email = token_data.email
+        return TokenPayload(**payload)
     except (InvalidTokenError, ValidationError):
         raise credentials_exception
 
-    usuario = get_user_by_email(session, email)
-    if not usuario:
+
+TokenPayloadDep = Annotated[TokenPayload, Depends(get_token_payload)]
+
+
+async def get_current_usuario(session: AsyncSessionDep, token_data: TokenPayloadDep) -> UsuarioPublic:
+    """Retorna o usuário associado ao token.
+
+    O usuário resolvido fica em cache até o fim do TTL ou a expiração do token,
+    o que vier primeiro, evitando uma consulta ao banco por requisição.
+    """
+    usuario = cache_usuarios.get(token_data.sub)
+    if usuario is not None:
+        return usuario
+
+    db_usuario = await get_user_by_email(session, token_data.email)
+    if not db_usuario:
         raise HTTPException(status.HTTP_404_NOT_FOUND, 'Usuario não encontrado')
+    usuario = UsuarioPublic.model_validate(db_usuario)
+    cache_usuarios.set(token_data.sub, usuario, expira_em=token_data.exp)
     return usuario
 
 
 CurrentUsuario = Annotated[UsuarioPublic, Depends(get_current_usuario)]
 
 
-def get_admin(session: SessionDep, current_usuario: CurrentUsuario) -> Administrador:
-    return usuario_especifico(session, current_usuario, TipoUsuario.administrador)
+# Dependências de papel: confiam nas claims assinadas do token e não consultam
+# o banco. Use `PapelUsuario.carregar` quando a rota precisar da linha completa.
 
+def get_papel(token_data: TokenPayloadDep) -> PapelUsuario:
+    return PapelUsuario(token_data)
 
-def get_aluno(session: SessionDep, current_usuario: CurrentUsuario) -> Aluno:
-    return usuario_especifico(session, current_usuario, TipoUsuario.aluno)
 
+def exigir_papel(token_data: TokenPayload, tipo_usuario: TipoUsuario) -> PapelUsuario:
+    if token_data.tipo_usuario != tipo_usuario:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, 'Usuário não autorizado.')
+    return PapelUsuario(token_data)
 
-def get_tecnico(session: SessionDep, current_usuario: CurrentUsuario) -> Tecnico:
-    return usuario_especifico(session, current_usuario, TipoUsuario.tecnico)
 
+def get_admin(token_data: TokenPayloadDep) -> PapelUsuario:
+    return exigir_papel(token_data, TipoUsuario.administrador)
 
-def get_professor(session: SessionDep, current_usuario: CurrentUsuario) -> Professor:
-    return usuario_especifico(session, current_usuario, TipoUsuario.professor)
 
-CurrentAdministrador = Annotated[Administrador, Depends(get_admin)]
-CurrentTecnico = Annotated[Tecnico, Depends(get_tecnico)]
-CurrentProfessor = Annotated[Professor, Depends(get_professor)]
-CurrentUsuarioDaVia = Annotated[Administrador, Depends(get_aluno)]
+def get_aluno(token_data: TokenPayloadDep) -> PapelUsuario:
+    return exigir_papel(token_data, TipoUsuario.aluno)
 
-def get_priviliged_usuario(
-    session: SessionDep,
-    current_usuario: CurrentUsuario,
-) -> Administrador:
-    privilleged_usuario = (usuario_especifico(session, current_usuario, TipoUsuario.administrador))
 
-    if not privilleged_usuario:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, 'Usuário não autorizado.')
+def get_tecnico(token_data: TokenPayloadDep) -> PapelUsuario:
+    return exigir_papel(token_data, TipoUsuario.tecnico)
+
+
+def get_professor(token_data: TokenPayloadDep) -> PapelUsuario:
+    return exigir_papel(token_data, TipoUsuario.professor)
+
+CurrentPapel = Annotated[PapelUsuario, Depends(get_papel)]
+CurrentAdministrador = Annotated[PapelUsuario, Depends(get_admin)]
+CurrentTecnico = Annotated[PapelUsuario, Depends(get_tecnico)]
+CurrentProfessor = Annotated[PapelUsuario, Depends(get_professor)]
+CurrentUsuarioDaVia = Annotated[PapelUsuario, Depends(get_aluno)]
+
 
-    return privilleged_usuario
+def get_priviliged_usuario(token_data: TokenPayloadDep) -> PapelUsuario:
+    return exigir_papel(token_data, TipoUsuario.administrador)
 
 
-PrivilegedUsuario = Annotated[Administrador, Depends(get_priviliged_usuario)]
\ No newline at end of file
+PrivilegedUsuario = Annotated[PapelUsuario, Depends(get_priviliged_usuario)]
@@ -1,12 +1,26 @@
+import asyncio
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-
-from app.database.utils import init_db
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.database.utils import async_engine, init_db
+from app.services.cache import caches
+from app.services.computadores import recalculo_periodico
+from app.services.metricas import (
+    MiddlewareMetricas,
+    exportar,
+    metricas_caches,
+    metricas_eventos,
+    metricas_senhas,
+)
+from app.services.senhas import servico_senhas
+from app.services.paginacao import HEADER_PROXIMO_CURSOR, HEADER_TOTAL
 from app.routes import (
     login,
     usuarios,
@@ -15,14 +29,27 @@ from app.routes import (
     relato_problemas,
     status,
     alteracoes,
+    busca,
+    eventos,
 )
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI) -> AsyncGenerator:
     """Realiza computações de inicialização do banco."""
-    init_db()
+    async with AsyncSession(async_engine) as db:
+        await db.run_sync(init_db)
+    recalculo = None
+    if settings.RECALCULO_DIAS_INTERVALO_SEGUNDOS > 0:
+        recalculo = asyncio.create_task(
+            recalculo_periodico(settings.RECALCULO_DIAS_INTERVALO_SEGUNDOS),
+        )
     yield
+    if recalculo is not None:
+        recalculo.cancel()
+        with suppress(asyncio.CancelledError):
+            await recalculo
+    servico_senhas.encerrar()
 
 
 app = FastAPI(docs_url='/docs/api', lifespan=lifespan)
@@ -32,7 +59,10 @@ app.add_middleware(
     allow_origins=['http://localhost:7000', 'http://localhost:8000'],
     allow_methods=['*'],
     allow_headers=['*'],
+    expose_headers=[HEADER_PROXIMO_CURSOR, HEADER_TOTAL, 'ETag'],
 )
+# Adicionado por último para envolver os demais middlewares e medir a requisição inteira
+app.add_middleware(MiddlewareMetricas)
 
 
 with suppress(RuntimeError):
@@ -66,6 +96,23 @@ app.include_router(laboratorios.router, prefix='/laboratorios', tags=['laborator
 app.include_router(relato_problemas.router, prefix='/relato-problemas', tags=['relato-problemas'])
 app.include_router(status.router, prefix='/status', tags=['status'])
 app.include_router(alteracoes.router, prefix='/alteracoes', tags=['alteracoes'])
+app.include_router(busca.router, prefix='/busca', tags=['busca'])
+app.include_router(eventos.router, prefix='/eventos', tags=['eventos'])
+
+
+@app.get('/cache')
+def estatisticas_cache() -> dict[str, dict[str, int | float]]:
+    """Hits, misses e taxa de acerto de cada cache (contados neste processo)."""
+    return {nome: cache.estatisticas() for nome, cache in caches.items()}
+
+
+@app.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+def metricas() -> PlainTextResponse:
+    """Métricas por rota, dos caches, do hashing de senhas e do stream de eventos no formato do Prometheus."""
+    return PlainTextResponse(
+        exportar(metricas_caches, metricas_senhas, metricas_eventos),
+        media_type='text/plain; version=0.0.4; charset=utf-8',
+    )
 
 
 @app.get('/developers')
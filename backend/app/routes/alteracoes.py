@@ -1,7 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from datetime import date
+from enum import Enum
 from typing import List
+from sqlalchemy.orm import joinedload
 from sqlmodel import select
-from app.deps import SessionDep
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.deps import AsyncSessionDep, PaginacaoDep, condicional
 
 from app.database.models import (
     HistoricoAlteracaoCreate,
@@ -9,30 +14,64 @@ from app.database.models import (
     HistoricoAlteracao, 
     Computador, 
     Laboratorio, 
-    Status,
 )
 
-from app.database.enums import TipoAlteracao
+from app.database.enums import Colecao, TipoAlteracao
+from app.services.eventos import publicar_alteracao, publicar_status_computador
+from app.services.exportacao import (
+    MEDIA_TYPES,
+    FormatoExportacao,
+    consulta_exportacao,
+    exportar_alteracoes,
+)
+from app.services.leitura import consulta_alteracoes, montar_alteracoes, responder
+from app.services.paginacao import paginar
+from app.services.referencias import buscar_status_por_id
+from app.services.resumo import ajustar_resumo
+from app.services.versoes import incrementar_versoes
 
 router = APIRouter()
 
+# Coleções exibidas nas respostas de leitura; qualquer escrita nelas invalida o ETag
+ETAG = Depends(condicional(Colecao.alteracoes, Colecao.computadores))
+
+# Relacionamentos serializados por HistoricoAlteracaoPublic
+CARREGAR_RELACIONAMENTOS = (
+    joinedload(HistoricoAlteracao.computador),
+    joinedload(HistoricoAlteracao.tecnico),
+    joinedload(HistoricoAlteracao.status),
+)
+
+
+class OrdenacaoAlteracao(str, Enum):
+    id = "id"
+    data_alteracao = "data_alteracao"
+
+
+async def obter_historico(db: AsyncSession, alteracao_id: int) -> HistoricoAlteracao | None:
+    """Busca a alteração já com os relacionamentos de HistoricoAlteracaoPublic."""
+    statement = (
+        select(HistoricoAlteracao)
+        .options(*CARREGAR_RELACIONAMENTOS)
+        .where(HistoricoAlteracao.id == alteracao_id)
+        .execution_options(populate_existing=True)
+    )
+    return (await db.exec(statement)).first()
+
 # POST para criação de uma alteração
 @router.post("/", response_model=HistoricoAlteracaoPublic)
-async def criar_alteracao(historico: HistoricoAlteracaoCreate, db: SessionDep):
+async def criar_alteracao(historico: HistoricoAlteracaoCreate, db: AsyncSessionDep):
     # Verificando se o computador existe
     statement = select(Computador).where(
         Computador.id == historico.computador_id
     )
-    computador = db.exec(statement).first()
+    computador = (await db.exec(statement)).first()
     
     if not computador:
         raise HTTPException(status_code=404, detail="Computador não encontrado")
 
     # Verificando o status
-    stat_stmt = select(Status).where(
-        Status.id == historico.status_id
-    )
-    status = db.exec(stat_stmt).first()
+    status = await buscar_status_por_id(db, historico.status_id)
 
     if not status:
         raise HTTPException(status_code=404, detail="Status não encontrado")
@@ -49,30 +88,86 @@ async def criar_alteracao(historico: HistoricoAlteracaoCreate, db: SessionDep):
     
 
     # Atualizando o status do computador
+    status_anterior = computador.status_id
     computador.status_id = historico.status_id
 
     db.add(novo_historico)
-    db.commit()
-    db.refresh(novo_historico)
+    await ajustar_resumo(
+        db, computador.laboratorio_id, status={status_anterior: -1, computador.status_id: 1}
+    )
+    await incrementar_versoes(db, Colecao.alteracoes, Colecao.computadores)
+    await db.commit()
 
-    return novo_historico
+    alteracao = await obter_historico(db, novo_historico.id)
+    publicar_alteracao(alteracao)
+    if status_anterior != alteracao.status_id:
+        publicar_status_computador(alteracao.computador, alteracao.status, status_anterior)
+    return alteracao
 
 
 # GET para pegar todas as alterações
-@router.get("/", response_model=List[HistoricoAlteracaoPublic])
-async def listar_alteracoes(db: SessionDep):
-    statement = select(HistoricoAlteracao)
-    alteracoes = db.exec(statement).all()
-    return alteracoes
+@router.get("/", response_model=List[HistoricoAlteracaoPublic], dependencies=[ETAG])
+async def listar_alteracoes(
+    db: AsyncSessionDep,
+    paginacao: PaginacaoDep,
+    response: Response,
+    computador_id: int | None = None,
+    tecnico_id: int | None = None,
+    status_id: int | None = None,
+    tipo_alteracao: TipoAlteracao | None = None,
+    data_desde: date | None = None,
+    data_ate: date | None = None,
+    ordenar_por: OrdenacaoAlteracao = OrdenacaoAlteracao.id,
+):
+    statement = consulta_alteracoes()
+    if computador_id is not None:
+        statement = statement.where(HistoricoAlteracao.computador_id == computador_id)
+    if tecnico_id is not None:
+        statement = statement.where(HistoricoAlteracao.tecnico_id == tecnico_id)
+    if status_id is not None:
+        statement = statement.where(HistoricoAlteracao.status_id == status_id)
+    if tipo_alteracao is not None:
+        statement = statement.where(HistoricoAlteracao.tipo_alteracao == tipo_alteracao)
+    if data_desde is not None:
+        statement = statement.where(HistoricoAlteracao.data_alteracao >= data_desde)
+    if data_ate is not None:
+        statement = statement.where(HistoricoAlteracao.data_alteracao <= data_ate)
 
+    linhas = await paginar(
+        db,
+        statement,
+        paginacao,
+        response,
+        coluna_ordem=getattr(HistoricoAlteracao, ordenar_por.value),
+        coluna_id=HistoricoAlteracao.id,
+    )
+    return responder(montar_alteracoes(linhas), response)
 
-# GET para pegar uma alteração específica
-@router.get("/{alteracao_id}", response_model=HistoricoAlteracaoPublic)
-async def obter_alteracao(alteracao_id: int, db: SessionDep):
-    statement = select(HistoricoAlteracao).where(
-        HistoricoAlteracao.id == alteracao_id
+
+# GET para exportar o histórico completo em streaming
+@router.get("/export")
+async def exportar_historico(
+    db: AsyncSessionDep,
+    formato: FormatoExportacao = Query(FormatoExportacao.csv, alias="format"),
+    data_desde: date | None = Query(None, alias="from"),
+    data_ate: date | None = Query(None, alias="to"),
+    laboratorio_id: int | None = None,
+):
+    statement = consulta_exportacao(data_desde, data_ate, laboratorio_id)
+    # A sessão da dependência é fechada antes do corpo ser enviado; a exportação
+    # usa uma sessão própria no mesmo engine, encerrada ao fim do stream.
+    sessao = AsyncSession(db.bind)
+    return StreamingResponse(
+        exportar_alteracoes(sessao, statement, formato),
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="alteracoes.{formato.value}"'},
     )
-    alteracao = db.exec(statement).first()
+
+
+# GET para pegar uma alteração específica
+@router.get("/{alteracao_id}", response_model=HistoricoAlteracaoPublic, dependencies=[ETAG])
+async def obter_alteracao(alteracao_id: int, db: AsyncSessionDep):
+    alteracao = await obter_historico(db, alteracao_id)
     
     if not alteracao:
         raise HTTPException(status_code=404, detail="Alteração não encontrada")
@@ -0,0 +1,45 @@
+from typing import Annotated, List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlmodel import select
+
+from app.deps import AsyncSessionDep, PaginacaoDep, condicional
+
+from app.database.models import ResultadoBusca
+from app.database.enums import Colecao, TipoResultadoBusca
+from app.services.busca import consulta_busca, termos_busca
+from app.services.paginacao import paginar
+
+
+router = APIRouter()
+
+# O índice reflete computadores, laboratórios e relatos
+ETAG = Depends(condicional(Colecao.computadores, Colecao.laboratorios, Colecao.relatos))
+
+
+# GET para buscar por hostname, patrimônio, marca, laboratório ou descrição de relato
+@router.get("", response_model=List[ResultadoBusca], dependencies=[ETAG])
+async def buscar(
+    db: AsyncSessionDep,
+    paginacao: PaginacaoDep,
+    response: Response,
+    q: Annotated[str, Query(max_length=200)],
+    tipo: Annotated[list[TipoResultadoBusca] | None, Query()] = None,
+):
+    # Cada palavra é buscada como prefixo: "lab0 dell" encontra "LAB01-PC03 (Dell)"
+    termos = termos_busca(q)
+    if not termos:
+        raise HTTPException(status_code=400, detail="Informe ao menos uma palavra para buscar.")
+
+    resultados = consulta_busca(db.get_bind().dialect.name, termos, tipo)
+    linhas = await paginar(
+        db,
+        select(*resultados.c),
+        paginacao,
+        response,
+        coluna_ordem=resultados.c.rank,
+        coluna_id=resultados.c.id,
+    )
+    return [
+        ResultadoBusca(tipo=linha.tipo, id=linha.entidade_id, titulo=linha.titulo, relevancia=-linha.rank)
+        for linha in linhas
+    ]
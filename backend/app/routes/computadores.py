@@ -1,32 +1,77 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from datetime import datetime, date
+from enum import Enum
 from typing import List
 
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from sqlmodel import select
-from app.deps import SessionDep
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.deps import AsyncSessionDep, PaginacaoDep, condicional
 
 from app.database.models import (
     Computador,
     ComputadorCreateNew,
     ComputadorPublic,
-    Laboratorio,
-    Status,
+    ResultadoImportacao,
 )
-from app.database.enums import TipoSistemaOperacional
+from app.database.enums import Colecao, TipoSistemaOperacional
+from app.services.eventos import publicar_status_computador
+from app.services.importacao import formato_do_content_type, importar_computadores
+from app.services.integridade import violou_chave_estrangeira, violou_unicidade
+from app.services.leitura import consulta_computadores, montar_computadores, responder
+from app.services.paginacao import paginar
+from app.services.referencias import buscar_laboratorio_id, buscar_status
+from app.services.resumo import ajustar_resumo
+from app.services.versoes import incrementar_versoes
 
 router = APIRouter()
 
+RESTRICAO_PATRIMONIO = "ix_computador_patrimonio"
+COLUNA_PATRIMONIO = "computador.patrimonio"
+
+# Coleções exibidas nas respostas de leitura; qualquer escrita nelas invalida o ETag
+ETAG = Depends(condicional(Colecao.computadores, Colecao.laboratorios))
+
+# Relacionamentos serializados por ComputadorPublic, carregados junto da consulta
+CARREGAR_RELACIONAMENTOS = (
+    joinedload(Computador.status),
+    joinedload(Computador.laboratorio),
+    joinedload(Computador.tecnico),
+)
+
+
+class OrdenacaoComputador(str, Enum):
+    id = "id"
+    patrimonio = "patrimonio"
+    hostname = "hostname"
+    ano_aquisicao = "ano_aquisicao"
+    dias_desde_alteracao = "dias_desde_alteracao"
+
+
+# `dias_desde_alteracao` é calculado na leitura, então a ordenação usa a data da
+# última alteração no sentido contrário; computadores sem data contam como os mais antigos
+DATA_ORDEM_DIAS = func.coalesce(Computador.data_ultima_alteracao, date.min).label("data_ordem_dias")
+
+
+async def obter_computador(db: AsyncSession, computador_id: int) -> Computador | None:
+    """Busca o computador já com os relacionamentos de ComputadorPublic."""
+    statement = (
+        select(Computador)
+        .options(*CARREGAR_RELACIONAMENTOS)
+        .where(Computador.id == computador_id)
+        .execution_options(populate_existing=True)
+    )
+    return (await db.exec(statement)).first()
+
 
 # 1. POST para criação de registro do computador
 @router.post("/", response_model=ComputadorPublic)
-def create_computador(dados: ComputadorCreateNew, db: SessionDep):
+async def create_computador(dados: ComputadorCreateNew, db: AsyncSessionDep):
     # Buscar laboratório pelo nome e local
-    statement = select(Laboratorio).where(
-        Laboratorio.nome == dados.laboratorio_nome,
-        Laboratorio.local == dados.laboratorio_local
-    )
-    laboratorio = db.exec(statement).first()
-    if not laboratorio:
+    laboratorio_id = await buscar_laboratorio_id(db, dados.laboratorio_nome, dados.laboratorio_local)
+    if laboratorio_id is None:
         raise HTTPException(status_code=404, detail="Laboratório não encontrado")
 
     # Criar computador com valores padrão
@@ -36,73 +81,137 @@ def create_computador(dados: ComputadorCreateNew, db: SessionDep):
         marca=dados.marca,
         ano_aquisicao=dados.ano_aquisicao,
         sistema_operacional=TipoSistemaOperacional(dados.sistema_operacional),
-        laboratorio_id=laboratorio.id,
+        laboratorio_id=laboratorio_id,
         status_id=1,  # Status padrão
         tecnico_id=dados.tecnico_id,
         data_ultima_alteracao=dados.data_ultima_alteracao,
         dias_desde_alteracao=0
     )
     db.add(novo_computador)
-    db.commit()
-    db.refresh(novo_computador)
-    return novo_computador
+    try:
+        await ajustar_resumo(
+            db, laboratorio_id, computadores=1, status={novo_computador.status_id: 1}
+        )
+        await incrementar_versoes(db, Colecao.computadores)
+        await db.commit()
+    except IntegrityError as erro:
+        await db.rollback()
+        if violou_unicidade(erro, RESTRICAO_PATRIMONIO, COLUNA_PATRIMONIO):
+            raise HTTPException(status_code=409, detail="Já existe um computador com este patrimônio.")
+        if violou_chave_estrangeira(erro):
+            # Laboratório e status já foram resolvidos; a referência vinda do cliente é `tecnico_id`
+            raise HTTPException(status_code=404, detail="Técnico não encontrado")
+        raise
+    return await obter_computador(db, novo_computador.id)
+
+
+# POST para importação em lote (CSV ou NDJSON enviado como corpo da requisição)
+@router.post("/bulk", response_model=ResultadoImportacao)
+async def importar_computadores_em_lote(request: Request, db: AsyncSessionDep):
+    """Cadastra vários computadores de uma vez.
+
+    O corpo é lido em streaming. Use `Content-Type: text/csv` (primeira linha
+    com os campos de ComputadorCreateNew) ou `application/x-ndjson` (um objeto
+    por linha). Linhas inválidas voltam em `erros` sem abortar as demais;
+    `total_erros` as conta mesmo quando a lista é truncada.
+    """
+    formato = formato_do_content_type(request.headers.get("content-type"))
+    return await importar_computadores(db, request.stream(), formato)
 
 
 # 2. PUT para alteração de registro do computador
 @router.put("/{computador_id}", response_model=ComputadorPublic)
-def alterar_computador(computador_id: int, status_nome: str, status_descricao: str, db: SessionDep):
+async def alterar_computador(
+    computador_id: int,
+    status_nome: str,
+    status_descricao: str,
+    db: AsyncSessionDep,
+):
     # Buscar o computador pelo ID
     statement = select(Computador).where(
         Computador.id == computador_id
     )
-    computador = db.exec(statement).first()
+    computador = (await db.exec(statement)).first()
     
     if not computador:
         raise HTTPException(status_code=404, detail="Computador não encontrado.")
     
     # Buscar o status pelo nome e descrição
-    statement = select(Status).where(
-        Status.nome == status_nome,
-        Status.descricao == status_descricao
-    )
-    status = db.exec(statement).first()
-    
+    status = await buscar_status(db, status_nome, status_descricao)
+
     if not status:
         raise HTTPException(status_code=404, detail="Status não encontrado.")
     
     # Atualizar os campos
-    computador.status_id = status.id
-    computador.data_ultima_alteracao = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(computador)
-    
+    status_anterior = computador.status_id
+    computador.status_id = status["id"]
+    computador.data_ultima_alteracao = datetime.utcnow().date()
+    computador.dias_desde_alteracao = 0
+    await ajustar_resumo(
+        db, computador.laboratorio_id, status={status_anterior: -1, computador.status_id: 1}
+    )
+    await incrementar_versoes(db, Colecao.computadores)
+
+    await db.commit()
+
+    computador = await obter_computador(db, computador.id)
+    if status_anterior != computador.status_id:
+        publicar_status_computador(computador, computador.status, status_anterior)
     return computador
 
 
 # 3. GET para pegar informações de todos os computadores
-@router.get("/", response_model=List[ComputadorPublic])
-def get_computadores(db: SessionDep):
-    statement = select(Computador)
-    computadores = db.exec(statement).all()
-    return computadores
+@router.get("/", response_model=List[ComputadorPublic], dependencies=[ETAG])
+async def get_computadores(
+    db: AsyncSessionDep,
+    paginacao: PaginacaoDep,
+    response: Response,
+    laboratorio_id: int | None = None,
+    status_id: int | None = None,
+    tecnico_id: int | None = None,
+    alterado_desde: date | None = None,
+    alterado_ate: date | None = None,
+    ordenar_por: OrdenacaoComputador = OrdenacaoComputador.id,
+):
+    statement = consulta_computadores()
+    if laboratorio_id is not None:
+        statement = statement.where(Computador.laboratorio_id == laboratorio_id)
+    if status_id is not None:
+        statement = statement.where(Computador.status_id == status_id)
+    if tecnico_id is not None:
+        statement = statement.where(Computador.tecnico_id == tecnico_id)
+    if alterado_desde is not None:
+        statement = statement.where(Computador.data_ultima_alteracao >= alterado_desde)
+    if alterado_ate is not None:
+        statement = statement.where(Computador.data_ultima_alteracao <= alterado_ate)
+
+    coluna_ordem = getattr(Computador, ordenar_por.value)
+    por_dias = ordenar_por == OrdenacaoComputador.dias_desde_alteracao
+    if por_dias:
+        # A coluna extra vem no fim da linha e é ignorada por `montar_computadores`
+        statement = statement.add_columns(DATA_ORDEM_DIAS)
+        coluna_ordem = DATA_ORDEM_DIAS
+
+    linhas = await paginar(
+        db,
+        statement,
+        paginacao,
+        response,
+        coluna_ordem=coluna_ordem,
+        coluna_id=Computador.id,
+        inverter=por_dias,
+    )
+    return responder(montar_computadores(linhas), response)
 
 
 # 4. GET para pegar informações de um computador específico
-@router.get("/{computador_id}", response_model=ComputadorPublic)
-def get_computador(computador_id: int, db: SessionDep):
+@router.get("/{computador_id}", response_model=ComputadorPublic, dependencies=[ETAG])
+async def get_computador(computador_id: int, db: AsyncSessionDep):
     # Buscar computador
-    statement = select(Computador).where(
-        Computador.id == computador_id
-    )
-    computador = db.exec(statement).first()
+    computador = await obter_computador(db, computador_id)
 
     if not computador:
         raise HTTPException(status_code=404, detail="Computador não encontrado")
 
-    # Atualizar dias desde a última alteração
-    computador.dias_desde_alteracao = (date.today() - computador.data_ultima_alteracao).days
-
-    db.commit()
-    db.refresh(computador)
+    # dias_desde_alteracao é calculado por ComputadorPublic na serialização
     return computador
\ No newline at end of file
@@ -0,0 +1,100 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+
+from app.config import settings
+from app.services.eventos import (
+    HEARTBEAT_JSON,
+    HEARTBEAT_SSE,
+    Assinatura,
+    barramento,
+    quadro_descartados,
+)
+
+router = APIRouter()
+
+# Repetível: ?laboratorio_id=1&laboratorio_id=2; ausente acompanha todos os laboratórios
+LaboratoriosQuery = Annotated[list[int] | None, Query(alias="laboratorio_id")]
+
+
+class MensagemAssinatura(BaseModel):
+    """Mensagem do cliente WebSocket para trocar os laboratórios acompanhados."""
+    laboratorios: list[int] | None = None
+
+
+async def quadros_sse(laboratorios: list[int] | None) -> AsyncIterator[bytes]:
+    with barramento.assinar(laboratorios) as assinatura:
+        # Envia os headers já na conexão e pede ao EventSource que reconecte em 5 s
+        yield b"retry: 5000\n\n"
+        while True:
+            eventos, descartados = await assinatura.proximos(settings.EVENTOS_HEARTBEAT_SEGUNDOS)
+            if descartados:
+                yield quadro_descartados(descartados)[1]
+            if eventos:
+                yield b"".join(evento.quadro_sse for evento in eventos)
+            elif not descartados:
+                yield HEARTBEAT_SSE
+
+
+# GET que mantém a conexão aberta e envia as alterações de status, alterações e relatos (SSE)
+@router.get("", response_class=StreamingResponse)
+async def transmitir_eventos(laboratorios: LaboratoriosQuery = None):
+    """Stream `text/event-stream` com os eventos dos laboratórios pedidos.
+
+    Cada evento tem `event` igual ao tipo e `data` com o JSON do evento. Um
+    evento `descartados` avisa que o cliente ficou para trás e deve recarregar
+    a listagem; comentários `: heartbeat` mantêm a conexão viva.
+    """
+    if barramento.lotado():
+        raise HTTPException(status_code=503, detail="Limite de conexões de eventos atingido.")
+    return StreamingResponse(
+        quadros_sse(laboratorios),
+        media_type="text/event-stream",
+        # Sem cache e sem o buffer de proxies como o nginx, que atrasariam os eventos
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def receber_mensagens(websocket: WebSocket, assinatura: Assinatura) -> None:
+    """Aplica as trocas de laboratórios pedidas pelo cliente até ele desconectar."""
+    try:
+        while True:
+            mensagem = MensagemAssinatura.model_validate_json(await websocket.receive_text())
+            barramento.alterar(assinatura, mensagem.laboratorios)
+    finally:
+        # Acorda o envio, que pode estar esperando o próximo heartbeat
+        assinatura.acordar()
+
+
+# WebSocket com os mesmos eventos; o cliente pode enviar {"laboratorios": [...]} para trocar a assinatura
+@router.websocket("/ws")
+async def eventos_websocket(websocket: WebSocket, laboratorios: LaboratoriosQuery = None):
+    if barramento.lotado():
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    await websocket.accept()
+
+    with barramento.assinar(laboratorios) as assinatura:
+        recebimento = asyncio.create_task(receber_mensagens(websocket, assinatura))
+        try:
+            while not recebimento.done():
+                eventos, descartados = await assinatura.proximos(settings.EVENTOS_HEARTBEAT_SEGUNDOS)
+                if descartados:
+                    await websocket.send_text(quadro_descartados(descartados)[0])
+                for evento in eventos:
+                    await websocket.send_text(evento.texto)
+                if not eventos and not descartados and not recebimento.done():
+                    await websocket.send_text(HEARTBEAT_JSON)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            recebimento.cancel()
+            resultado, = await asyncio.gather(recebimento, return_exceptions=True)
+
+    # Mensagem inválida do cliente: encerra avisando o motivo
+    if isinstance(resultado, ValidationError):
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason="Mensagem inválida.")
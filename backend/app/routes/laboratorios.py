@@ -1,60 +1,141 @@
+from enum import Enum
 from typing import List
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
 from sqlmodel import select
-from app.deps import SessionDep
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.deps import AsyncSessionDep, PaginacaoDep, condicional
 
 from app.database.models import (
     Laboratorio, 
     LaboratorioCreate, 
-    LaboratorioPublic
+    LaboratorioPublic,
+    ResumoLaboratorio,
+    ResumoLaboratorioPublic,
 )
+from app.database.enums import Colecao
+from app.services.leitura import consulta_laboratorios, montar_laboratorios, responder
+from app.services.paginacao import paginar
+from app.services.referencias import invalidar_laboratorios
+from app.services.resumo import montar_resumo
+from app.services.versoes import incrementar_versoes
 
 router = APIRouter()
 
+# Coleções exibidas nas respostas de leitura; qualquer escrita nelas invalida o ETag
+ETAG = Depends(condicional(Colecao.laboratorios, Colecao.computadores))
+ETAG_RESUMO = Depends(condicional(Colecao.laboratorios, Colecao.computadores, Colecao.relatos))
+
+# Relacionamentos serializados por LaboratorioPublic
+CARREGAR_RELACIONAMENTOS = (
+    selectinload(Laboratorio.computadores),
+    joinedload(Laboratorio.administrador),
+)
+
+
+class OrdenacaoLaboratorio(str, Enum):
+    id = "id"
+    nome = "nome"
+    local = "local"
+
+
+async def obter_laboratorio(db: AsyncSession, laboratorio_id: int) -> Laboratorio | None:
+    """Busca o laboratório já com os relacionamentos de LaboratorioPublic."""
+    statement = (
+        select(Laboratorio)
+        .options(*CARREGAR_RELACIONAMENTOS)
+        .where(Laboratorio.id == laboratorio_id)
+        .execution_options(populate_existing=True)
+    )
+    return (await db.exec(statement)).first()
+
+
+async def salvar_laboratorio(db: AsyncSession) -> None:
+    try:
+        await incrementar_versoes(db, Colecao.laboratorios)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Já existe um laboratório com este nome e local.")
+    await invalidar_laboratorios()
+
+
 # 1. POST para criação de um novo laboratório
 @router.post("/", response_model=LaboratorioPublic)
-def create_laboratorio(laboratorio: LaboratorioCreate, db: SessionDep):
+async def create_laboratorio(laboratorio: LaboratorioCreate, db: AsyncSessionDep):
     db_laboratorio = Laboratorio(
         nome=laboratorio.nome, 
         local=laboratorio.local, 
         administrador_id=laboratorio.administrador_id
     )
     db.add(db_laboratorio)
-    db.commit()
-    db.refresh(db_laboratorio)
-    return db_laboratorio
+    await salvar_laboratorio(db)
+    return await obter_laboratorio(db, db_laboratorio.id)
 
 # 2. PUT para alteração dos campos "local" e "nome"
 @router.put("/{laboratorio_id}", response_model=LaboratorioPublic)
-def update_laboratorio(laboratorio_id: int, laboratorio: LaboratorioCreate, db: SessionDep):
+async def update_laboratorio(laboratorio_id: int, laboratorio: LaboratorioCreate, db: AsyncSessionDep):
     statement = select(Laboratorio).where(
         Laboratorio.id == laboratorio_id
     )
-    db_laboratorio = db.exec(statement).first()
+    db_laboratorio = (await db.exec(statement)).first()
     
     if db_laboratorio is None:
         raise HTTPException(status_code=404, detail="Laboratório não encontrado")
     
     db_laboratorio.nome = laboratorio.nome
     db_laboratorio.local = laboratorio.local
-    db.commit()
-    db.refresh(db_laboratorio)
-    return db_laboratorio
+    await salvar_laboratorio(db)
+    return await obter_laboratorio(db, db_laboratorio.id)
 
 # 3. GET para pegar "nome" e "local" de todos os laboratórios cadastrados
-@router.get("/", response_model=List[LaboratorioPublic])
-def get_laboratorios(db: SessionDep):
-    statement = select(Laboratorio)
-    laboratorios = db.exec(statement).all()
-    return laboratorios
+@router.get("/", response_model=List[LaboratorioPublic], dependencies=[ETAG])
+async def get_laboratorios(
+    db: AsyncSessionDep,
+    paginacao: PaginacaoDep,
+    response: Response,
+    administrador_id: int | None = None,
+    local: str | None = None,
+    ordenar_por: OrdenacaoLaboratorio = OrdenacaoLaboratorio.id,
+):
+    statement = consulta_laboratorios()
+    if administrador_id is not None:
+        statement = statement.where(Laboratorio.administrador_id == administrador_id)
+    if local is not None:
+        statement = statement.where(Laboratorio.local == local)
 
-# 4. GET para pegar "nome" e "local" de um laboratório específico
-@router.get("/{laboratorio_id}", response_model=LaboratorioPublic)
-def get_laboratorio(laboratorio_id: int, db: SessionDep):
-    statement = select(Laboratorio).where(
-        Laboratorio.id == laboratorio_id
+    linhas = await paginar(
+        db,
+        statement,
+        paginacao,
+        response,
+        coluna_ordem=getattr(Laboratorio, ordenar_por.value),
+        coluna_id=Laboratorio.id,
     )
-    db_laboratorio = db.exec(statement).first()
+    return responder(await montar_laboratorios(db, linhas), response)
+
+# GET do painel: computadores por status e relatos abertos de cada laboratório
+@router.get("/resumo", response_model=List[ResumoLaboratorioPublic], dependencies=[ETAG_RESUMO])
+async def get_resumo_laboratorios(db: AsyncSessionDep, administrador_id: int | None = None):
+    """Lê os contadores mantidos pelas escritas, sem varrer computadores e relatos."""
+    statement = (
+        select(Laboratorio, ResumoLaboratorio)
+        .outerjoin(ResumoLaboratorio, ResumoLaboratorio.laboratorio_id == Laboratorio.id)
+        .order_by(Laboratorio.id)
+    )
+    if administrador_id is not None:
+        statement = statement.where(Laboratorio.administrador_id == administrador_id)
+
+    return [
+        montar_resumo(laboratorio, resumo)
+        for laboratorio, resumo in (await db.exec(statement)).all()
+    ]
+
+# 4. GET para pegar "nome" e "local" de um laboratório específico
+@router.get("/{laboratorio_id}", response_model=LaboratorioPublic, dependencies=[ETAG])
+async def get_laboratorio(laboratorio_id: int, db: AsyncSessionDep):
+    db_laboratorio = await obter_laboratorio(db, laboratorio_id)
 
     if db_laboratorio is None:
         raise HTTPException(status_code=404, detail="Laboratório não encontrado")
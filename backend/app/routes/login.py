@@ -15,47 +15,51 @@ from app.database.models import (
     Usuario,
     UsuarioPublic,
 )
-from app.deps import CurrentUsuario, SessionDep
+from app.deps import AsyncSessionDep, CurrentUsuario
 from app.services.usuarios import (
     authenticate,
+    busca_tipo_usuario,
+    cache_usuarios,
     create_access_token,
     get_user_by_email,
-    hash_password,
-    usuario_especifico,
-    verify_password,
 )
+from app.services.senhas import servico_senhas
 
 router = APIRouter()
 
 
 @router.post('/access-token', response_model=Token)
-def login_access_token(
-    db: SessionDep,
+async def login_access_token(
+    db: AsyncSessionDep,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ):
     """OAuth2 compatible token login, get an access token for future requests."""
-    usuario = authenticate(session=db, email=form_data.username, senha=form_data.password)
+    usuario = await authenticate(session=db, email=form_data.username, senha=form_data.password)
     if not usuario:
         raise HTTPException(status_code=400, detail='Email ou senha incorretos.')
-    _usuario_especifico, tipo_usuario = usuario_especifico(db, usuario)
-    return Token(access_token=create_access_token(usuario, _usuario_especifico, tipo_usuario))
+    tipo = await busca_tipo_usuario(db, usuario.id)
+    if tipo is None:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, 'Usuário sem perfil associado.')
+    id_especifico, tipo_usuario = tipo
+    return Token(access_token=create_access_token(usuario, id_especifico, tipo_usuario))
 
 
 @router.post('/atualizar-senha')
-def atualizar_senha(dados_nova_senha: NovaSenha, db: SessionDep):
-    usuario = db.get(Usuario, dados_nova_senha.usuario_id)
-    if verify_password(dados_nova_senha.senha, usuario.senha_hash):
+async def atualizar_senha(dados_nova_senha: NovaSenha, db: AsyncSessionDep):
+    usuario = await db.get(Usuario, dados_nova_senha.usuario_id)
+    if await servico_senhas.verificar(dados_nova_senha.senha, usuario.senha_hash):
         raise HTTPException(status.HTTP_400_BAD_REQUEST, 'Senha idêntica à anterior.')
-    usuario.senha_hash = hash_password(dados_nova_senha.senha)
-    db.commit()
-    db.refresh(usuario)
+    usuario.senha_hash = await servico_senhas.hash(dados_nova_senha.senha)
+    await db.commit()
+    await db.refresh(usuario)
+    cache_usuarios.invalidar(usuario.id)
     return usuario
 
 
 @router.post('/esqueci-senha')
-def recuperar_senha(dados: EsqueciSenha, db: SessionDep):
+async def recuperar_senha(dados: EsqueciSenha, db: AsyncSessionDep):
     email = dados.email
-    usuario = get_user_by_email(db, email)
+    usuario = await get_user_by_email(db, email)
 
     return {
         'message': (
@@ -78,7 +82,7 @@ def create_reset_token(user_id: int):
 
 
 @router.post('/redefinir-senha')
-async def reset_password(dados_reset: RecuperacaoSenha, db: SessionDep):
+async def reset_password(dados_reset: RecuperacaoSenha, db: AsyncSessionDep):
     """Reseta a senha de um usuário utilizando um token de recuperação.
 
     Rota utilizada no botão de redefinição de senha enviado por email,
@@ -89,7 +93,7 @@ async def reset_password(dados_reset: RecuperacaoSenha, db: SessionDep):
     ----
         dados_reset (RecuperacaoSenha): Dados necessários para a recuperação da senha,
             incluindo o token e a nova senha.
-        db (SessionDep): Sessão de banco de dados para realizar operações de persistência.
+        db (AsyncSessionDep): Sessão de banco de dados para realizar operações de persistência.
 
     Raises:
     ------
@@ -117,23 +121,24 @@ async def reset_password(dados_reset: RecuperacaoSenha, db: SessionDep):
             detail='Link inválido ou expirado. Solicite a recuperação de senha novamente.',
         )
 
-    hashed_password = hash_password(dados_reset.nova_senha)
-    usuario = db.get(Usuario, user_id)
+    hashed_password = await servico_senhas.hash(dados_reset.nova_senha)
+    usuario = await db.get(Usuario, user_id)
     usuario.senha_hash = hashed_password
-    db.commit()
+    await db.commit()
+    cache_usuarios.invalidar(usuario.id)
 
     return {'message': 'Senha redefinida com sucesso.'}
 
 
 @router.post('/trocar-senha')
-def change_password(dados: TrocaSenha, db: SessionDep, current_user: CurrentUsuario):
+async def change_password(dados: TrocaSenha, db: AsyncSessionDep, current_user: CurrentUsuario):
     """Troca a senha do usuário logado.
 
     Args:
     ----
         dados (NovaSenha): Dados necessários para a troca de senha, incluindo a senha atual
             e a nova senha.
-        db (SessionDep): Sessão de banco de dados para realizar operações de persistência.
+        db (AsyncSessionDep): Sessão de banco de dados para realizar operações de persistência.
         current_user (CurrentUsuario): Usuário autenticado.
 
     Raises:
@@ -145,10 +150,11 @@ def change_password(dados: TrocaSenha, db: SessionDep, current_user: CurrentUsua
         dict: Mensagem de sucesso indicando que a senha foi trocada com sucesso.
 
     """
-    usuario = db.get(Usuario, current_user.id)
-    if not verify_password(dados.senha_atual, usuario.senha_hash):
+    usuario = await db.get(Usuario, current_user.id)
+    if not await servico_senhas.verificar(dados.senha_atual, usuario.senha_hash):
         raise HTTPException(status_code=400, detail='Senha atual incorreta.')
 
-    usuario.senha_hash = hash_password(dados.nova_senha)
-    db.commit()
+    usuario.senha_hash = await servico_senhas.hash(dados.nova_senha)
+    await db.commit()
+    cache_usuarios.invalidar(usuario.id)
     return {'message': 'Senha alterada com sucesso.'}
\ No newline at end of file
@@ -1,29 +1,108 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
+from datetime import date
+from enum import Enum
+from typing import Annotated, List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import joinedload
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.deps import SessionDep
+from app.deps import AsyncSessionDep, CurrentAdministrador, CurrentTecnico, PaginacaoDep, condicional
 
 from app.database.models import (
     RelatoProblema, 
     RelatoProblemaCreate, 
     RelatoProblemaPublic,
     RelatoProblemaUpdate,
+    ReservaRelatos,
+    AuditoriaLote,
+    ResultadoAuditoriaLote,
     Computador,
-    Laboratorio
 )
+from app.database.enums import Colecao, ResultadoAuditoria, TipoEvento
+from app.services.auditoria import auditar_lote, auditar_relato
+from app.services.eventos import publicar_relato
+from app.services.fila_relatos import ordenacao, reservar_relatos
+from app.services.leitura import RespostaJSON, consulta_relatos, montar_relatos, responder
+from app.services.paginacao import Ordem, Paginacao, paginar
+from app.services.referencias import laboratorio_existe
+from app.services.resumo import ajustar_resumo
+from app.services.versoes import incrementar_versoes
 
 router = APIRouter()
 
+# Coleções exibidas nas respostas de leitura; qualquer escrita nelas invalida o ETag
+ETAG = Depends(condicional(Colecao.relatos, Colecao.computadores, Colecao.usuarios))
+
+# Relacionamentos serializados por RelatoProblemaPublic
+CARREGAR_RELACIONAMENTOS = (
+    joinedload(RelatoProblema.computador),
+    joinedload(RelatoProblema.usuario),
+    joinedload(RelatoProblema.tecnico),
+)
+
+
+class OrdenacaoRelato(str, Enum):
+    id = "id"
+    data_relato = "data_relato"
+
+
+# Máximo de relatos reservados por chamada a /claim
+MAXIMO_RESERVA = 50
+
+
+async def buscar_relato(session: AsyncSession, relato_id: int) -> RelatoProblema | None:
+    """Busca o relato já com os relacionamentos de RelatoProblemaPublic."""
+    statement = (
+        select(RelatoProblema)
+        .options(*CARREGAR_RELACIONAMENTOS)
+        .where(RelatoProblema.id == relato_id)
+        .execution_options(populate_existing=True)
+    )
+    return (await session.exec(statement)).first()
+
+
+async def listar_relatos(
+    session: AsyncSession,
+    paginacao: Paginacao,
+    response: Response,
+    auditada: bool,
+    computador_id: int | None,
+    usuario_id: int | None,
+    tecnico_id: int | None,
+    data_desde: date | None,
+    data_ate: date | None,
+    ordenar_por: OrdenacaoRelato,
+) -> RespostaJSON:
+    statement = consulta_relatos().where(RelatoProblema.auditada == auditada)
+    if computador_id is not None:
+        statement = statement.where(RelatoProblema.computador_id == computador_id)
+    if usuario_id is not None:
+        statement = statement.where(RelatoProblema.usuario_id == usuario_id)
+    if tecnico_id is not None:
+        statement = statement.where(RelatoProblema.tecnico_id == tecnico_id)
+    if data_desde is not None:
+        statement = statement.where(RelatoProblema.data_relato >= data_desde)
+    if data_ate is not None:
+        statement = statement.where(RelatoProblema.data_relato <= data_ate)
+
+    linhas = await paginar(
+        session,
+        statement,
+        paginacao,
+        response,
+        coluna_ordem=getattr(RelatoProblema, ordenar_por.value),
+        coluna_id=RelatoProblema.id,
+    )
+    return responder(montar_relatos(linhas), response)
+
 @router.post("/", response_model=RelatoProblemaPublic)
-def criar_relato(relato: RelatoProblemaCreate, db: SessionDep):
+async def criar_relato(relato: RelatoProblemaCreate, db: AsyncSessionDep):
     # Verificar se o computador existe no laboratório
-    computador = db.exec(select(Computador).where(Computador.id == relato.computador_id)).first()
+    computador = (await db.exec(select(Computador).where(Computador.id == relato.computador_id))).first()
     if not computador:
         raise HTTPException(status_code=404, detail="Computador não encontrado")
 
-    laboratorio = db.exec(select(Laboratorio).where(Laboratorio.id == computador.laboratorio_id)).first()
-    if not laboratorio:
+    if not await laboratorio_existe(db, computador.laboratorio_id):
         raise HTTPException(status_code=404, detail="Laboratório não encontrado")
 
     # Criar o relato
@@ -37,49 +116,126 @@ def criar_relato(relato: RelatoProblemaCreate, db: SessionDep):
     )
 
     db.add(novo_relato)
-    db.commit()
-    db.refresh(novo_relato)
+    await ajustar_resumo(db, computador.laboratorio_id, relatos_abertos=1)
+    await incrementar_versoes(db, Colecao.relatos)
+    await db.commit()
 
+    novo_relato = await buscar_relato(db, novo_relato.id)
+    publicar_relato(TipoEvento.relato_criado, novo_relato)
     return novo_relato
 
 
+# POST para o técnico autenticado reservar os próximos relatos pendentes da fila
+@router.post("/claim", response_model=ReservaRelatos)
+async def reservar_proximos_relatos(
+    tecnico: CurrentTecnico,
+    db: AsyncSessionDep,
+    n: Annotated[int, Query(ge=1, le=MAXIMO_RESERVA)] = 1,
+    ordenar_por: OrdenacaoRelato = OrdenacaoRelato.id,
+    ordem: Ordem = Ordem.asc,
+):
+    coluna_ordem = getattr(RelatoProblema, ordenar_por.value)
+    ids, reservado_ate = await reservar_relatos(db, tecnico.id, n, coluna_ordem, ordem)
+    await db.commit()
+
+    relatos = []
+    if ids:
+        statement = (
+            select(RelatoProblema)
+            .options(*CARREGAR_RELACIONAMENTOS)
+            .where(RelatoProblema.id.in_(ids))
+            .order_by(*ordenacao(coluna_ordem, ordem))
+        )
+        relatos = (await db.exec(statement)).all()
+    return {"reservado_ate": reservado_ate, "relatos": relatos}
+
+
+# PUT para auditar vários relatos em uma só transação (declarado antes de /{relato_id})
+@router.put("/lote", response_model=ResultadoAuditoriaLote)
+async def auditar_relatos_em_lote(
+    lote: AuditoriaLote,
+    _administrador: CurrentAdministrador,
+    db: AsyncSessionDep,
+):
+    data_auditada, resultados = await auditar_lote(db, lote)
+    auditados = sum(resultado == ResultadoAuditoria.auditado for resultado in resultados.values())
+    if auditados:
+        await incrementar_versoes(db, Colecao.relatos)
+    await db.commit()
+
+    return {
+        "data_auditada": data_auditada,
+        "auditados": auditados,
+        "itens": [{"id": relato_id, "resultado": resultado} for relato_id, resultado in resultados.items()],
+    }
+
+
 @router.put("/{relato_id}", response_model=RelatoProblemaPublic)
-def atualizar_relato(relato_id: int, relato: RelatoProblemaUpdate, db: SessionDep):
-    # Encontrar o relato pelo ID
-    db_relato = db.exec(select(RelatoProblema).where(RelatoProblema.id == relato_id)).first()
-    if not db_relato:
+async def atualizar_relato(
+    relato_id: int,
+    relato: RelatoProblemaUpdate,
+    tecnico: CurrentTecnico,
+    db: AsyncSessionDep,
+):
+    # O técnico vem do token; relatos já auditados ou reservados por outro técnico não mudam
+    resultado = await auditar_relato(db, relato_id, tecnico.id, relato)
+    if resultado == ResultadoAuditoria.nao_encontrado:
         raise HTTPException(status_code=404, detail="Relato não encontrado")
+    if resultado == ResultadoAuditoria.ja_auditado:
+        raise HTTPException(status_code=409, detail="Relato já auditado")
+    if resultado == ResultadoAuditoria.reservado:
+        raise HTTPException(status_code=409, detail="Relato reservado por outro técnico")
+    await incrementar_versoes(db, Colecao.relatos)
 
-    # Atualizar os campos do relato
-    db_relato.auditada = relato.auditada
-    db_relato.aceita = relato.aceita
-    db_relato.tecnico_id = relato.tecnico_id
-    db_relato.data_auditada = relato.data_auditada
-
-    db.commit()
-    db.refresh(db_relato)
+    await db.commit()
 
+    db_relato = await buscar_relato(db, relato_id)
+    publicar_relato(TipoEvento.relato_atualizado, db_relato)
     return db_relato
 
 
-@router.get("/", response_model=List[RelatoProblemaPublic])
-def obter_relatos(session: SessionDep):
+@router.get("/", response_model=List[RelatoProblemaPublic], dependencies=[ETAG])
+async def obter_relatos(
+    session: AsyncSessionDep,
+    paginacao: PaginacaoDep,
+    response: Response,
+    computador_id: int | None = None,
+    usuario_id: int | None = None,
+    tecnico_id: int | None = None,
+    data_desde: date | None = None,
+    data_ate: date | None = None,
+    ordenar_por: OrdenacaoRelato = OrdenacaoRelato.id,
+):
     # Obter relatos com campo auditada igual a False
-    relatos = session.exec(select(RelatoProblema).where(RelatoProblema.auditada == False)).all()
-    return relatos
+    return await listar_relatos(
+        session, paginacao, response, False,
+        computador_id, usuario_id, tecnico_id, data_desde, data_ate, ordenar_por,
+    )
 
 
-@router.get("/auditados", response_model=List[RelatoProblemaPublic])
-def obter_relatos_auditados(session: SessionDep):
+@router.get("/auditados", response_model=List[RelatoProblemaPublic], dependencies=[ETAG])
+async def obter_relatos_auditados(
+    session: AsyncSessionDep,
+    paginacao: PaginacaoDep,
+    response: Response,
+    computador_id: int | None = None,
+    usuario_id: int | None = None,
+    tecnico_id: int | None = None,
+    data_desde: date | None = None,
+    data_ate: date | None = None,
+    ordenar_por: OrdenacaoRelato = OrdenacaoRelato.id,
+):
     # Obter relatos com campo auditada igual a True
-    relatos = session.exec(select(RelatoProblema).where(RelatoProblema.auditada == True)).all()
-    return relatos
+    return await listar_relatos(
+        session, paginacao, response, True,
+        computador_id, usuario_id, tecnico_id, data_desde, data_ate, ordenar_por,
+    )
 
 
-@router.get("/{relato_id}", response_model=RelatoProblemaPublic)
-def obter_relato(relato_id: int, session: SessionDep):
+@router.get("/{relato_id}", response_model=RelatoProblemaPublic, dependencies=[ETAG])
+async def obter_relato(relato_id: int, session: AsyncSessionDep):
     # Obter relato específico pelo ID
-    relato = session.exec(select(RelatoProblema).where(RelatoProblema.id == relato_id)).first()
+    relato = await buscar_relato(session, relato_id)
     if not relato:
         raise HTTPException(status_code=404, detail="Relato não encontrado")
     
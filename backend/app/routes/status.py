@@ -3,7 +3,7 @@ from fastapi import APIRouter, HTTPException
 from sqlmodel import select
 from sqlalchemy.exc import IntegrityError
 
-from app.deps import SessionDep
+from app.deps import AsyncSessionDep
 
 from app.database.models import (
     Status, 
@@ -12,16 +12,17 @@ from app.database.models import (
 )
 
 from app.database.enums import StatusComputador
+from app.services.referencias import buscar_status, invalidar_status
 
 
 router = APIRouter()
 
 
 @router.post("/", response_model=StatusPublic)
-async def create_status(status: StatusCreate, db: SessionDep):
+async def create_status(status: StatusCreate, db: AsyncSessionDep):
     # Verifica se já existe um status com o mesmo nome
     stmt = select(Status).where(Status.nome == status.nome)
-    existing_status = db.exec(stmt).first()
+    existing_status = (await db.exec(stmt)).first()
     
     if existing_status:
         raise HTTPException(status_code=400, detail="Status com este nome já existe.")
@@ -31,34 +32,31 @@ async def create_status(status: StatusCreate, db: SessionDep):
     db.add(db_status)
     
     try:
-        db.commit()
-        db.refresh(db_status)
+        await db.commit()
+        await db.refresh(db_status)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao criar o status.")
-    
+    await invalidar_status()
+
     return db_status
 
 
 # GET para pegar todos os status de um tipo específico
 @router.get("/{status_nome}/", response_model=List[StatusPublic])
-async def listar_status(status_nome: StatusComputador, db: SessionDep):
+async def listar_status(status_nome: StatusComputador, db: AsyncSessionDep):
     statement = select(Status).where(
         Status.nome == status_nome
     )
-    status = db.exec(statement).all()
+    status = (await db.exec(statement)).all()
     return status
 
 
 # GET para pegar um status específico
 @router.get("/{status_nome}/{status_descricao}/", response_model=StatusPublic)
-async def obter_status(status_nome: StatusComputador, status_descricao: str, db: SessionDep):
-    statement = select(Status).where(
-        Status.nome == status_nome,
-        Status.descricao == status_descricao
-    )
-    status = db.exec(statement).first()
-    
+async def obter_status(status_nome: StatusComputador, status_descricao: str, db: AsyncSessionDep):
+    status = await buscar_status(db, status_nome.value, status_descricao)
+
     if not status:
         raise HTTPException(status_code=404, detail="Status não encontrado")
 
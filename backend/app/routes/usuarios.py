@@ -1,4 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from enum import Enum
+
+from fastapi import APIRouter, HTTPException, Response
+from sqlalchemy.orm import joinedload
 from sqlmodel import select
 
 from app.database.enums import TipoUsuario
@@ -20,72 +23,96 @@ from app.database.models import (
     UsuarioPublic,
 )
 from app.deps import (
-    CurrentUsuario,
-    SessionDep,
+    CurrentPapel,
+    PaginacaoDep,
+    AsyncSessionDep,
 )
+from app.services.paginacao import paginar
 from app.services.usuarios import (
     create_funcionario,
     create_usuario,
-    usuario_especifico,
+    get_funcionario_by_matricula,
 )
 
 router = APIRouter()
 
+
+class OrdenacaoUsuario(str, Enum):
+    id = 'id'
+    nome = 'nome'
+    email = 'email'
+
+
 @router.get('/', response_model=list[UsuarioPublic])
-def read_usuarios(*, db: SessionDep):
-    """Lê todos os usuários. Útil para verificação."""
+async def read_usuarios(
+    *,
+    db: AsyncSessionDep,
+    paginacao: PaginacaoDep,
+    response: Response,
+    ordenar_por: OrdenacaoUsuario = OrdenacaoUsuario.id,
+):
+    """Lê os usuários de forma paginada. Útil para verificação."""
     stmt = select(Usuario)
-    return db.exec(stmt).all()
+    return await paginar(
+        db,
+        stmt,
+        paginacao,
+        response,
+        coluna_ordem=getattr(Usuario, ordenar_por.value),
+        coluna_id=Usuario.id,
+    )
 
 
 @router.post('/', response_model=UsuarioPublic)
-def post_usuario(usuario: UsuarioCreate, db: SessionDep):
+async def post_usuario(usuario: UsuarioCreate, db: AsyncSessionDep):
     """Cria um usuário novo. Útil para verificação."""
-    return create_usuario(db, usuario)
+    return await create_usuario(db, usuario)
 
 
 @router.get('/perfil', response_model=AlunoPublic | TecnicoPublic | AdministradorPublic | ProfessorPublic)
-def read_usuario_perfil(db: SessionDep, current_usuario: CurrentUsuario):
+async def read_usuario_perfil(db: AsyncSessionDep, papel: CurrentPapel):
     """Retorna o atual usuário."""
-    usuario, tipo_usuario = usuario_especifico(db, current_usuario)
-    if tipo_usuario == TipoUsuario.tecnico:
-        usuario = Tecnico.model_validate(
+    usuario = await papel.carregar(db)
+    if usuario is None:
+        raise HTTPException(status_code=404, detail="Usuario não encontrado")
+    if papel.tipo_usuario == TipoUsuario.tecnico:
+        usuario = TecnicoPublic.model_validate(
             usuario,
         )
     return usuario
 
 
 @router.post('/tecnicos/', response_model=TecnicoPublic)
-def create_tecnico(
+async def create_tecnico(
     tecnico: TecnicoCreate,
-    db: SessionDep,
+    db: AsyncSessionDep,
 ):
-    return create_funcionario(db, TipoUsuario.tecnico, tecnico)
+    return await create_funcionario(db, TipoUsuario.tecnico, tecnico)
 
 
 @router.post('/administradores/', response_model=AdministradorPublic)
-def create_administrador(
+async def create_administrador(
     administrador: AdministradorCreate,
-    db: SessionDep,
+    db: AsyncSessionDep,
 ):
-    return create_funcionario(db, TipoUsuario.administrador, administrador)
+    return await create_funcionario(db, TipoUsuario.administrador, administrador)
 
 
 @router.post('/professores/', response_model=ProfessorPublic)
-def create_gestor(
+async def create_gestor(
     professor: ProfessorCreate,
-    db: SessionDep,
+    db: AsyncSessionDep,
 ):
-    return create_funcionario(db, TipoUsuario.professor, professor)
+    return await create_funcionario(db, TipoUsuario.professor, professor)
 
 
 @router.get("/tecnicos", response_model=list[TecnicoPublic])
-def get_tecnicos(db: SessionDep):
+async def get_tecnicos(db: AsyncSessionDep):
     """
     Retorna uma lista de técnicos.
     """
-    statement = select(Tecnico)
-    results = db.exec(statement).all()
+    statement = select(Tecnico).options(joinedload(Tecnico.usuario))
+    results = (await db.exec(statement)).all()
 
     if not results:
         raise HTTPException(status_code=404, detail="Nenhum técnico encontrado.")
@@ -94,12 +121,12 @@ def get_tecnicos(db: SessionDep):
 
 
 @router.get("/administradores", response_model=list[AdministradorPublic])
-def get_administradores(db: SessionDep):
+async def get_administradores(db: AsyncSessionDep):
     """
     Retorna uma lista de administradores.
     """
-    statement = select(Administrador)
-    results = db.exec(statement).all()
+    statement = select(Administrador).options(joinedload(Administrador.usuario))
+    results = (await db.exec(statement)).all()
 
     if not results:
         raise HTTPException(status_code=404, detail="Nenhum administrador encontrado.")
@@ -108,12 +135,12 @@ def get_administradores(db: SessionDep):
 
 
 @router.get("/professores", response_model=list[ProfessorPublic])
-def get_professores(db: SessionDep):
+async def get_professores(db: AsyncSessionDep):
     """
     Retorna uma lista de professores.
     """
-    statement = select(Professor)
-    results = db.exec(statement).all()
+    statement = select(Professor).options(joinedload(Professor.usuario))
+    results = (await db.exec(statement)).all()
 
     if not results:
         raise HTTPException(status_code=404, detail="Nenhum professor encontrado.")
@@ -121,15 +148,29 @@ def get_professores(db: SessionDep):
     return results
 
 
+@router.get(
+    '/funcionarios/{matricula}',
+    response_model=TecnicoPublic | AdministradorPublic | ProfessorPublic,
+)
+async def get_funcionario(matricula: str, db: AsyncSessionDep):
+    """
+    Busca um técnico, administrador ou professor pela matrícula.
+    """
+    funcionario = await get_funcionario_by_matricula(db, matricula)
+    if funcionario is None:
+        raise HTTPException(status_code=404, detail="Funcionário não encontrado.")
+    return funcionario
+
+
 @router.post('/alunos/', response_model=AlunoPublic)
-def create_aluno(aluno: AlunoCreate, db: SessionDep):
-    usuario = create_usuario(db, aluno)
+async def create_aluno(aluno: AlunoCreate, db: AsyncSessionDep):
+    usuario = await create_usuario(db, aluno)
     aluno_db = Aluno.model_validate(
         aluno,
         update={'usuario_id': usuario.id},
     )
     db.add(aluno_db)
-    db.commit()
-    db.refresh(aluno_db)
+    await db.commit()
+    await db.refresh(aluno_db, ['usuario'])
     return aluno_db
 
@@ -0,0 +1,130 @@
+"""Auditoria de relatos, um a um (`PUT /relato-problemas/{id}`) ou em lote
+(`PUT /relato-problemas/lote`).
+
+Cada auditoria é um único UPDATE condicional, então dois técnicos nunca
+auditam o mesmo relato. O lote inteiro é um único UPDATE com RETURNING na transação da requisição:
+com uma lista de itens, `aceita` e `tecnico_id` vêm de expressões CASE sobre
+o id; com um filtro, os valores são os mesmos para todos os relatos. Só são
+auditados relatos abertos e sem reserva válida de outro técnico (ver
+`fila_relatos`); na lista de itens, os demais aparecem no resultado com o
+motivo. Auditar um relato encerra a reserva dele.
+"""
+from collections import Counter
+from datetime import date
+
+from sqlalchemy import case, false, true, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.enums import ResultadoAuditoria
+from app.database.models import AuditoriaLote, Computador, RelatoProblema, RelatoProblemaUpdate
+from app.services.fila_relatos import agora, sem_reserva_de_outro
+from app.services.resumo import ajustar_resumo
+
+
+async def _ajustar_resumos(session: AsyncSession, computadores: list[int | None]) -> None:
+    """Desconta dos resumos os relatos auditados, agrupados por laboratório."""
+    por_computador = Counter(computadores)
+    statement = select(Computador.id, Computador.laboratorio_id).where(
+        Computador.id.in_([computador_id for computador_id in por_computador if computador_id is not None])
+    )
+    por_laboratorio: Counter[int] = Counter()
+    for computador_id, laboratorio_id in await session.exec(statement):
+        por_laboratorio[laboratorio_id] += por_computador[computador_id]
+    for laboratorio_id, quantidade in por_laboratorio.items():
+        await ajustar_resumo(session, laboratorio_id, relatos_abertos=-quantidade)
+
+
+async def _motivos(session: AsyncSession, ids: list[int]) -> dict[int, ResultadoAuditoria]:
+    """Por que os relatos de `ids` não foram auditados."""
+    motivos = {relato_id: ResultadoAuditoria.nao_encontrado for relato_id in ids}
+    statement = select(RelatoProblema.id, RelatoProblema.auditada).where(RelatoProblema.id.in_(ids))
+    for relato_id, auditada in await session.exec(statement):
+        motivos[relato_id] = ResultadoAuditoria.ja_auditado if auditada else ResultadoAuditoria.reservado
+    return motivos
+
+
+async def auditar_relato(
+    session: AsyncSession, relato_id: int, tecnico_id: int, relato: RelatoProblemaUpdate,
+) -> ResultadoAuditoria:
+    """Aplica `relato` ao relato aberto `relato_id` em nome de `tecnico_id`.
+
+    Não confirma a transação: o chamador incrementa as versões e faz o commit.
+    """
+    valores = {
+        "auditada": relato.auditada,
+        "aceita": relato.aceita,
+        "tecnico_id": tecnico_id,
+        "data_auditada": relato.data_auditada,
+    }
+    if relato.auditada:
+        valores.update(reservado_por_id=None, reservado_ate=None)
+    auditado = (await session.exec(
+        update(RelatoProblema)
+        .where(
+            RelatoProblema.id == relato_id,
+            RelatoProblema.auditada == false(),
+            sem_reserva_de_outro(tecnico_id, agora()),
+        )
+        .values(**valores)
+        .returning(RelatoProblema.computador_id)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if auditado is None:
+        return (await _motivos(session, [relato_id]))[relato_id]
+    if relato.auditada:
+        await _ajustar_resumos(session, [auditado.computador_id])
+    return ResultadoAuditoria.auditado
+
+
+async def auditar_lote(
+    session: AsyncSession, lote: AuditoriaLote,
+) -> tuple[date, dict[int, ResultadoAuditoria]]:
+    """Audita os relatos do lote e retorna a data usada e o resultado por id.
+
+    Os resultados seguem a ordem dos itens; com filtro, a ordem dos ids.
+
+    Não confirma a transação: o chamador incrementa as versões e faz o commit.
+    """
+    inicio = agora()
+    data_auditada = lote.data_auditada or date.today()
+    statement = (
+        update(RelatoProblema)
+        .where(RelatoProblema.auditada == false())
+        .values(auditada=true(), data_auditada=data_auditada, reservado_por_id=None, reservado_ate=None)
+        .returning(RelatoProblema.id, RelatoProblema.computador_id)
+        .execution_options(synchronize_session=False)
+    )
+
+    if lote.itens:
+        # Ids repetidos: vale o último item
+        itens = {item.id: item for item in lote.itens}
+        tecnico_id = case({i: item.tecnico_id for i, item in itens.items()}, value=RelatoProblema.id)
+        statement = statement.where(
+            RelatoProblema.id.in_(itens),
+            sem_reserva_de_outro(tecnico_id, inicio),
+        ).values(
+            aceita=case({i: item.aceita for i, item in itens.items()}, value=RelatoProblema.id),
+            tecnico_id=tecnico_id,
+        )
+    else:
+        statement = statement.where(sem_reserva_de_outro(lote.tecnico_id, inicio)).values(
+            aceita=lote.aceita, tecnico_id=lote.tecnico_id,
+        )
+        if lote.filtro.computador_id is not None:
+            statement = statement.where(RelatoProblema.computador_id == lote.filtro.computador_id)
+        if lote.filtro.laboratorio_id is not None:
+            statement = statement.where(RelatoProblema.computador_id.in_(
+                select(Computador.id).where(Computador.laboratorio_id == lote.filtro.laboratorio_id)
+            ))
+
+    auditados = (await session.exec(statement)).all()
+    resultados = {relato_id: ResultadoAuditoria.auditado for relato_id, _ in auditados}
+    if auditados:
+        await _ajustar_resumos(session, [computador_id for _, computador_id in auditados])
+    if lote.itens:
+        pendentes = [relato_id for relato_id in itens if relato_id not in resultados]
+        if pendentes:
+            resultados.update(await _motivos(session, pendentes))
+    ordem = itens if lote.itens else sorted(resultados)
+    return data_auditada, {relato_id: resultados[relato_id] for relato_id in ordem}
@@ -0,0 +1,229 @@
+"""Índice de busca textual sobre computadores, laboratórios e relatos.
+
+Os textos pesquisáveis ficam em uma única tabela `busca`, com uma linha por
+entidade: no SQLite é uma tabela virtual FTS5 (ranking por `bm25`), no
+Postgres uma tabela com `tsvector` e índice GIN (ranking por `ts_rank`).
+Triggers no banco mantêm o índice em dia a cada INSERT/UPDATE/DELETE das
+tabelas de origem, então rotas, importação em lote e o gerador sintético não
+precisam fazer nada. A tabela não está nos modelos: é criada junto com o
+`metadata` (evento `after_create`) e pela migração que preenche o índice.
+
+O id de cada linha codifica a entidade (`id * 4 + código do tipo`), o que
+permite apagar e reindexar uma entidade sem varrer o índice.
+"""
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from sqlalchemy import Connection, Float, Integer, String, column, event, func, literal_column, table
+from sqlmodel import SQLModel, select
+
+from app.database.enums import TipoResultadoBusca
+
+MAXIMO_TERMOS = 8
+TAMANHO_TITULO = 120
+
+
+@dataclass(frozen=True)
+class Fonte:
+    """Tabela de origem: o que é indexado e como a linha aparece nos resultados."""
+    tipo: TipoResultadoBusca
+    codigo: int
+    tabela: str
+    colunas: tuple[str, ...]
+    titulo: str  # expressão SQL sobre a linha `{r}`
+
+    def expressao_titulo(self, registro: str) -> str:
+        return self.titulo.format(r=registro)
+
+    def expressao_texto(self, registro: str) -> str:
+        return " || ' ' || ".join(f"coalesce({registro}.{coluna}, '')" for coluna in self.colunas)
+
+    def expressao_id(self, registro: str) -> str:
+        return f'{registro}.id * 4 + {self.codigo}'
+
+
+FONTES = (
+    Fonte(
+        TipoResultadoBusca.computador, 1, 'computador', ('hostname', 'patrimonio', 'marca'),
+        "{r}.hostname || ' (' || {r}.patrimonio || ')'",
+    ),
+    Fonte(
+        TipoResultadoBusca.laboratorio, 2, 'laboratorio', ('nome', 'local'),
+        "{r}.nome || ' - ' || {r}.local",
+    ),
+    Fonte(
+        TipoResultadoBusca.relato, 3, 'relato_problema', ('descricao',),
+        f"substr(coalesce({{r}}.descricao, ''), 1, {TAMANHO_TITULO})",
+    ),
+)
+
+# A tabela `busca` tem colunas diferentes em cada banco
+busca_fts = table(
+    'busca',
+    column('rowid', Integer),
+    column('texto', String),
+    column('titulo', String),
+    column('tipo', String),
+    column('entidade_id', Integer),
+)
+busca_tsvector = table(
+    'busca',
+    column('id', Integer),
+    column('tipo', String),
+    column('entidade_id', Integer),
+    column('titulo', String),
+    column('documento'),
+)
+
+
+# --------------------------------------------------------------------------------
+# DDL
+
+
+def _ddl_sqlite() -> list[str]:
+    comandos = [
+        # Só `texto` é indexado; `titulo`, `tipo` e `entidade_id` acompanham o resultado
+        "CREATE VIRTUAL TABLE IF NOT EXISTS busca USING fts5("
+        "texto, titulo UNINDEXED, tipo UNINDEXED, entidade_id UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    ]
+    for fonte in FONTES:
+        def inserir(registro: str) -> str:
+            return (
+                'INSERT INTO busca (rowid, texto, titulo, tipo, entidade_id) VALUES ('
+                f'{fonte.expressao_id(registro)}, {fonte.expressao_texto(registro)}, '
+                f"{fonte.expressao_titulo(registro)}, '{fonte.tipo.value}', {registro}.id);"
+            )
+        apagar = f'DELETE FROM busca WHERE rowid = {fonte.expressao_id("OLD")};'
+        colunas = ', '.join(fonte.colunas)
+        comandos += [
+            f'CREATE TRIGGER IF NOT EXISTS busca_{fonte.tabela}_insert AFTER INSERT ON {fonte.tabela} '
+            f'BEGIN {inserir("NEW")} END',
+            f'CREATE TRIGGER IF NOT EXISTS busca_{fonte.tabela}_update AFTER UPDATE OF {colunas} '
+            f'ON {fonte.tabela} BEGIN {apagar} {inserir("NEW")} END',
+            f'CREATE TRIGGER IF NOT EXISTS busca_{fonte.tabela}_delete AFTER DELETE ON {fonte.tabela} '
+            f'BEGIN {apagar} END',
+        ]
+    return comandos
+
+
+def _ddl_postgresql() -> list[str]:
+    comandos = [
+        'CREATE TABLE IF NOT EXISTS busca ('
+        'id bigint PRIMARY KEY, tipo varchar NOT NULL, entidade_id integer NOT NULL, '
+        'titulo varchar NOT NULL, documento tsvector NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS ix_busca_documento ON busca USING gin (documento)',
+    ]
+    for fonte in FONTES:
+        comandos += [
+            f'CREATE OR REPLACE FUNCTION busca_{fonte.tabela}() RETURNS trigger LANGUAGE plpgsql AS $$\n'
+            'BEGIN\n'
+            "    IF TG_OP <> 'INSERT' THEN\n"
+            f'        DELETE FROM busca WHERE id = {fonte.expressao_id("OLD")};\n'
+            '    END IF;\n'
+            "    IF TG_OP <> 'DELETE' THEN\n"
+            '        INSERT INTO busca (id, tipo, entidade_id, titulo, documento) VALUES (\n'
+            f"            {fonte.expressao_id('NEW')}, '{fonte.tipo.value}', NEW.id,\n"
+            f"            {fonte.expressao_titulo('NEW')}, to_tsvector('simple', {fonte.expressao_texto('NEW')}));\n"
+            '    END IF;\n'
+            '    RETURN NULL;\n'
+            'END $$',
+            f'DROP TRIGGER IF EXISTS busca_{fonte.tabela} ON {fonte.tabela}',
+            f'CREATE TRIGGER busca_{fonte.tabela} '
+            f'AFTER INSERT OR DELETE OR UPDATE OF {", ".join(fonte.colunas)} ON {fonte.tabela} '
+            f'FOR EACH ROW EXECUTE FUNCTION busca_{fonte.tabela}()',
+        ]
+    return comandos
+
+
+def criar_indice_busca(conn: Connection) -> None:
+    """Cria a tabela `busca` e os triggers de sincronização, se ainda não existirem."""
+    comandos = _ddl_postgresql() if conn.dialect.name == 'postgresql' else _ddl_sqlite()
+    for comando in comandos:
+        conn.exec_driver_sql(comando)
+
+
+@event.listens_for(SQLModel.metadata, 'after_create')
+def _criar_com_metadata(_metadata, conn: Connection, **_kwargs) -> None:
+    # `create_all` (testes, esquema inicial) também cria o índice e os triggers
+    criar_indice_busca(conn)
+
+
+def _remover_triggers(conn: Connection) -> None:
+    for fonte in FONTES:
+        if conn.dialect.name == 'postgresql':
+            conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS busca_{fonte.tabela} ON {fonte.tabela}')
+        else:
+            for operacao in ('insert', 'update', 'delete'):
+                conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS busca_{fonte.tabela}_{operacao}')
+
+
+@contextmanager
+def indexacao_adiada(conn: Connection) -> Iterator[None]:
+    """Desliga os triggers durante uma carga em massa e reindexa tudo de uma vez no fim.
+
+    Um único INSERT ... SELECT é bem mais rápido que atualizar o índice linha a
+    linha. Deve ser usado dentro da transação da carga.
+    """
+    _remover_triggers(conn)
+    yield
+    criar_indice_busca(conn)
+    reconstruir_indice_busca(conn)
+
+
+def reconstruir_indice_busca(conn: Connection) -> None:
+    """Reindexa todas as linhas das tabelas de origem."""
+    conn.exec_driver_sql('DELETE FROM busca')
+    for fonte in FONTES:
+        if conn.dialect.name == 'postgresql':
+            conn.exec_driver_sql(
+                'INSERT INTO busca (id, tipo, entidade_id, titulo, documento) '
+                f"SELECT {fonte.expressao_id('r')}, '{fonte.tipo.value}', r.id, {fonte.expressao_titulo('r')}, "
+                f"to_tsvector('simple', {fonte.expressao_texto('r')}) FROM {fonte.tabela} r"
+            )
+        else:
+            conn.exec_driver_sql(
+                'INSERT INTO busca (rowid, texto, titulo, tipo, entidade_id) '
+                f"SELECT {fonte.expressao_id('r')}, {fonte.expressao_texto('r')}, "
+                f"{fonte.expressao_titulo('r')}, '{fonte.tipo.value}', r.id FROM {fonte.tabela} r"
+            )
+
+
+# --------------------------------------------------------------------------------
+# Consulta
+
+
+def termos_busca(q: str) -> list[str]:
+    """Palavras de `q`, em minúsculas; cada uma é buscada como prefixo."""
+    return re.findall(r'[^\W_]+', q.lower())[:MAXIMO_TERMOS]
+
+
+def consulta_busca(dialeto: str, termos: list[str], tipos: list[TipoResultadoBusca] | None = None):
+    """Subconsulta dos resultados com `id`, `tipo`, `entidade_id`, `titulo` e `rank`.
+
+    Todos os termos precisam aparecer (AND), como prefixo de alguma palavra.
+    O `rank` é menor nos resultados mais relevantes, nos dois bancos.
+    """
+    if dialeto == 'postgresql':
+        indice = busca_tsvector
+        tsquery = func.to_tsquery('simple', ' & '.join(f'{termo}:*' for termo in termos))
+        rank = -func.ts_rank(indice.c.documento, tsquery)
+        filtro = indice.c.documento.op('@@')(tsquery)
+        id_linha = indice.c.id
+    else:
+        indice = busca_fts
+        rank = func.bm25(literal_column('busca'))
+        filtro = indice.c.texto.op('MATCH')(' '.join(f'"{termo}"*' for termo in termos))
+        id_linha = indice.c.rowid
+    statement = select(
+        id_linha.label('id'),
+        indice.c.tipo,
+        indice.c.entidade_id,
+        indice.c.titulo,
+        rank.cast(Float).label('rank'),
+    ).where(filtro)
+    if tipos:
+        statement = statement.where(indice.c.tipo.in_([tipo.value for tipo in tipos]))
+    return statement.subquery('resultados')
@@ -0,0 +1,235 @@
+"""Caches com expiração (TTL) e estatísticas de acerto.
+
+- `CacheTTL`: cache LRU síncrono, em memória do processo.
+- `CacheLeitura`: cache read-through assíncrono sobre um `BackendCache`
+  plugável: memória do processo (padrão) ou um servidor compatível com Redis,
+  compartilhado entre workers. Os valores guardados devem ser serializáveis em
+  JSON para funcionar com qualquer backend.
+"""
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from app.config import settings
+
+# Todos os caches criados, por nome, para exposição das estatísticas.
+caches: dict[str, 'CacheTTL | CacheLeitura'] = {}
+
+
+class ArmazenamentoLRU:
+    """Dicionário limitado a `tamanho_maximo` entradas, cada uma com prazo de validade."""
+
+    def __init__(self, tamanho_maximo: int) -> None:
+        self.tamanho_maximo = tamanho_maximo
+        self._entradas: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave: Hashable) -> Any | None:
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada[0] <= time.monotonic():
+                if entrada is not None:
+                    del self._entradas[chave]
+                return None
+            self._entradas.move_to_end(chave)
+            return entrada[1]
+
+    def set(self, chave: Hashable, valor: Any, ttl_segundos: float) -> None:
+        with self._lock:
+            self._entradas[chave] = (time.monotonic() + ttl_segundos, valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.tamanho_maximo:
+                self._entradas.popitem(last=False)
+
+    def delete(self, chave: Hashable) -> None:
+        with self._lock:
+            self._entradas.pop(chave, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+class CacheTTL:
+    """Cache LRU síncrono limitado a `tamanho_maximo` entradas com TTL."""
+
+    def __init__(self, nome: str, tamanho_maximo: int, ttl_segundos: float) -> None:
+        self.nome = nome
+        self.ttl_segundos = ttl_segundos
+        self.hits = 0
+        self.misses = 0
+        self._armazenamento = ArmazenamentoLRU(tamanho_maximo)
+        caches[nome] = self
+
+    def get(self, chave: Hashable) -> Any | None:
+        valor = self._armazenamento.get(chave)
+        if valor is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return valor
+
+    def set(self, chave: Hashable, valor: Any, expira_em: float | None = None) -> None:
+        """Guarda `valor`; `expira_em` (epoch em segundos) limita o TTL padrão."""
+        ttl = self.ttl_segundos
+        if expira_em is not None:
+            ttl = min(ttl, expira_em - time.time())
+        if ttl > 0:
+            self._armazenamento.set(chave, valor, ttl)
+
+    def invalidar(self, chave: Hashable) -> None:
+        self._armazenamento.delete(chave)
+
+    def limpar(self) -> None:
+        self._armazenamento.clear()
+
+    def estatisticas(self) -> dict[str, int | float]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'tamanho': len(self._armazenamento),
+        }
+
+
+class BackendCache(ABC):
+    """Onde `CacheLeitura` guarda os valores. As chaves são strings."""
+
+    @abstractmethod
+    async def get(self, chave: str) -> Any | None: ...
+
+    @abstractmethod
+    async def set(self, chave: str, valor: Any, ttl_segundos: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, chave: str) -> None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+    def tamanho(self) -> int | None:
+        """Número de entradas, quando o backend sabe informar sem I/O."""
+        return None
+
+
+class BackendMemoria(BackendCache):
+    """LRU na memória do processo; cada worker tem a sua cópia."""
+
+    def __init__(self, tamanho_maximo: int) -> None:
+        self._armazenamento = ArmazenamentoLRU(tamanho_maximo)
+
+    async def get(self, chave: str) -> Any | None:
+        return self._armazenamento.get(chave)
+
+    async def set(self, chave: str, valor: Any, ttl_segundos: float) -> None:
+        self._armazenamento.set(chave, valor, ttl_segundos)
+
+    async def delete(self, chave: str) -> None:
+        self._armazenamento.delete(chave)
+
+    async def clear(self) -> None:
+        self._armazenamento.clear()
+
+    def tamanho(self) -> int | None:
+        return len(self._armazenamento)
+
+
+class BackendRedis(BackendCache):
+    """Servidor compatível com Redis (Redis, Valkey, KeyDB...) compartilhado entre workers.
+
+    Requer o pacote opcional `redis`. As chaves ficam sob o prefixo
+    `cache:<nome>:` e os valores são gravados em JSON.
+    """
+
+    def __init__(self, nome: str, url: str, cliente: Any | None = None) -> None:
+        self.prefixo = f'cache:{nome}:'
+        if cliente is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as exc:
+                raise RuntimeError(
+                    "CACHE_BACKEND='redis' requer o pacote opcional `redis`."
+                ) from exc
+            cliente = Redis.from_url(url)
+        self.cliente = cliente
+
+    async def get(self, chave: str) -> Any | None:
+        valor = await self.cliente.get(self.prefixo + chave)
+        return None if valor is None else json.loads(valor)
+
+    async def set(self, chave: str, valor: Any, ttl_segundos: float) -> None:
+        await self.cliente.set(
+            self.prefixo + chave,
+            json.dumps(valor),
+            px=max(1, int(ttl_segundos * 1000)),
+        )
+
+    async def delete(self, chave: str) -> None:
+        await self.cliente.delete(self.prefixo + chave)
+
+    async def clear(self) -> None:
+        chaves = [chave async for chave in self.cliente.scan_iter(match=self.prefixo + '*')]
+        if chaves:
+            await self.cliente.delete(*chaves)
+
+
+def criar_backend(nome: str, tamanho_maximo: int) -> BackendCache:
+    """Backend configurado em `settings.CACHE_BACKEND`."""
+    if settings.CACHE_BACKEND == 'redis':
+        return BackendRedis(nome, settings.CACHE_REDIS_URL)
+    if settings.CACHE_BACKEND == 'memoria':
+        return BackendMemoria(tamanho_maximo)
+    raise ValueError(f'CACHE_BACKEND desconhecido: {settings.CACHE_BACKEND!r}')
+
+
+class CacheLeitura:
+    """Cache read-through: em um miss, carrega o valor e guarda o resultado.
+
+    Resultados `None` (não encontrado) não são guardados, então criar o registro
+    não exige invalidação; alterações e remoções sim.
+    """
+
+    def __init__(self, nome: str, backend: BackendCache, ttl_segundos: float) -> None:
+        self.nome = nome
+        self.backend = backend
+        self.ttl_segundos = ttl_segundos
+        self.hits = 0
+        self.misses = 0
+        caches[nome] = self
+
+    async def obter(self, chave: str, carregar: Callable[[], Awaitable[Any | None]]) -> Any | None:
+        valor = await self.backend.get(chave)
+        if valor is not None:
+            self.hits += 1
+            return valor
+        self.misses += 1
+        valor = await carregar()
+        if valor is not None:
+            await self.backend.set(chave, valor, self.ttl_segundos)
+        return valor
+
+    async def invalidar(self, chave: str) -> None:
+        await self.backend.delete(chave)
+
+    async def limpar(self) -> None:
+        await self.backend.clear()
+
+    def estatisticas(self) -> dict[str, int | float]:
+        total = self.hits + self.misses
+        estatisticas = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+        tamanho = self.backend.tamanho()
+        if tamanho is not None:
+            estatisticas['tamanho'] = tamanho
+        return estatisticas
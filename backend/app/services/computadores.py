@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from datetime import date
+
+from sqlalchemy import Integer, cast, func, literal, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.models import Computador
+from app.database.utils import async_engine
+
+logger = logging.getLogger('app.computadores')
+
+
+def expressao_dias_desde_alteracao(dialeto: str, hoje: date):
+    """Expressão SQL equivalente a `(hoje - data_ultima_alteracao).days`."""
+    if dialeto == 'sqlite':
+        return cast(
+            func.julianday(hoje.isoformat()) - func.julianday(Computador.data_ultima_alteracao),
+            Integer,
+        )
+    # No Postgres, date - date já resulta em um inteiro de dias.
+    return literal(hoje) - Computador.data_ultima_alteracao
+
+
+async def recalcular_dias_desde_alteracao(session: AsyncSession) -> int:
+    """Atualiza `dias_desde_alteracao` de todos os computadores em um único UPDATE.
+
+    As respostas da API já derivam o valor na serialização; a coluna só precisa
+    estar em dia para quem filtra ou ordena por ela. Retorna o número de linhas
+    atualizadas.
+    """
+    dias = expressao_dias_desde_alteracao(session.get_bind().dialect.name, date.today())
+    stmt = (
+        update(Computador)
+        .where(Computador.data_ultima_alteracao.is_not(None))
+        .values(dias_desde_alteracao=dias)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.exec(stmt)
+    await session.commit()
+    return result.rowcount
+
+
+async def recalculo_periodico(intervalo_segundos: float) -> None:
+    """Executa `recalcular_dias_desde_alteracao` a cada `intervalo_segundos`.
+
+    Uma falha (banco indisponível, lock) é registrada e a próxima rodada acontece
+    normalmente; só o cancelamento encerra o laço.
+    """
+    while True:
+        try:
+            async with AsyncSession(async_engine) as session:
+                await recalcular_dias_desde_alteracao(session)
+        except Exception:
+            logger.exception(
+                'Falha ao recalcular dias_desde_alteracao; nova tentativa em %ss', intervalo_segundos,
+            )
+        await asyncio.sleep(intervalo_segundos)
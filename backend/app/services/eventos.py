@@ -0,0 +1,219 @@
+"""Barramento de eventos em memória para os dashboards (`/eventos`).
+
+As rotas de escrita publicam um evento depois do commit; cada cliente
+conectado por SSE ou WebSocket tem uma `Assinatura` com um buffer limitado
+(`EVENTOS_BUFFER`). Se o cliente não consome a tempo, os eventos mais antigos
+são descartados e ele recebe a quantidade perdida, para recarregar a listagem
+(que responde 304 barato se nada mudou, ver `versoes`). Sem eventos, um
+heartbeat a cada `EVENTOS_HEARTBEAT_SEGUNDOS` mantém proxies e clientes
+sabendo que a conexão está viva.
+
+Publicar não faz I/O nem espera clientes: o evento é serializado uma vez e
+entregue às assinaturas do laboratório e às que acompanham todos eles.
+
+O barramento é por processo: com vários workers, cada cliente só recebe os
+eventos das escritas atendidas pelo seu worker. Os ids também são por
+processo, então um cliente que reconecta deve recarregar a listagem em vez
+de retomar pelo `Last-Event-ID`.
+"""
+import asyncio
+import itertools
+from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+import orjson
+
+from app.config import settings
+from app.database.enums import TipoEvento
+from app.database.models import Computador, HistoricoAlteracao, RelatoProblema, Status
+
+# Quadro SSE de heartbeat: um comentário, ignorado pelo EventSource
+HEARTBEAT_SSE = b': heartbeat\n\n'
+HEARTBEAT_JSON = orjson.dumps({'tipo': 'heartbeat'}).decode()
+
+
+@dataclass(slots=True)
+class Evento:
+    id: int
+    tipo: TipoEvento
+    laboratorio_id: int | None
+    # Serializado uma vez na publicação e reutilizado por todos os clientes
+    texto: str
+    quadro_sse: bytes
+
+
+def quadro_descartados(quantidade: int) -> tuple[str, bytes]:
+    """Aviso (JSON e quadro SSE) de que `quantidade` eventos foram descartados."""
+    corpo = orjson.dumps({'tipo': 'descartados', 'quantidade': quantidade})
+    return corpo.decode(), b'event: descartados\ndata: ' + corpo + b'\n\n'
+
+
+class Assinatura:
+    """Buffer de um cliente: guarda até `tamanho` eventos e descarta os mais antigos."""
+
+    __slots__ = ('laboratorios', 'descartados', '_fila', '_sinal')
+
+    def __init__(self, laboratorios: frozenset[int] | None, tamanho: int) -> None:
+        # None acompanha todos os laboratórios
+        self.laboratorios = laboratorios
+        self.descartados = 0
+        self._fila: deque[Evento] = deque(maxlen=tamanho)
+        self._sinal = asyncio.Event()
+
+    def entregar(self, evento: Evento) -> bool:
+        """Enfileira `evento`; retorna True se o mais antigo foi descartado para caber."""
+        descartou = len(self._fila) == self._fila.maxlen
+        if descartou:
+            self.descartados += 1
+        self._fila.append(evento)
+        self._sinal.set()
+        return descartou
+
+    def acordar(self) -> None:
+        """Libera quem espera em `proximos` sem entregar eventos (ex.: cliente desconectou)."""
+        self._sinal.set()
+
+    async def proximos(self, timeout: float) -> tuple[list[Evento], int]:
+        """Eventos pendentes e quantos foram descartados desde a última leitura.
+
+        Espera até `timeout` segundos por um evento; se nada chegar, retorna
+        uma lista vazia e o chamador envia um heartbeat.
+        """
+        if not self._fila:
+            self._sinal.clear()
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._sinal.wait()
+            except TimeoutError:
+                pass
+        eventos = list(self._fila)
+        self._fila.clear()
+        descartados, self.descartados = self.descartados, 0
+        return eventos, descartados
+
+
+class BarramentoEventos:
+    def __init__(self) -> None:
+        # Assinaturas por laboratório; a chave None guarda as de todos os laboratórios
+        self._assinaturas: defaultdict[int | None, set[Assinatura]] = defaultdict(set)
+        self._ids = itertools.count(1)
+        self.conectadas = 0
+        self.publicados = 0
+        self.descartados = 0
+
+    def lotado(self) -> bool:
+        return self.conectadas >= settings.EVENTOS_MAXIMO_ASSINATURAS
+
+    def publicar(self, tipo: TipoEvento, laboratorio_id: int | None, dados: dict[str, Any]) -> None:
+        """Entrega o evento às assinaturas interessadas. Chamar depois do commit."""
+        self.publicados += 1
+        destinos = list(self._assinaturas.get(None, ()))
+        if laboratorio_id is not None:
+            destinos += self._assinaturas.get(laboratorio_id, ())
+        if not destinos:
+            return
+
+        evento_id = next(self._ids)
+        corpo = orjson.dumps({
+            'id': evento_id,
+            'tipo': tipo,
+            'laboratorio_id': laboratorio_id,
+            'em': datetime.utcnow(),
+            'dados': dados,
+        })
+        evento = Evento(
+            evento_id,
+            tipo,
+            laboratorio_id,
+            corpo.decode(),
+            f'id: {evento_id}\nevent: {tipo.value}\ndata: '.encode() + corpo + b'\n\n',
+        )
+        for assinatura in destinos:
+            self.descartados += assinatura.entregar(evento)
+
+    def _registrar(self, assinatura: Assinatura) -> None:
+        for chave in assinatura.laboratorios or (None,):
+            self._assinaturas[chave].add(assinatura)
+
+    def _remover(self, assinatura: Assinatura) -> None:
+        for chave in assinatura.laboratorios or (None,):
+            assinantes = self._assinaturas.get(chave)
+            if assinantes is not None:
+                assinantes.discard(assinatura)
+                if not assinantes:
+                    del self._assinaturas[chave]
+
+    @contextmanager
+    def assinar(self, laboratorios: Iterable[int] | None = None) -> Iterator[Assinatura]:
+        """Assinatura dos eventos de `laboratorios` (todos, se None) enquanto o bloco durar."""
+        assinatura = Assinatura(
+            frozenset(laboratorios) if laboratorios else None, settings.EVENTOS_BUFFER,
+        )
+        self._registrar(assinatura)
+        self.conectadas += 1
+        try:
+            yield assinatura
+        finally:
+            self.conectadas -= 1
+            self._remover(assinatura)
+
+    def alterar(self, assinatura: Assinatura, laboratorios: Iterable[int] | None) -> None:
+        """Troca os laboratórios acompanhados, mantendo os eventos já no buffer."""
+        self._remover(assinatura)
+        assinatura.laboratorios = frozenset(laboratorios) if laboratorios else None
+        self._registrar(assinatura)
+
+    def estatisticas(self) -> dict[str, int]:
+        return {
+            'assinaturas': self.conectadas,
+            'publicados': self.publicados,
+            'descartados': self.descartados,
+        }
+
+
+barramento = BarramentoEventos()
+
+
+# --------------------------------------------------------------------------------
+# Eventos publicados pelas rotas; recebem as entidades recarregadas depois do commit
+
+
+def publicar_status_computador(
+    computador: Computador, status: Status, status_anterior_id: int | None,
+) -> None:
+    barramento.publicar(TipoEvento.computador_status, computador.laboratorio_id, {
+        'computador_id': computador.id,
+        'patrimonio': computador.patrimonio,
+        'hostname': computador.hostname,
+        'status_id': status.id,
+        'status': status.nome,
+        'status_descricao': status.descricao,
+        'status_anterior_id': status_anterior_id,
+    })
+
+
+def publicar_alteracao(alteracao: HistoricoAlteracao) -> None:
+    barramento.publicar(TipoEvento.alteracao_criada, alteracao.computador.laboratorio_id, {
+        'alteracao_id': alteracao.id,
+        'computador_id': alteracao.computador_id,
+        'tipo_alteracao': alteracao.tipo_alteracao,
+        'status_id': alteracao.status_id,
+        'tecnico_id': alteracao.tecnico_id,
+        'data_alteracao': alteracao.data_alteracao,
+    })
+
+
+def publicar_relato(tipo: TipoEvento, relato: RelatoProblema) -> None:
+    laboratorio_id = relato.computador.laboratorio_id if relato.computador else None
+    barramento.publicar(tipo, laboratorio_id, {
+        'relato_id': relato.id,
+        'computador_id': relato.computador_id,
+        'data_relato': relato.data_relato,
+        'auditada': relato.auditada,
+        'aceita': relato.aceita,
+        'tecnico_id': relato.tecnico_id,
+    })
@@ -0,0 +1,213 @@
+"""Exportação do histórico de alterações em CSV, NDJSON ou Parquet.
+
+As linhas são lidas com um cursor do lado do servidor (`yield_per`), já com as
+colunas dos relacionamentos resolvidas por JOIN, e convertidas parte a parte.
+A memória usada fica limitada a uma parte de `TAMANHO_PARTE` linhas,
+independentemente do tamanho do histórico.
+"""
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import date
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import Date, Enum as SAEnum, Row
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.models import (
+    Computador,
+    HistoricoAlteracao,
+    Laboratorio,
+    Status,
+    Tecnico,
+    Usuario,
+)
+
+TAMANHO_PARTE = 5000
+
+UsuarioTecnico = aliased(Usuario)
+
+# Colunas exportadas, na ordem do arquivo
+COLUNAS = (
+    HistoricoAlteracao.id,
+    HistoricoAlteracao.data_alteracao,
+    HistoricoAlteracao.tipo_alteracao,
+    HistoricoAlteracao.observacao,
+    HistoricoAlteracao.computador_id,
+    Computador.patrimonio.label('computador_patrimonio'),
+    Computador.hostname.label('computador_hostname'),
+    Laboratorio.id.label('laboratorio_id'),
+    Laboratorio.nome.label('laboratorio_nome'),
+    Laboratorio.local.label('laboratorio_local'),
+    HistoricoAlteracao.tecnico_id,
+    UsuarioTecnico.nome.label('tecnico_nome'),
+    HistoricoAlteracao.status_id,
+    Status.nome.label('status_nome'),
+    Status.descricao.label('status_descricao'),
+)
+NOMES_COLUNAS = [coluna.key for coluna in COLUNAS]
+INDICES_ENUM = [i for i, coluna in enumerate(COLUNAS) if isinstance(coluna.type, SAEnum)]
+INDICES_DATA = [i for i, coluna in enumerate(COLUNAS) if isinstance(coluna.type, Date)]
+
+
+class FormatoExportacao(str, Enum):
+    csv = 'csv'
+    ndjson = 'ndjson'
+    parquet = 'parquet'
+
+
+MEDIA_TYPES = {
+    FormatoExportacao.csv: 'text/csv; charset=utf-8',
+    FormatoExportacao.ndjson: 'application/x-ndjson',
+    FormatoExportacao.parquet: 'application/vnd.apache.parquet',
+}
+
+
+def consulta_exportacao(
+    data_desde: date | None = None,
+    data_ate: date | None = None,
+    laboratorio_id: int | None = None,
+):
+    statement = (
+        select(*COLUNAS)
+        .outerjoin(Computador, HistoricoAlteracao.computador_id == Computador.id)
+        .outerjoin(Laboratorio, Computador.laboratorio_id == Laboratorio.id)
+        .outerjoin(Tecnico, HistoricoAlteracao.tecnico_id == Tecnico.id)
+        .outerjoin(UsuarioTecnico, Tecnico.usuario_id == UsuarioTecnico.id)
+        .outerjoin(Status, HistoricoAlteracao.status_id == Status.id)
+        .order_by(HistoricoAlteracao.id)
+    )
+    if data_desde is not None:
+        statement = statement.where(HistoricoAlteracao.data_alteracao >= data_desde)
+    if data_ate is not None:
+        statement = statement.where(HistoricoAlteracao.data_alteracao <= data_ate)
+    if laboratorio_id is not None:
+        statement = statement.where(Computador.laboratorio_id == laboratorio_id)
+    return statement
+
+
+def _valores(linha: Row, datas_em_texto: bool = False) -> list[Any]:
+    """Troca enums pelo seu valor e, se pedido, datas pelo formato ISO."""
+    valores = list(linha)
+    for i in INDICES_ENUM:
+        if valores[i] is not None:
+            valores[i] = valores[i].value
+    if datas_em_texto:
+        for i in INDICES_DATA:
+            if valores[i] is not None:
+                valores[i] = valores[i].isoformat()
+    return valores
+
+
+def _csv(parte: Sequence[Row], cabecalho: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if cabecalho:
+        writer.writerow(NOMES_COLUNAS)
+    # str(date) já é o formato ISO
+    writer.writerows(_valores(linha) for linha in parte)
+    return buffer.getvalue().encode()
+
+
+def _ndjson(parte: Sequence[Row]) -> bytes:
+    return ''.join(
+        json.dumps(dict(zip(NOMES_COLUNAS, _valores(linha, datas_em_texto=True))), ensure_ascii=False)
+        + '\n'
+        for linha in parte
+    ).encode()
+
+
+class _SaidaParquet(io.RawIOBase):
+    """Arquivo só de escrita cujo conteúdo é retirado após cada parte."""
+
+    def __init__(self) -> None:
+        self._partes: list[bytes] = []
+        self._posicao = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, dados) -> int:
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self) -> int:
+        return self._posicao
+
+    def retirar(self) -> bytes:
+        dados = b''.join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def _esquema_parquet():
+    import pyarrow as pa
+
+    return pa.schema([
+        ('id', pa.int64()),
+        ('data_alteracao', pa.date32()),
+        ('tipo_alteracao', pa.string()),
+        ('observacao', pa.string()),
+        ('computador_id', pa.int64()),
+        ('computador_patrimonio', pa.string()),
+        ('computador_hostname', pa.string()),
+        ('laboratorio_id', pa.int64()),
+        ('laboratorio_nome', pa.string()),
+        ('laboratorio_local', pa.string()),
+        ('tecnico_id', pa.int64()),
+        ('tecnico_nome', pa.string()),
+        ('status_id', pa.int64()),
+        ('status_nome', pa.string()),
+        ('status_descricao', pa.string()),
+    ])
+
+
+async def _partes(session: AsyncSession, statement) -> AsyncIterator[Sequence[Row]]:
+    resultado = await session.stream(statement.execution_options(yield_per=TAMANHO_PARTE))
+    async for parte in resultado.partitions():
+        yield parte
+
+
+async def exportar_alteracoes(
+    session: AsyncSession,
+    statement,
+    formato: FormatoExportacao,
+) -> AsyncIterator[bytes]:
+    """Gera o arquivo exportado em pedaços de bytes, fechando `session` no fim."""
+    async with session:
+        if formato == FormatoExportacao.csv:
+            cabecalho = True
+            async for parte in _partes(session, statement):
+                yield _csv(parte, cabecalho)
+                cabecalho = False
+            if cabecalho:
+                yield _csv([], cabecalho)
+            return
+
+        if formato == FormatoExportacao.ndjson:
+            async for parte in _partes(session, statement):
+                yield _ndjson(parte)
+            return
+
+        # Importados aqui para não pesar na inicialização da API
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        esquema = _esquema_parquet()
+        saida = _SaidaParquet()
+        with pq.ParquetWriter(saida, esquema) as writer:
+            async for parte in _partes(session, statement):
+                df = pd.DataFrame.from_records(
+                    [_valores(linha) for linha in parte],
+                    columns=NOMES_COLUNAS,
+                )
+                # Cada parte vira um row group, escrito e enviado em seguida
+                writer.write_table(pa.Table.from_pandas(df, schema=esquema, preserve_index=False))
+                yield saida.retirar()
+        yield saida.retirar()
@@ -0,0 +1,82 @@
+"""Fila de trabalho dos técnicos sobre os relatos pendentes.
+
+Um técnico reserva os próximos `n` relatos não auditados e livres (sem
+reserva ou com a reserva vencida). A reserva é um único
+`UPDATE ... WHERE id IN (SELECT ... LIMIT n) RETURNING id`:
+
+- no Postgres a subconsulta usa `FOR UPDATE SKIP LOCKED`, então técnicos
+  reservando ao mesmo tempo pulam as linhas já travadas em vez de esperar
+  por elas ou pegar as mesmas;
+- no SQLite as escritas são serializadas e o comando inteiro é atômico.
+
+Reservas vencidas voltam para a fila sem nenhuma limpeza. Os horários das
+reservas são sempre em UTC (`agora()`).
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import false, or_, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.database.models import RelatoProblema
+from app.services.paginacao import Ordem
+
+
+def agora() -> datetime:
+    """Horário atual em UTC, com fuso, para comparar com `reservado_ate`."""
+    return datetime.now(timezone.utc)
+
+
+def disponivel(agora: datetime):
+    """Relatos pendentes sem reserva válida em `agora`."""
+    return (
+        (RelatoProblema.auditada == false())
+        & or_(RelatoProblema.reservado_ate.is_(None), RelatoProblema.reservado_ate < agora)
+    )
+
+
+def sem_reserva_de_outro(tecnico_id, agora: datetime):
+    """Relatos que `tecnico_id` (valor ou expressão SQL) pode auditar em `agora`."""
+    return or_(
+        RelatoProblema.reservado_por_id.is_(None),
+        RelatoProblema.reservado_ate.is_(None),
+        RelatoProblema.reservado_ate < agora,
+        RelatoProblema.reservado_por_id == tecnico_id,
+    )
+
+
+def ordenacao(coluna_ordem, ordem: Ordem) -> list:
+    colunas = [coluna_ordem] if coluna_ordem is RelatoProblema.id else [coluna_ordem, RelatoProblema.id]
+    return [coluna.desc() if ordem == Ordem.desc else coluna.asc() for coluna in colunas]
+
+
+async def reservar_relatos(
+    session: AsyncSession,
+    tecnico_id: int,
+    n: int,
+    coluna_ordem,
+    ordem: Ordem = Ordem.asc,
+) -> tuple[list[int], datetime]:
+    """Reserva até `n` relatos para `tecnico_id`, na ordem da fila.
+
+    Retorna os ids reservados e o fim da reserva. O chamador confirma a transação.
+    """
+    inicio = agora()
+    reservado_ate = inicio + timedelta(minutes=settings.RELATO_RESERVA_MINUTOS)
+    proximos = (
+        select(RelatoProblema.id)
+        .where(disponivel(inicio))
+        .order_by(*ordenacao(coluna_ordem, ordem))
+        .limit(n)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.exec(
+        update(RelatoProblema)
+        .where(RelatoProblema.id.in_(proximos.scalar_subquery()))
+        .values(reservado_por_id=tecnico_id, reservado_ate=reservado_ate)
+        .returning(RelatoProblema.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list(result.scalars()), reservado_ate
+
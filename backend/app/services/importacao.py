@@ -0,0 +1,325 @@
+"""Importação em lote de computadores a partir de CSV ou NDJSON.
+
+O corpo da requisição é lido em streaming e processado em lotes de
+`TAMANHO_LOTE` linhas: cada lote é validado, inserido com um único
+executemany e confirmado junto dos históricos de "Cadastro" correspondentes.
+Linhas inválidas são reportadas sem interromper a importação; só as primeiras
+`MAXIMO_ERROS_LISTADOS` vão na resposta, as demais apenas contam.
+"""
+import codecs
+import csv
+import json
+from collections import Counter, defaultdict, deque
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import date
+from enum import Enum
+from typing import Any
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.enums import Colecao, TipoAlteracao
+from app.database.models import (
+    Computador,
+    ComputadorCreateNew,
+    ErroImportacao,
+    HistoricoAlteracao,
+    Laboratorio,
+    ResultadoImportacao,
+    Status,
+    Tecnico,
+)
+from app.services.resumo import ajustar_resumo
+from app.services.versoes import incrementar_versoes
+
+TAMANHO_LOTE = 1000
+MAXIMO_ERROS_LISTADOS = 1000
+OBSERVACAO_CADASTRO = 'Importação em lote'
+
+
+class FormatoImportacao(str, Enum):
+    csv = 'csv'
+    ndjson = 'ndjson'
+
+
+FORMATOS_POR_CONTENT_TYPE = {
+    'text/csv': FormatoImportacao.csv,
+    'application/csv': FormatoImportacao.csv,
+    'application/x-ndjson': FormatoImportacao.ndjson,
+    'application/ndjson': FormatoImportacao.ndjson,
+    'application/jsonl': FormatoImportacao.ndjson,
+}
+
+
+def formato_do_content_type(content_type: str | None) -> FormatoImportacao:
+    tipo = (content_type or '').split(';')[0].strip().lower()
+    if tipo not in FORMATOS_POR_CONTENT_TYPE:
+        raise HTTPException(
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            f'Formato não suportado. Use um de: {", ".join(FORMATOS_POR_CONTENT_TYPE)}.',
+        )
+    return FORMATOS_POR_CONTENT_TYPE[tipo]
+
+
+async def ler_linhas(partes: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Decodifica o stream em UTF-8 e devolve `(número da linha, texto)`."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pendente = ''
+    numero = 0
+    async for parte in partes:
+        pendente += decoder.decode(parte)
+        *linhas, pendente = pendente.split('\n')
+        for linha in linhas:
+            numero += 1
+            yield numero, linha.rstrip('\r')
+    pendente += decoder.decode(b'', final=True)
+    if pendente:
+        yield numero + 1, pendente.rstrip('\r')
+
+
+def _mensagem_validacao(exc: ValidationError) -> str:
+    return '; '.join(
+        f'{".".join(map(str, erro["loc"]))}: {erro["msg"]}' for erro in exc.errors()
+    )
+
+
+class FilaLinhas:
+    """Iterador de linhas consumido por um único `csv.reader` durante o stream."""
+
+    def __init__(self) -> None:
+        self.linhas: deque[str] = deque()
+
+    def __iter__(self) -> 'FilaLinhas':
+        return self
+
+    def __next__(self) -> str:
+        if not self.linhas:
+            raise StopIteration
+        return self.linhas.popleft()
+
+
+async def ler_registros_ndjson(
+    partes: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    async for numero, linha in ler_linhas(partes):
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+        except ValueError as exc:
+            yield numero, f'JSON inválido: {exc}'
+            continue
+        if not isinstance(registro, dict):
+            yield numero, 'Cada linha deve ser um objeto JSON.'
+            continue
+        yield numero, registro
+
+
+async def ler_registros_csv(
+    partes: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    """Lê o CSV com um só `csv.reader`, que recebe as linhas conforme chegam.
+
+    Um campo entre aspas pode conter quebras de linha, então o leitor só
+    avança quando as aspas acumuladas estão balanceadas, isto é, quando a
+    fila tem um registro completo. O número reportado é o da primeira linha.
+    """
+    fila = FilaLinhas()
+    leitor = csv.reader(fila)
+    cabecalho: list[str] | None = None
+    inicio: int | None = None
+    aspas = 0
+    async for numero, linha in ler_linhas(partes):
+        if inicio is None:
+            if not linha.strip():
+                continue
+            inicio = numero
+        fila.linhas.append(linha + '\n')
+        aspas += linha.count('"')
+        if aspas % 2:
+            continue
+
+        valores = next(leitor)
+        linha_registro, inicio, aspas = inicio, None, 0
+        if cabecalho is None:
+            cabecalho = [coluna.strip() for coluna in valores]
+            continue
+        if len(valores) != len(cabecalho):
+            yield linha_registro, f'Esperadas {len(cabecalho)} colunas, encontradas {len(valores)}.'
+            continue
+        yield linha_registro, dict(zip(cabecalho, valores))
+
+    if inicio is not None:
+        yield inicio, 'Campo entre aspas não foi fechado.'
+
+
+def ler_registros(
+    partes: AsyncIterable[bytes],
+    formato: FormatoImportacao,
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    """Converte cada registro em um dicionário, ou na mensagem de erro.
+
+    No CSV o primeiro registro é o cabeçalho; no NDJSON cada linha não vazia
+    é um objeto.
+    """
+    if formato == FormatoImportacao.ndjson:
+        return ler_registros_ndjson(partes)
+    return ler_registros_csv(partes)
+
+
+class ImportadorComputadores:
+    """Resolve laboratórios, status e técnicos uma única vez e insere os lotes."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.laboratorios: dict[tuple[str, str], int] = {}
+        self.status: dict[tuple[str, str], int] = {}
+        self.tecnicos: set[int] = set()
+        self.resultado = ResultadoImportacao()
+
+    async def carregar_referencias(self) -> None:
+        laboratorios = await self.session.exec(
+            select(Laboratorio.nome, Laboratorio.local, Laboratorio.id)
+        )
+        self.laboratorios = {(nome, local): id for nome, local, id in laboratorios}
+        status_ = await self.session.exec(select(Status.nome, Status.descricao, Status.id))
+        self.status = {(nome, descricao): id for nome, descricao, id in status_}
+        self.tecnicos = set((await self.session.exec(select(Tecnico.id))).all())
+
+    def _erro(self, linha: int, mensagem: str) -> None:
+        self.resultado.total_erros += 1
+        if len(self.resultado.erros) < MAXIMO_ERROS_LISTADOS:
+            self.resultado.erros.append(ErroImportacao(linha=linha, erro=mensagem))
+
+    def _converter(self, linha: int, registro: dict[str, Any], hoje: date) -> dict[str, Any] | None:
+        try:
+            dados = ComputadorCreateNew.model_validate(registro)
+        except ValidationError as exc:
+            self._erro(linha, _mensagem_validacao(exc))
+            return None
+
+        laboratorio_id = self.laboratorios.get((dados.laboratorio_nome, dados.laboratorio_local))
+        if laboratorio_id is None:
+            self._erro(linha, 'Laboratório não encontrado')
+            return None
+        status_id = self.status.get((dados.status_nome, dados.status_descricao))
+        if status_id is None:
+            self._erro(linha, 'Status não encontrado.')
+            return None
+        if dados.tecnico_id not in self.tecnicos:
+            self._erro(linha, 'Técnico não encontrado.')
+            return None
+
+        return {
+            'patrimonio': dados.patrimonio,
+            'hostname': dados.hostname,
+            'marca': dados.marca,
+            'ano_aquisicao': dados.ano_aquisicao,
+            'sistema_operacional': dados.sistema_operacional,
+            'data_ultima_alteracao': dados.data_ultima_alteracao,
+            'dias_desde_alteracao': (hoje - dados.data_ultima_alteracao).days,
+            'laboratorio_id': laboratorio_id,
+            'status_id': status_id,
+            'tecnico_id': dados.tecnico_id,
+        }
+
+    async def _inserir(self, computadores: list[dict[str, Any]], hoje: date) -> None:
+        # O RETURNING traz tudo o que o histórico precisa, então a ordem das
+        # linhas retornadas não importa e o insert pode ser feito em páginas.
+        inseridos = await self.session.exec(
+            insert(Computador.__table__).returning(
+                Computador.id, Computador.tecnico_id, Computador.status_id
+            ),
+            params=computadores,
+        )
+        historicos = [
+            {
+                'computador_id': computador_id,
+                'tecnico_id': tecnico_id,
+                'status_id': status_id,
+                'tipo_alteracao': TipoAlteracao.cadastro,
+                'data_alteracao': hoje,
+                'observacao': OBSERVACAO_CADASTRO,
+            }
+            for computador_id, tecnico_id, status_id in inseridos
+        ]
+        await self.session.exec(insert(HistoricoAlteracao.__table__), params=historicos)
+
+    async def _ajustar_resumos(self, computadores: list[dict[str, Any]]) -> None:
+        por_laboratorio: dict[int, Counter[int]] = defaultdict(Counter)
+        for computador in computadores:
+            por_laboratorio[computador['laboratorio_id']][computador['status_id']] += 1
+        for laboratorio_id, por_status in por_laboratorio.items():
+            await ajustar_resumo(
+                self.session,
+                laboratorio_id,
+                computadores=por_status.total(),
+                status=dict(por_status),
+            )
+
+    async def processar_lote(self, lote: list[tuple[int, dict[str, Any] | str]]) -> None:
+        hoje = date.today()
+        linhas: list[int] = []
+        computadores: list[dict[str, Any]] = []
+        for linha, registro in lote:
+            self.resultado.total += 1
+            if isinstance(registro, str):
+                self._erro(linha, registro)
+                continue
+            computador = self._converter(linha, registro, hoje)
+            if computador is not None:
+                linhas.append(linha)
+                computadores.append(computador)
+        if not computadores:
+            return
+
+        try:
+            await self._inserir(computadores, hoje)
+            await self._ajustar_resumos(computadores)
+            await incrementar_versoes(self.session, Colecao.computadores, Colecao.alteracoes)
+            await self.session.commit()
+            self.resultado.inseridos += len(computadores)
+            return
+        except DBAPIError:
+            await self.session.rollback()
+
+        # O lote falhou no banco: insere linha a linha, cada uma em um savepoint,
+        # para isolar as inválidas, e confirma as demais em um único commit.
+        # As versões são escritas antes porque abrem a transação: no SQLite, sem
+        # ela o primeiro SAVEPOINT faria o papel de BEGIN e o RELEASE confirmaria a linha.
+        await incrementar_versoes(self.session, Colecao.computadores, Colecao.alteracoes)
+        aceitos: list[dict[str, Any]] = []
+        for linha, computador in zip(linhas, computadores):
+            try:
+                async with self.session.begin_nested():
+                    await self._inserir([computador], hoje)
+            except DBAPIError as exc:
+                self._erro(linha, str(exc.orig))
+                continue
+            aceitos.append(computador)
+        await self._ajustar_resumos(aceitos)
+        await self.session.commit()
+        self.resultado.inseridos += len(aceitos)
+
+
+async def importar_computadores(
+    session: AsyncSession,
+    partes: AsyncIterable[bytes],
+    formato: FormatoImportacao,
+) -> ResultadoImportacao:
+    importador = ImportadorComputadores(session)
+    await importador.carregar_referencias()
+
+    lote: list[tuple[int, dict[str, Any] | str]] = []
+    async for item in ler_registros(partes, formato):
+        lote.append(item)
+        if len(lote) >= TAMANHO_LOTE:
+            await importador.processar_lote(lote)
+            lote = []
+    if lote:
+        await importador.processar_lote(lote)
+    return importador.resultado
@@ -0,0 +1,27 @@
+"""Identificação das violações de integridade devolvidas pelo banco.
+
+As rotas traduzem só as violações que conhecem (em 409 ou 404) e deixam as
+demais propagarem. No PostgreSQL o nome da restrição e o SQLSTATE vêm no erro
+do driver; o SQLite só informa a coluna na mensagem.
+"""
+from sqlalchemy.exc import IntegrityError
+
+
+def violou_unicidade(erro: IntegrityError, restricao: str, coluna: str) -> bool:
+    """Indica se `erro` veio da restrição única `restricao` sobre `coluna` (`tabela.coluna`).
+
+    No PostgreSQL compara o nome da restrição em `diag`; no SQLite procura a
+    coluna na mensagem (`UNIQUE constraint failed: tabela.coluna`).
+    """
+    diag = getattr(erro.orig, 'diag', None)
+    if diag is not None and diag.constraint_name is not None:
+        return diag.constraint_name == restricao
+    mensagem = str(erro.orig)
+    return 'UNIQUE' in mensagem and coluna in mensagem
+
+
+def violou_chave_estrangeira(erro: IntegrityError) -> bool:
+    # 23503: foreign_key_violation no PostgreSQL
+    if getattr(erro.orig, 'sqlstate', None) == '23503':
+        return True
+    return 'FOREIGN KEY constraint failed' in str(erro.orig)
@@ -0,0 +1,346 @@
+"""Modelos de leitura (read models) das listagens principais.
+
+As listagens de computadores, laboratórios, alterações e relatos não passam
+por instâncias do ORM nem pela validação do `response_model`: a consulta
+seleciona só as colunas exibidas, cada linha vira uma dataclass com
+`__slots__` e a lista é serializada direto pelo orjson (`RespostaJSON`).
+O JSON tem o mesmo formato dos modelos `*Public`, que continuam documentando
+as rotas. `benchmarks/serializacao.py` compara os dois caminhos.
+"""
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, ClassVar
+
+import orjson
+from fastapi import Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.enums import StatusComputador, TipoAlteracao, TipoSistemaOperacional
+from app.database.models import (
+    Administrador,
+    Computador,
+    HistoricoAlteracao,
+    Laboratorio,
+    RelatoProblema,
+    Status,
+    Tecnico,
+    Usuario,
+)
+
+
+class RespostaJSON(Response):
+    """Resposta JSON serializada pelo orjson (dataclasses, datas e enums nativos)."""
+    media_type = 'application/json'
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def responder(itens: list, response: Response) -> RespostaJSON:
+    """Resposta com `itens` e os headers que as dependências e `paginar` já definiram.
+
+    O FastAPI só copia os headers do `response` injetado quando a rota não
+    devolve uma `Response` própria, então eles são repassados aqui.
+    """
+    return RespostaJSON(itens, headers=response.headers)
+
+
+# --------------------------------------------------------------------------------
+# DTOs; os campos seguem a ordem das colunas selecionadas
+
+
+@dataclass(slots=True)
+class StatusLeitura:
+    nome: StatusComputador
+    descricao: str
+    id: int
+
+    posicao_id: ClassVar[int] = 2
+
+
+@dataclass(slots=True)
+class LaboratorioLeitura:
+    nome: str
+    local: str
+    id: int
+    administrador_id: int
+
+    posicao_id: ClassVar[int] = 2
+
+
+@dataclass(slots=True)
+class AdministradorLeitura:
+    matricula: str
+    id: int
+    usuario_id: int
+
+    posicao_id: ClassVar[int] = 1
+
+
+@dataclass(slots=True)
+class TecnicoLeitura:
+    administrador_id: int
+    matricula: str
+    id: int
+    usuario_id: int
+
+    posicao_id: ClassVar[int] = 2
+
+
+@dataclass(slots=True)
+class UsuarioLeitura:
+    nome: str
+    email: str
+    id: int
+
+    posicao_id: ClassVar[int] = 2
+
+
+@dataclass(slots=True)
+class ComputadorLeituraBase:
+    patrimonio: str
+    hostname: str
+    marca: str
+    ano_aquisicao: int
+    sistema_operacional: TipoSistemaOperacional
+    data_ultima_alteracao: date | None
+    dias_desde_alteracao: int
+    id: int
+
+    def __post_init__(self) -> None:
+        # Mesmo cálculo de `ComputadorLeitura`: derivado na leitura, nunca gravado
+        if self.data_ultima_alteracao is not None:
+            self.dias_desde_alteracao = (date.today() - self.data_ultima_alteracao).days
+
+
+@dataclass(slots=True)
+class ComputadorResumoLeitura(ComputadorLeituraBase):
+    status_id: int | None
+    laboratorio_id: int | None
+    tecnico_id: int | None
+
+    posicao_id: ClassVar[int] = 7
+
+
+@dataclass(slots=True)
+class ComputadorListaLeitura(ComputadorLeituraBase):
+    status: StatusLeitura | None
+    laboratorio: LaboratorioLeitura | None
+    tecnico: TecnicoLeitura | None
+
+
+@dataclass(slots=True)
+class LaboratorioListaLeitura:
+    nome: str
+    local: str
+    id: int
+    computadores: list[ComputadorResumoLeitura]
+    administrador: AdministradorLeitura | None
+
+
+@dataclass(slots=True)
+class AlteracaoLeitura:
+    tipo_alteracao: TipoAlteracao
+    data_alteracao: date
+    observacao: str | None
+    id: int
+    computador: ComputadorResumoLeitura | None
+    tecnico: TecnicoLeitura | None
+    status: StatusLeitura | None
+
+
+@dataclass(slots=True)
+class RelatoLeitura:
+    data_relato: date
+    usuario_id: int
+    descricao: str | None
+    computador_patrimonio: str | None
+    id: int
+    computador: ComputadorResumoLeitura | None
+    usuario: UsuarioLeitura | None
+    auditada: bool
+    tecnico: TecnicoLeitura | None
+
+
+COLUNAS_STATUS = (Status.nome, Status.descricao, Status.id)
+COLUNAS_LABORATORIO = (Laboratorio.nome, Laboratorio.local, Laboratorio.id, Laboratorio.administrador_id)
+COLUNAS_ADMINISTRADOR = (Administrador.matricula, Administrador.id, Administrador.usuario_id)
+COLUNAS_TECNICO = (Tecnico.administrador_id, Tecnico.matricula, Tecnico.id, Tecnico.usuario_id)
+COLUNAS_USUARIO = (Usuario.nome, Usuario.email, Usuario.id)
+COLUNAS_COMPUTADOR = (
+    Computador.patrimonio,
+    Computador.hostname,
+    Computador.marca,
+    Computador.ano_aquisicao,
+    Computador.sistema_operacional,
+    Computador.data_ultima_alteracao,
+    Computador.dias_desde_alteracao,
+    Computador.id,
+)
+COLUNAS_COMPUTADOR_RESUMO = (
+    *COLUNAS_COMPUTADOR,
+    Computador.status_id,
+    Computador.laboratorio_id,
+    Computador.tecnico_id,
+)
+
+
+def _fatias(*grupos: Sequence) -> list[slice]:
+    """Posição de cada grupo de colunas dentro da linha selecionada."""
+    fatias = []
+    inicio = 0
+    for grupo in grupos:
+        fatias.append(slice(inicio, inicio + len(grupo)))
+        inicio += len(grupo)
+    return fatias
+
+
+def _relacionado(dto: type, valores: Sequence) -> Any:
+    """DTO de um relacionamento vindo de outer join; None quando não há linha."""
+    return None if valores[dto.posicao_id] is None else dto(*valores)
+
+
+# --------------------------------------------------------------------------------
+# Computadores
+
+
+def consulta_computadores():
+    # A entidade principal vem primeiro: suas colunas mantêm os nomes usados por `paginar`
+    return (
+        select(*COLUNAS_COMPUTADOR, *COLUNAS_STATUS, *COLUNAS_LABORATORIO, *COLUNAS_TECNICO)
+        .outerjoin(Status, Computador.status_id == Status.id)
+        .outerjoin(Laboratorio, Computador.laboratorio_id == Laboratorio.id)
+        .outerjoin(Tecnico, Computador.tecnico_id == Tecnico.id)
+    )
+
+
+def montar_computadores(linhas: Iterable[Sequence]) -> list[ComputadorListaLeitura]:
+    computador, status, laboratorio, tecnico = _fatias(
+        COLUNAS_COMPUTADOR, COLUNAS_STATUS, COLUNAS_LABORATORIO, COLUNAS_TECNICO,
+    )
+    return [
+        ComputadorListaLeitura(
+            *linha[computador],
+            _relacionado(StatusLeitura, linha[status]),
+            _relacionado(LaboratorioLeitura, linha[laboratorio]),
+            _relacionado(TecnicoLeitura, linha[tecnico]),
+        )
+        for linha in linhas
+    ]
+
+
+# --------------------------------------------------------------------------------
+# Laboratórios
+
+
+COLUNAS_LABORATORIO_LISTA = (Laboratorio.nome, Laboratorio.local, Laboratorio.id)
+
+
+def consulta_laboratorios():
+    return (
+        select(*COLUNAS_LABORATORIO_LISTA, *COLUNAS_ADMINISTRADOR)
+        .outerjoin(Administrador, Laboratorio.administrador_id == Administrador.id)
+    )
+
+
+async def montar_laboratorios(
+    session: AsyncSession, linhas: Sequence[Sequence],
+) -> list[LaboratorioListaLeitura]:
+    """Monta a página de laboratórios; os computadores vêm em uma única consulta."""
+    computadores: defaultdict[int, list[ComputadorResumoLeitura]] = defaultdict(list)
+    if linhas:
+        statement = (
+            select(*COLUNAS_COMPUTADOR_RESUMO)
+            .where(Computador.laboratorio_id.in_([linha[2] for linha in linhas]))
+            .order_by(Computador.id)
+        )
+        for linha in await session.exec(statement):
+            computador = ComputadorResumoLeitura(*linha)
+            computadores[computador.laboratorio_id].append(computador)
+
+    laboratorio, administrador = _fatias(COLUNAS_LABORATORIO_LISTA, COLUNAS_ADMINISTRADOR)
+    return [
+        LaboratorioListaLeitura(
+            *linha[laboratorio],
+            computadores.get(linha[2], []),
+            _relacionado(AdministradorLeitura, linha[administrador]),
+        )
+        for linha in linhas
+    ]
+
+
+# --------------------------------------------------------------------------------
+# Alterações
+
+COLUNAS_ALTERACAO = (
+    HistoricoAlteracao.tipo_alteracao,
+    HistoricoAlteracao.data_alteracao,
+    HistoricoAlteracao.observacao,
+    HistoricoAlteracao.id,
+)
+
+
+def consulta_alteracoes():
+    return (
+        select(*COLUNAS_ALTERACAO, *COLUNAS_COMPUTADOR_RESUMO, *COLUNAS_TECNICO, *COLUNAS_STATUS)
+        .outerjoin(Computador, HistoricoAlteracao.computador_id == Computador.id)
+        .outerjoin(Tecnico, HistoricoAlteracao.tecnico_id == Tecnico.id)
+        .outerjoin(Status, HistoricoAlteracao.status_id == Status.id)
+    )
+
+
+def montar_alteracoes(linhas: Iterable[Sequence]) -> list[AlteracaoLeitura]:
+    alteracao, computador, tecnico, status = _fatias(
+        COLUNAS_ALTERACAO, COLUNAS_COMPUTADOR_RESUMO, COLUNAS_TECNICO, COLUNAS_STATUS,
+    )
+    return [
+        AlteracaoLeitura(
+            *linha[alteracao],
+            _relacionado(ComputadorResumoLeitura, linha[computador]),
+            _relacionado(TecnicoLeitura, linha[tecnico]),
+            _relacionado(StatusLeitura, linha[status]),
+        )
+        for linha in linhas
+    ]
+
+
+# --------------------------------------------------------------------------------
+# Relatos de problema
+
+COLUNAS_RELATO = (
+    RelatoProblema.data_relato,
+    RelatoProblema.usuario_id,
+    RelatoProblema.descricao,
+    RelatoProblema.computador_patrimonio,
+    RelatoProblema.id,
+    RelatoProblema.auditada,
+)
+
+
+def consulta_relatos():
+    return (
+        select(*COLUNAS_RELATO, *COLUNAS_COMPUTADOR_RESUMO, *COLUNAS_USUARIO, *COLUNAS_TECNICO)
+        .outerjoin(Computador, RelatoProblema.computador_id == Computador.id)
+        .outerjoin(Usuario, RelatoProblema.usuario_id == Usuario.id)
+        .outerjoin(Tecnico, RelatoProblema.tecnico_id == Tecnico.id)
+    )
+
+
+def montar_relatos(linhas: Iterable[Sequence]) -> list[RelatoLeitura]:
+    _, computador, usuario, tecnico = _fatias(
+        COLUNAS_RELATO, COLUNAS_COMPUTADOR_RESUMO, COLUNAS_USUARIO, COLUNAS_TECNICO,
+    )
+    # `auditada` é a última coluna do relato, mas vem depois dos relacionamentos no JSON
+    return [
+        RelatoLeitura(
+            *linha[0:5],
+            _relacionado(ComputadorResumoLeitura, linha[computador]),
+            _relacionado(UsuarioLeitura, linha[usuario]),
+            linha[5],
+            _relacionado(TecnicoLeitura, linha[tecnico]),
+        )
+        for linha in linhas
+    ]
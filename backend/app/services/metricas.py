@@ -0,0 +1,186 @@
+"""Métricas por rota no formato texto do Prometheus.
+
+`MiddlewareMetricas` (ASGI puro, sem o custo do `BaseHTTPMiddleware`) mede
+cada requisição HTTP: latência, status, tamanho da resposta e quantos comandos
+SQL foram executados e quanto tempo eles levaram (contados pelos eventos que
+`app.database.instrumentacao` registra nas engines). As séries são agregadas por método e modelo de rota
+(`/computadores/{computador_id}`), então a cardinalidade não cresce com os ids.
+
+Os valores ficam na memória do processo; com vários workers cada um expõe as
+próprias séries em `/metrics`.
+"""
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database.instrumentacao import rastrear_consultas
+from app.services.cache import caches
+from app.services.eventos import barramento
+from app.services.senhas import servico_senhas
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+ROTA_DESCONHECIDA = 'desconhecida'
+
+
+class Histograma:
+    """Histograma cumulativo do Prometheus, com uma série por combinação de rótulos."""
+
+    def __init__(self, nome: str, ajuda: str, buckets: tuple[float, ...]) -> None:
+        self.nome = nome
+        self.ajuda = ajuda
+        self.buckets = buckets
+        # rótulos -> [contagem por bucket (+Inf no fim), soma]
+        self._series: dict[tuple[tuple[str, str], ...], list] = {}
+
+    def observar(self, rotulos: tuple[tuple[str, str], ...], valor: float) -> None:
+        serie = self._series.get(rotulos)
+        if serie is None:
+            serie = self._series[rotulos] = [[0] * (len(self.buckets) + 1), 0.0]
+        serie[0][bisect_left(self.buckets, valor)] += 1
+        serie[1] += valor
+
+    def exportar(self) -> Iterable[str]:
+        yield f'# HELP {self.nome} {self.ajuda}'
+        yield f'# TYPE {self.nome} histogram'
+        for rotulos, (contagens, soma) in self._series.items():
+            acumulado = 0
+            for limite, contagem in zip((*self.buckets, '+Inf'), contagens):
+                acumulado += contagem
+                yield f'{self.nome}_bucket{_rotulos((*rotulos, ("le", str(limite))))} {acumulado}'
+            yield f'{self.nome}_sum{_rotulos(rotulos)} {soma}'
+            yield f'{self.nome}_count{_rotulos(rotulos)} {acumulado}'
+
+
+class Contador:
+    def __init__(self, nome: str, ajuda: str, tipo: str = 'counter') -> None:
+        self.nome = nome
+        self.ajuda = ajuda
+        self.tipo = tipo
+        self._series: dict[tuple[tuple[str, str], ...], float] = {}
+
+    def incrementar(self, rotulos: tuple[tuple[str, str], ...] = (), valor: float = 1) -> None:
+        self._series[rotulos] = self._series.get(rotulos, 0) + valor
+
+    def exportar(self) -> Iterable[str]:
+        yield f'# HELP {self.nome} {self.ajuda}'
+        yield f'# TYPE {self.nome} {self.tipo}'
+        for rotulos, valor in self._series.items():
+            yield f'{self.nome}{_rotulos(rotulos)} {valor}'
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _rotulos(rotulos: tuple[tuple[str, str], ...]) -> str:
+    if not rotulos:
+        return ''
+    return '{' + ','.join(f'{chave}="{_escapar(valor)}"' for chave, valor in rotulos) + '}'
+
+
+duracao = Histograma(
+    'http_request_duration_seconds', 'Latência das requisições HTTP.', BUCKETS_SEGUNDOS,
+)
+tamanho_resposta = Histograma(
+    'http_response_size_bytes', 'Tamanho do corpo das respostas HTTP.', BUCKETS_BYTES,
+)
+consultas_sql = Histograma(
+    'http_request_db_statements', 'Comandos SQL executados por requisição.', BUCKETS_CONSULTAS,
+)
+duracao_sql = Histograma(
+    'http_request_db_duration_seconds', 'Tempo total no banco por requisição.', BUCKETS_SEGUNDOS,
+)
+requisicoes = Contador('http_requests_total', 'Requisições HTTP por status.')
+em_andamento = Contador('http_requests_in_flight', 'Requisições HTTP em andamento.', 'gauge')
+METRICAS_HTTP = (duracao, requisicoes, em_andamento, tamanho_resposta, consultas_sql, duracao_sql)
+
+
+class MiddlewareMetricas:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        tamanho = 0
+
+        async def enviar(message: Message) -> None:
+            nonlocal status, tamanho
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body':
+                tamanho += len(message.get('body', b''))
+            await send(message)
+
+        def rota() -> str:
+            # O roteador do Starlette grava a rota encontrada no próprio `scope`
+            return getattr(scope.get('route'), 'path', ROTA_DESCONHECIDA)
+
+        em_andamento.incrementar()
+        inicio = time.perf_counter()
+        with rastrear_consultas(rota) as medicao:
+            try:
+                await self.app(scope, receive, enviar)
+            finally:
+                segundos = time.perf_counter() - inicio
+                em_andamento.incrementar(valor=-1)
+                rotulos = (('method', scope['method']), ('route', rota()))
+                duracao.observar(rotulos, segundos)
+                requisicoes.incrementar((*rotulos, ('status', str(status))))
+                tamanho_resposta.observar(rotulos, tamanho)
+                consultas_sql.observar(rotulos, medicao.consultas)
+                duracao_sql.observar(rotulos, medicao.segundos)
+
+
+def exportar(*coletores: Callable[[], Iterable[str]]) -> str:
+    """Texto de `/metrics`: as métricas HTTP seguidas das linhas de `coletores`."""
+    linhas: list[str] = []
+    for metrica in METRICAS_HTTP:
+        linhas.extend(metrica.exportar())
+    for coletor in coletores:
+        linhas.extend(coletor())
+    return '\n'.join(linhas) + '\n'
+
+
+def medidores(nome: str, ajuda: str, valores: dict[tuple[tuple[str, str], ...], float]) -> Iterable[str]:
+    """Linhas de um gauge a partir de valores já agregados em outro lugar."""
+    yield f'# HELP {nome} {ajuda}'
+    yield f'# TYPE {nome} gauge'
+    for rotulos, valor in valores.items():
+        yield f'{nome}{_rotulos(rotulos)} {valor}'
+
+
+def metricas_caches() -> Iterable[str]:
+    estatisticas = {nome: cache.estatisticas() for nome, cache in caches.items()}
+    for chave, ajuda in (
+        ('hits', 'Acertos do cache neste processo.'),
+        ('misses', 'Faltas do cache neste processo.'),
+        ('tamanho', 'Entradas guardadas no cache.'),
+    ):
+        yield from medidores(f'cache_{chave}', ajuda, {
+            (('cache', nome),): valores[chave]
+            for nome, valores in estatisticas.items()
+            if chave in valores
+        })
+
+
+def metricas_senhas() -> Iterable[str]:
+    for chave, valor in servico_senhas.estatisticas().items():
+        yield from medidores(f'senhas_{chave}', f'Serviço de hashing de senhas: {chave}.', {(): valor})
+
+
+def metricas_eventos() -> Iterable[str]:
+    for chave, ajuda in (
+        ('assinaturas', 'Clientes conectados ao stream de eventos neste processo.'),
+        ('publicados', 'Eventos publicados neste processo.'),
+        ('descartados', 'Eventos descartados por clientes lentos (buffer cheio).'),
+    ):
+        yield from medidores(f'eventos_{chave}', ajuda, {(): barramento.estatisticas()[chave]})
@@ -0,0 +1,144 @@
+"""Paginação por keyset (cursor opaco) compartilhada pelas rotas de listagem.
+
+O corpo das respostas continua sendo uma lista JSON; o cursor da próxima
+página e o total (quando pedido) vão nos headers `X-Proximo-Cursor` e
+`X-Total-Count`.
+
+Sem `limit`, cada resposta traz no máximo `LIMITE_PADRAO` linhas: um cliente
+que precise da listagem inteira segue o cursor até ele faltar (no front-end,
+`ApiService.getTodasPaginas`).
+"""
+import base64
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Annotated, Any
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import func, tuple_
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+HEADER_PROXIMO_CURSOR = 'X-Proximo-Cursor'
+HEADER_TOTAL = 'X-Total-Count'
+
+cursor_invalido = HTTPException(
+    status.HTTP_400_BAD_REQUEST,
+    'Cursor de paginação inválido.',
+)
+
+
+class Ordem(str, Enum):
+    asc = 'asc'
+    desc = 'desc'
+
+
+class Paginacao(SQLModel):
+    """Parâmetros de paginação comuns a todas as listagens."""
+
+    limit: int = LIMITE_PADRAO
+    cursor: str | None = None
+    ordem: Ordem = Ordem.asc
+    incluir_total: bool = False
+
+
+def parametros_paginacao(
+    limit: Annotated[int, Query(ge=1, le=LIMITE_MAXIMO)] = LIMITE_PADRAO,
+    cursor: str | None = None,
+    ordem: Ordem = Ordem.asc,
+    incluir_total: bool = False,
+) -> Paginacao:
+    return Paginacao(limit=limit, cursor=cursor, ordem=ordem, incluir_total=incluir_total)
+
+
+def codificar_cursor(ordenar_por: str, valor: Any, ultimo_id: int) -> str:
+    """Codifica a posição da última linha retornada em um cursor opaco."""
+    if isinstance(valor, (date, datetime)):
+        valor = valor.isoformat()
+    raw = json.dumps([ordenar_por, valor, ultimo_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor: str) -> tuple[str, Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        ordenar_por, valor, ultimo_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise cursor_invalido
+    if not isinstance(ordenar_por, str) or not isinstance(ultimo_id, int):
+        raise cursor_invalido
+    return ordenar_por, valor, ultimo_id
+
+
+def _converter_valor(coluna: Any, valor: Any) -> Any:
+    """Converte o valor vindo do cursor para o tipo Python da coluna."""
+    try:
+        tipo = coluna.type.python_type
+    except NotImplementedError:
+        return valor
+    try:
+        if tipo is datetime:
+            return datetime.fromisoformat(valor)
+        if tipo is date:
+            return date.fromisoformat(valor)
+    except (ValueError, TypeError):
+        raise cursor_invalido
+    return valor
+
+
+async def paginar(
+    session: AsyncSession,
+    stmt: Any,
+    paginacao: Paginacao,
+    response: Response,
+    *,
+    coluna_ordem: Any,
+    coluna_id: Any,
+    inverter: bool = False,
+) -> list:
+    """Executa `stmt` retornando uma única página ordenada por `coluna_ordem`.
+
+    A ordenação usa `coluna_id` como desempate, então `coluna_ordem` deve ser
+    não nula. O custo de cada página independe do tamanho da tabela; a contagem
+    total só é feita quando `paginacao.incluir_total` é verdadeiro.
+
+    Com `inverter`, a coluna é percorrida no sentido contrário ao pedido: um
+    valor derivado que cresce quando a coluna diminui (dias desde uma data).
+    """
+    if paginacao.incluir_total:
+        contagem = select(func.count()).select_from(stmt.order_by(None).subquery())
+        response.headers[HEADER_TOTAL] = str((await session.exec(contagem)).one())
+
+    chave = coluna_ordem.key
+    decrescente = (paginacao.ordem == Ordem.desc) != inverter
+    por_id = coluna_ordem is coluna_id
+
+    if paginacao.cursor:
+        ordenar_por, valor, ultimo_id = decodificar_cursor(paginacao.cursor)
+        if ordenar_por != chave:
+            raise cursor_invalido
+        if por_id:
+            posicao, limite = coluna_id, ultimo_id
+        else:
+            posicao = tuple_(coluna_ordem, coluna_id)
+            limite = tuple_(_converter_valor(coluna_ordem, valor), ultimo_id)
+        stmt = stmt.where(posicao < limite if decrescente else posicao > limite)
+
+    colunas = [coluna_id] if por_id else [coluna_ordem, coluna_id]
+    stmt = stmt.order_by(None).order_by(
+        *(coluna.desc() if decrescente else coluna.asc() for coluna in colunas),
+    )
+    itens = list((await session.exec(stmt.limit(paginacao.limit + 1))).all())
+
+    if len(itens) > paginacao.limit:
+        itens = itens[:paginacao.limit]
+        ultimo = itens[-1]
+        response.headers[HEADER_PROXIMO_CURSOR] = codificar_cursor(
+            chave,
+            getattr(ultimo, chave),
+            getattr(ultimo, coluna_id.key),
+        )
+    return itens
@@ -0,0 +1,73 @@
+"""Consultas cacheadas às tabelas de referência (Status e Laboratório).
+
+Essas tabelas mudam pouco e são consultadas em quase toda escrita. As rotas
+que as alteram chamam `invalidar_status` / `invalidar_laboratorios` após o
+commit. Com o backend em memória cada worker só enxerga as próprias
+invalidações, então o TTL limita por quanto tempo os demais podem ver um nome
+antigo.
+"""
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.database.models import Laboratorio, Status, StatusPublic
+from app.services.cache import CacheLeitura, criar_backend
+
+cache_status = CacheLeitura(
+    'status',
+    criar_backend('status', settings.CACHE_REFERENCIAS_TAMANHO),
+    settings.CACHE_REFERENCIAS_TTL_SEGUNDOS,
+)
+cache_laboratorios = CacheLeitura(
+    'laboratorios',
+    criar_backend('laboratorios', settings.CACHE_REFERENCIAS_TAMANHO),
+    settings.CACHE_REFERENCIAS_TTL_SEGUNDOS,
+)
+
+
+def _status_json(status: Status | None) -> dict | None:
+    return None if status is None else StatusPublic.model_validate(status).model_dump(mode='json')
+
+
+async def buscar_status(session: AsyncSession, nome: str, descricao: str) -> dict | None:
+    """Status (no formato de StatusPublic) com o nome e a descrição dados."""
+    async def carregar() -> dict | None:
+        statement = select(Status).where(Status.nome == nome, Status.descricao == descricao)
+        return _status_json((await session.exec(statement)).first())
+
+    return await cache_status.obter(f'nome:{nome}:{descricao}', carregar)
+
+
+async def buscar_status_por_id(session: AsyncSession, status_id: int) -> dict | None:
+    async def carregar() -> dict | None:
+        return _status_json(await session.get(Status, status_id))
+
+    return await cache_status.obter(f'id:{status_id}', carregar)
+
+
+async def buscar_laboratorio_id(session: AsyncSession, nome: str, local: str) -> int | None:
+    async def carregar() -> int | None:
+        statement = select(Laboratorio.id).where(
+            Laboratorio.nome == nome,
+            Laboratorio.local == local,
+        )
+        return (await session.exec(statement)).first()
+
+    return await cache_laboratorios.obter(f'nome:{nome}:{local}', carregar)
+
+
+async def laboratorio_existe(session: AsyncSession, laboratorio_id: int) -> bool:
+    async def carregar() -> bool | None:
+        statement = select(Laboratorio.id).where(Laboratorio.id == laboratorio_id)
+        # None em vez de False: ausências não são guardadas no cache
+        return True if (await session.exec(statement)).first() is not None else None
+
+    return bool(await cache_laboratorios.obter(f'id:{laboratorio_id}', carregar))
+
+
+async def invalidar_status() -> None:
+    await cache_status.limpar()
+
+
+async def invalidar_laboratorios() -> None:
+    await cache_laboratorios.limpar()
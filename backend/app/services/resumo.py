@@ -0,0 +1,148 @@
+"""Manutenção incremental da tabela `resumo_laboratorio` (painel dos administradores).
+
+Cada escrita que muda a contagem de computadores por status ou de relatos
+abertos de um laboratório chama `ajustar_resumo` antes do commit, na mesma
+transação. O ajuste é um `UPDATE coluna = coluna + delta`, seguro sob
+concorrência. Se o laboratório ainda não tem linha, ela é inserida a partir
+das tabelas de origem, que já incluem a escrita em andamento (autoflush), com
+`ON CONFLICT DO NOTHING`: se outra transação inseriu a linha antes, o delta é
+aplicado sobre ela.
+"""
+from sqlalchemy import Connection, case, delete, false, func, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.enums import StatusComputador
+from app.database.models import (
+    Computador,
+    Laboratorio,
+    RelatoProblema,
+    ResumoLaboratorio,
+    Status,
+)
+from app.services.referencias import buscar_status_por_id
+
+COLUNAS_STATUS = [status.name for status in StatusComputador]
+COLUNAS_RESUMO = ['laboratorio_id', 'total_computadores', *COLUNAS_STATUS, 'relatos_abertos']
+
+
+def consulta_resumo(laboratorio_id: int | None = None):
+    """Calcula as linhas do resumo a partir de computadores, status e relatos."""
+    relatos_abertos = (
+        select(func.count(RelatoProblema.id))
+        .join(Computador, RelatoProblema.computador_id == Computador.id)
+        .where(Computador.laboratorio_id == Laboratorio.id, RelatoProblema.auditada == false())
+        .scalar_subquery()
+    )
+    por_status = [
+        func.coalesce(func.sum(case((Status.nome == status, 1), else_=0)), 0).label(status.name)
+        for status in StatusComputador
+    ]
+    statement = (
+        select(
+            Laboratorio.id.label('laboratorio_id'),
+            func.count(Computador.id).label('total_computadores'),
+            *por_status,
+            relatos_abertos.label('relatos_abertos'),
+        )
+        .select_from(Laboratorio)
+        .outerjoin(Computador, Computador.laboratorio_id == Laboratorio.id)
+        .outerjoin(Status, Computador.status_id == Status.id)
+        .group_by(Laboratorio.id)
+    )
+    if laboratorio_id is not None:
+        statement = statement.where(Laboratorio.id == laboratorio_id)
+    return statement
+
+
+def _recalcular(laboratorio_id: int | None):
+    apagar = delete(ResumoLaboratorio)
+    if laboratorio_id is not None:
+        apagar = apagar.where(ResumoLaboratorio.laboratorio_id == laboratorio_id)
+    inserir = insert(ResumoLaboratorio).from_select(COLUNAS_RESUMO, consulta_resumo(laboratorio_id))
+    return apagar, inserir
+
+
+def recalcular_resumos(conn: Connection) -> None:
+    """Reconstrói o resumo de todos os laboratórios (migração e manutenção)."""
+    for statement in _recalcular(None):
+        conn.execute(statement)
+
+
+async def inserir_resumo(session: AsyncSession, laboratorio_id: int) -> bool:
+    """Cria a linha de `laboratorio_id` a partir das tabelas de origem, se ainda não existir.
+
+    Retorna se a linha foi inserida por esta chamada.
+    """
+    dialeto = session.get_bind().dialect.name
+    insert_dialeto = postgresql.insert if dialeto == 'postgresql' else sqlite.insert
+    result = await session.exec(
+        insert_dialeto(ResumoLaboratorio)
+        .from_select(COLUNAS_RESUMO, consulta_resumo(laboratorio_id))
+        .on_conflict_do_nothing(index_elements=[ResumoLaboratorio.laboratorio_id])
+    )
+    return result.rowcount > 0
+
+
+async def ajustar_resumo(
+    session: AsyncSession,
+    laboratorio_id: int | None,
+    *,
+    computadores: int = 0,
+    status: dict[int | None, int] | None = None,
+    relatos_abertos: int = 0,
+) -> None:
+    """Soma os deltas aos contadores de `laboratorio_id`.
+
+    `status` é indexado pelo id do Status: `{anterior: -1, novo: +1}` numa
+    troca de status, `{status_id: n}` ao cadastrar `n` computadores.
+    """
+    if laboratorio_id is None:
+        return
+    por_nome: dict[str, int] = {}
+    for status_id, delta in (status or {}).items():
+        if status_id is None or not delta:
+            continue
+        dados = await buscar_status_por_id(session, status_id)
+        if dados is not None:
+            nome = StatusComputador(dados['nome']).name
+            por_nome[nome] = por_nome.get(nome, 0) + delta
+
+    valores = {}
+    if computadores:
+        valores['total_computadores'] = ResumoLaboratorio.total_computadores + computadores
+    for nome, delta in por_nome.items():
+        if delta:
+            valores[nome] = getattr(ResumoLaboratorio, nome) + delta
+    if relatos_abertos:
+        valores['relatos_abertos'] = ResumoLaboratorio.relatos_abertos + relatos_abertos
+    if not valores:
+        return
+
+    statement = (
+        update(ResumoLaboratorio)
+        .where(ResumoLaboratorio.laboratorio_id == laboratorio_id)
+        .values(**valores)
+        .execution_options(synchronize_session=False)
+    )
+    if (await session.exec(statement)).rowcount > 0:
+        return
+    # A contagem inserida já inclui esta escrita; se a linha apareceu nesse meio
+    # tempo, o delta vai para ela
+    if not await inserir_resumo(session, laboratorio_id):
+        await session.exec(statement)
+
+
+def montar_resumo(laboratorio: Laboratorio, resumo: ResumoLaboratorio | None) -> dict:
+    """Formato de ResumoLaboratorioPublic; laboratórios sem linha aparecem zerados."""
+    return {
+        'laboratorio_id': laboratorio.id,
+        'nome': laboratorio.nome,
+        'local': laboratorio.local,
+        'total_computadores': resumo.total_computadores if resumo else 0,
+        'computadores_por_status': {
+            status: getattr(resumo, status.name) if resumo else 0 for status in StatusComputador
+        },
+        'relatos_abertos': resumo.relatos_abertos if resumo else 0,
+    }
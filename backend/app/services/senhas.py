@@ -0,0 +1,117 @@
+"""Hashing de senhas (PBKDF2) fora da thread da requisição.
+
+O trabalho pesado de CPU roda em um `ProcessPoolExecutor`, então a vazão de
+logins escala com o número de processos sem ocupar o event loop nem o pool de
+threads do anyio. Os processos são criados com `spawn`: um fork do worker do
+uvicorn herdaria o event loop, conexões abertas e threads em estado
+indefinido. Cada worker tem o próprio pool, por isso o padrão é pequeno.
+"""
+import asyncio
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from fastapi import HTTPException, status
+from app.config import settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+@cache
+def contexto_senhas() -> 'CryptContext':
+    # Importado no primeiro uso: o passlib não pesa na inicialização dos workers
+    from passlib.context import CryptContext
+    return CryptContext(schemes=['pbkdf2_sha256'], deprecated='auto')
+
+
+def _hash(senha: str) -> str:
+    return contexto_senhas().hash(senha)
+
+
+def _verificar(senha: str, senha_hash: str | None) -> bool:
+    return contexto_senhas().verify(senha, senha_hash)
+
+
+class ServicoSenhas:
+    """Executa hash/verificação de senhas em um pool de processos limitado.
+
+    Com `processos == 0` o trabalho roda em threads (útil em testes). Quando há
+    `fila_maxima` operações pendentes, novas chamadas recebem 503.
+    """
+
+    metodo_inicio = 'spawn'
+
+    def __init__(self, processos: int, fila_maxima: int) -> None:
+        self.processos = processos
+        self.fila_maxima = fila_maxima
+        self.em_andamento = 0
+        self.concluidas = 0
+        self.falhas = 0
+        self.rejeitadas = 0
+        self.tempo_total_segundos = 0.0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor | None:
+        if self._executor is None and self.processos > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processos,
+                mp_context=multiprocessing.get_context(self.metodo_inicio),
+            )
+        return self._executor
+
+    async def _executar(self, fn: Callable, *args: Any) -> Any:
+        if self.em_andamento >= self.fila_maxima:
+            self.rejeitadas += 1
+            raise HTTPException(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                'Servidor ocupado. Tente novamente em instantes.',
+                headers={'Retry-After': '1'},
+            )
+        self.em_andamento += 1
+        inicio = time.perf_counter()
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                resultado = await asyncio.to_thread(fn, *args)
+            else:
+                resultado = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BaseException:
+            self.falhas += 1
+            raise
+        finally:
+            self.em_andamento -= 1
+            self.tempo_total_segundos += time.perf_counter() - inicio
+        self.concluidas += 1
+        return resultado
+
+    async def hash(self, senha: str) -> str:
+        return await self._executar(_hash, senha)
+
+    async def verificar(self, senha: str, senha_hash: str | None) -> bool:
+        return await self._executar(_verificar, senha, senha_hash)
+
+    def estatisticas(self) -> dict[str, int | float]:
+        return {
+            'processos': self.processos,
+            'fila_maxima': self.fila_maxima,
+            'em_andamento': self.em_andamento,
+            'concluidas': self.concluidas,
+            'falhas': self.falhas,
+            'rejeitadas': self.rejeitadas,
+            'tempo_total_segundos': self.tempo_total_segundos,
+        }
+
+    def encerrar(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+servico_senhas = ServicoSenhas(
+    processos=settings.HASH_PROCESSOS,
+    fila_maxima=settings.HASH_FILA_MAXIMA,
+)
@@ -3,47 +3,61 @@ import string
 from datetime import datetime, timedelta, timezone
 
 import jwt
-import requests
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
-from sqlalchemy.exc import SQLAlchemyError
-from sqlmodel import Session, select
+from sqlalchemy import literal, union_all
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
 from app.database.enums import TipoUsuario
+from app.services.cache import CacheTTL
+from app.services.integridade import violou_chave_estrangeira, violou_unicidade
+from app.services.senhas import contexto_senhas, servico_senhas
 
 from app.database.models import (
     Administrador,
     Funcionario,
     FuncionarioCreate,
     FuncionarioPublic,
+    MatriculaFuncionario,
     Tecnico,
     Professor,
     Usuario,
     UsuarioCreate,
     Aluno,
+    TokenPayload,
     UsuarioPublic,
 )
 
 
+# Usuários já resolvidos a partir do token, indexados pelo `sub` (id do usuário).
+cache_usuarios = CacheTTL(
+    'usuarios',
+    settings.CACHE_USUARIOS_TAMANHO,
+    settings.CACHE_USUARIOS_TTL_SEGUNDOS,
+)
+
+
 def hash_password(plain_password: str) -> str:
-    return pwd_context.hash(plain_password)
+    return contexto_senhas().hash(plain_password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica se as senhas são equivalentes de acordo com o algoritmo de hashing."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return contexto_senhas().verify(plain_password, hashed_password)
 
 def generate_random_password(tamanho: int = 8) -> str:
     """Gera uma senha aleatória de {tamanho} caracteres."""
     characters = string.ascii_letters + string.digits
     return ''.join(secrets.choice(characters) for _ in range(tamanho))
 
-def create_usuario(session: Session,
-                   usuario: UsuarioCreate,
-                   *,
-                   usar_senha_aleatoria: bool = False) -> UsuarioPublic:
-    if get_user_by_email(session, usuario.email):
+async def create_usuario(session: AsyncSession,
+                         usuario: UsuarioCreate,
+                         *,
+                         usar_senha_aleatoria: bool = False) -> UsuarioPublic:
+    if await get_user_by_email(session, usuario.email):
         raise HTTPException(
             status.HTTP_409_CONFLICT,
             f'Um usuário com o email {usuario.email} já existe.',
@@ -52,69 +66,93 @@ def create_usuario(session: Session,
     usuario_db = Usuario.model_validate(
         usuario,
         update={
-            'senha_hash': hash_password(senha) if senha else None,
+            'senha_hash': await servico_senhas.hash(senha) if senha else None,
         },
     )
 
     try:
         session.add(usuario_db)
-        session.commit()
-    except (SQLAlchemyError, requests.exceptions.RequestException) as e:
-        session.rollback()
+        await session.commit()
+    except SQLAlchemyError as e:
+        await session.rollback()
         raise HTTPException(
             status.HTTP_500_INTERNAL_SERVER_ERROR,
             f'Erro ao criar usuário: {e!s}',
         )
-    session.refresh(usuario_db)
+    await session.refresh(usuario_db)
     return usuario_db
 
 
-def get_user_by_email(session: Session, email: str) -> Usuario | None:
+async def get_user_by_email(session: AsyncSession, email: str) -> Usuario | None:
     stmt = select(Usuario).where(Usuario.email == email)
-    return session.exec(stmt).first()
+    return (await session.exec(stmt)).first()
 
 
-def get_funcionario_by_matricula(session: Session, matricula: str) -> object | None:
-    tables = [Tecnico, Administrador, Professor]
-    for table in tables:
-        stmt = select(table).where(table.matricula == matricula)
-        funcionario = session.exec(stmt).first()
-        if funcionario is not None:
-            return funcionario
-    return None
+async def get_funcionario_by_matricula(session: AsyncSession, matricula: str) -> Funcionario | None:
+    """Busca um funcionário pelo registro único de matrículas (busca por chave primária)."""
+    registro = await session.get(MatriculaFuncionario, matricula)
+    if registro is None:
+        return None
+    table = user_table_from_tipo(registro.tipo_usuario)
+    return await session.get(
+        table,
+        registro.funcionario_id,
+        options=[selectinload(table.usuario)],
+    )
 
 
-def check_existing_matricula(session: Session, matricula: str) -> None:
-    exists_same_matricula = get_funcionario_by_matricula(session, matricula)
-    if exists_same_matricula:
+async def check_existing_matricula(session: AsyncSession, matricula: str) -> None:
+    if await session.get(MatriculaFuncionario, matricula) is not None:
         raise HTTPException(
             status.HTTP_409_CONFLICT,
             'Matrícula já cadastrada.',
         )
 
 
-def authenticate(session: Session, email: str, senha: str) -> Usuario | None:
-    usuario = get_user_by_email(session, email)
+async def authenticate(session: AsyncSession, email: str, senha: str) -> Usuario | None:
+    usuario = await get_user_by_email(session, email)
     if not usuario:
         return None
-    if not verify_password(senha, usuario.senha_hash):
+    if not await servico_senhas.verificar(senha, usuario.senha_hash):
         return None
     return usuario
 
 
-def busca_completa_tipo_usuario(session: Session, usuario: Usuario) -> tuple[object, TipoUsuario]:
-    tipos = [
-        (Administrador, TipoUsuario.administrador),
-        (Aluno, TipoUsuario.aluno),
-        (Tecnico, TipoUsuario.tecnico),
-        (Professor, TipoUsuario.professor),
+# Ordem de prioridade caso um usuário possua mais de um tipo.
+TIPOS_USUARIO = [
+    (Administrador, TipoUsuario.administrador),
+    (Aluno, TipoUsuario.aluno),
+    (Tecnico, TipoUsuario.tecnico),
+    (Professor, TipoUsuario.professor),
+]
+
+
+async def busca_tipo_usuario(session: AsyncSession, usuario_id: int) -> tuple[int, TipoUsuario] | None:
+    """Retorna o id específico e o tipo do usuário com um único UNION ALL."""
+    consultas = [
+        select(
+            literal(prioridade).label('prioridade'),
+            literal(tipo.value).label('tipo'),
+            table.id.label('id'),
+        ).where(table.usuario_id == usuario_id)
+        for prioridade, (table, tipo) in enumerate(TIPOS_USUARIO)
     ]
-    for table, tipo in tipos:  # noqa: RET503
-        usuario_especifico = session.exec(
-            select(table).where(table.usuario_id == usuario.id),
-        ).first()
-        if usuario_especifico:
-            return usuario_especifico, tipo
+    stmt = union_all(*consultas).order_by('prioridade').limit(1)
+    row = (await session.exec(stmt)).first()
+    if row is None:
+        return None
+    return row.id, TipoUsuario(row.tipo)
+
+
+async def busca_completa_tipo_usuario(
+    session: AsyncSession,
+    usuario: Usuario,
+) -> tuple[object, TipoUsuario]:
+    resultado = await busca_tipo_usuario(session, usuario.id)
+    if resultado is None:
+        return None, None
+    id_especifico, tipo = resultado
+    return await session.get(user_table_from_tipo(tipo), id_especifico), tipo
 
 
 def user_table_from_tipo(tipo_usuario: TipoUsuario) -> type:
@@ -129,8 +167,8 @@ def user_table_from_tipo(tipo_usuario: TipoUsuario) -> type:
             return Professor
 
 
-def usuario_especifico(
-    session: Session,
+async def usuario_especifico(
+    session: AsyncSession,
     usuario: Usuario,
     tipo_usuario_hint: TipoUsuario | None = None,
 ) -> tuple[object, TipoUsuario] | object:
@@ -140,25 +178,41 @@ def usuario_especifico(
     Caso contrário, retorna o objeto e o tipo dele.
     """
     if tipo_usuario_hint is None:
-        return busca_completa_tipo_usuario(session, usuario)
+        return await busca_completa_tipo_usuario(session, usuario)
     table = user_table_from_tipo(tipo_usuario_hint)
     stmt = select(table).where(table.usuario_id == usuario.id)
-    return session.exec(stmt).first()
+    return (await session.exec(stmt)).first()
 
 
-pwd_context = CryptContext(schemes=['pbkdf2_sha256'], deprecated='auto')
+class PapelUsuario:
+    """Papel do usuário autenticado, lido das claims assinadas do token.
+
+    `id` é o id específico (Administrador, Tecnico, ...) do usuário. A linha
+    correspondente só é consultada quando a rota chama `carregar`.
+    """
+
+    __slots__ = ('id', 'usuario_id', 'tipo_usuario')
+
+    def __init__(self, payload: TokenPayload) -> None:
+        self.id = payload.id_especifico
+        self.usuario_id = payload.sub
+        self.tipo_usuario = payload.tipo_usuario
+
+    async def carregar(self, session: AsyncSession) -> Aluno | Funcionario | None:
+        table = user_table_from_tipo(self.tipo_usuario)
+        return await session.get(table, self.id, options=[selectinload(table.usuario)])
 
 
 def create_access_token(
     usuario: Usuario,
-    usuario_especifico: Aluno | Funcionario,
+    id_especifico: int,
     tipo_usuario: TipoUsuario,
 ) -> str:
     expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     expire = datetime.now(timezone.utc) + expires_delta
     to_encode = {
         'exp': expire,
-        'id_especifico': usuario_especifico.id,
+        'id_especifico': id_especifico,
         'sub': usuario.id,
         'email': usuario.email,
         'tipo_usuario': tipo_usuario,
@@ -167,25 +221,54 @@ def create_access_token(
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def create_funcionario(
-    session: Session,
+# Chave primária de `matricula_funcionario`, a única restrição de unicidade da matrícula
+RESTRICAO_MATRICULA = 'matricula_funcionario_pkey'
+COLUNA_MATRICULA = 'matricula_funcionario.matricula'
+
+
+async def create_funcionario(
+    session: AsyncSession,
     tipo_usuario: TipoUsuario,
     funcionario: FuncionarioCreate,
 ) -> FuncionarioPublic:
     """Cria um funcionário (Professor, Admin ou Tecnico).
 
     ## Raises
-    Se um usuário com a Matrícula de `funcionario` já existir, retorna um erro 409.
+    Se um usuário com a Matrícula de `funcionario` já existir, retorna um erro 409;
+    se `administrador_id` não existir, um erro 404.
     """
-    check_existing_matricula(session, funcionario.matricula)
-    usuario = create_usuario(session, funcionario, usar_senha_aleatoria=True)
+    await check_existing_matricula(session, funcionario.matricula)
+    usuario = await create_usuario(session, funcionario, usar_senha_aleatoria=True)
     table = user_table_from_tipo(tipo_usuario)
     funcionario_db = table.model_validate(
         funcionario,
         update={'usuario_id': usuario.id},
     )
     session.add(funcionario_db)
-    session.commit()
-    session.refresh(funcionario_db)
+    try:
+        await session.flush()
+        session.add(MatriculaFuncionario(
+            matricula=funcionario_db.matricula,
+            tipo_usuario=tipo_usuario,
+            funcionario_id=funcionario_db.id,
+        ))
+        await session.commit()
+    except IntegrityError as erro:
+        await session.rollback()
+        await session.delete(usuario)
+        await session.commit()
+        if violou_unicidade(erro, RESTRICAO_MATRICULA, COLUNA_MATRICULA):
+            # Outra requisição registrou a mesma matrícula entre a verificação e o commit.
+            raise HTTPException(
+                status.HTTP_409_CONFLICT,
+                'Matrícula já cadastrada.',
+            )
+        if violou_chave_estrangeira(erro):
+            # A única referência informada pelo cliente é `administrador_id`.
+            raise HTTPException(
+                status.HTTP_404_NOT_FOUND,
+                'Administrador não encontrado.',
+            )
+        raise
+    await session.refresh(funcionario_db, ['usuario'])
     return funcionario_db
-
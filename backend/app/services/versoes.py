@@ -0,0 +1,63 @@
+"""Versões das coleções e ETags das respostas de leitura.
+
+Cada escrita incrementa, na mesma transação, o contador das coleções que
+altera. O ETag de uma leitura é derivado da URL e dos contadores das coleções
+que aparecem na resposta; se o cliente envia um `If-None-Match` ainda válido,
+a rota responde 304 lendo apenas esses contadores.
+"""
+import hashlib
+from collections.abc import Iterable
+from datetime import date
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.enums import Colecao
+from app.database.models import VersaoColecao
+
+
+async def incrementar_versoes(session: AsyncSession, *colecoes: Colecao) -> None:
+    """Marca `colecoes` como alteradas. Deve ser chamada antes do commit da escrita.
+
+    É um upsert: bancos criados por `create_all`, sem as linhas que a migração
+    das versões insere, ganham o contador na primeira escrita em vez de
+    manterem o mesmo ETag para sempre.
+    """
+    dialeto = session.get_bind().dialect.name
+    insert = postgresql.insert if dialeto == 'postgresql' else sqlite.insert
+    statement = insert(VersaoColecao).values(
+        [{'nome': colecao.value, 'versao': 1} for colecao in dict.fromkeys(colecoes)]
+    )
+    await session.exec(
+        statement.on_conflict_do_update(
+            index_elements=[VersaoColecao.nome],
+            set_={'versao': VersaoColecao.versao + 1},
+        )
+    )
+
+
+async def obter_versoes(session: AsyncSession, colecoes: Iterable[Colecao]) -> list[tuple[str, int]]:
+    statement = (
+        select(VersaoColecao.nome, VersaoColecao.versao)
+        .where(VersaoColecao.nome.in_([colecao.value for colecao in colecoes]))
+        .order_by(VersaoColecao.nome)
+    )
+    return list((await session.exec(statement)).all())
+
+
+def calcular_etag(caminho: str, query: str, versoes: list[tuple[str, int]]) -> str:
+    # A data entra no ETag porque `dias_desde_alteracao` é calculado na serialização.
+    chave = f'{caminho}?{query}|{versoes}|{date.today().isoformat()}'
+    return '"' + hashlib.sha1(chave.encode()).hexdigest() + '"'
+
+
+def etag_corresponde(if_none_match: str | None, etag: str) -> bool:
+    """Comparação fraca do `If-None-Match`, como pede a RFC 9110 para GET."""
+    if not if_none_match:
+        return False
+    for candidato in if_none_match.split(','):
+        candidato = candidato.strip()
+        if candidato == '*' or candidato.removeprefix('W/') == etag:
+            return True
+    return False
@@ -0,0 +1,98 @@
+"""Vazão de escritas concorrentes no SQLite em arquivo, antes e depois do perfil de engine.
+
+Compara uma engine criada com os parâmetros padrão do SQLAlchemy com a engine
+de `get_engine()` (WAL, `synchronous=NORMAL`, `busy_timeout`, cache e mmap).
+Cada thread escritora faz transações curtas enquanto as leitoras consultam a
+mesma tabela, como acontece com a API sob carga.
+
+Uso (a partir de `backend/`)::
+
+    python -m benchmarks.escrita_concorrente --escritores 8 --transacoes 200
+"""
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import Engine, create_engine, func
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
+
+from app.database.enums import StatusComputador
+from app.database.models import SQLModel, Status
+from app.database.utils import get_engine
+
+
+def executar(engine: Engine, escritores: int, leitores: int, transacoes: int) -> dict[str, float]:
+    SQLModel.metadata.create_all(engine)
+    erros = 0
+    lock_erros = threading.Lock()
+    parar_leitura = threading.Event()
+
+    def escrever() -> None:
+        nonlocal erros
+        for i in range(transacoes):
+            try:
+                with Session(engine) as session:
+                    session.add(Status(nome=StatusComputador.disponivel, descricao=f'benchmark {i}'))
+                    session.commit()
+            except OperationalError:
+                with lock_erros:
+                    erros += 1
+
+    def ler() -> None:
+        while not parar_leitura.is_set():
+            with Session(engine) as session:
+                session.exec(select(func.count()).select_from(Status)).one()
+
+    threads_leitura = [threading.Thread(target=ler) for _ in range(leitores)]
+    threads_escrita = [threading.Thread(target=escrever) for _ in range(escritores)]
+    for thread in threads_leitura:
+        thread.start()
+
+    inicio = time.perf_counter()
+    for thread in threads_escrita:
+        thread.start()
+    for thread in threads_escrita:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    parar_leitura.set()
+    for thread in threads_leitura:
+        thread.join()
+    engine.dispose()
+
+    total = escritores * transacoes
+    return {
+        'transacoes': total,
+        'erros': erros,
+        'segundos': duracao,
+        'escritas_por_segundo': (total - erros) / duracao,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--escritores', type=int, default=8)
+    parser.add_argument('--leitores', type=int, default=4)
+    parser.add_argument('--transacoes', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engines = {
+            'padrao': lambda url: create_engine(url, connect_args={'check_same_thread': False}),
+            'perfil': get_engine,
+        }
+        for nome, criar_engine in engines.items():
+            url = f'sqlite:///{Path(diretorio) / nome}.db'
+            resultado = executar(criar_engine(url), args.escritores, args.leitores, args.transacoes)
+            print(
+                f'{nome:>7}: {resultado["escritas_por_segundo"]:8.1f} escritas/s '
+                f'({resultado["transacoes"]} transações em {resultado["segundos"]:.2f}s, '
+                f'{resultado["erros"]} erros)'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""Custo de dashboards abertos: stream de eventos (SSE) contra polling.
+
+Sobe `app.main:app` no próprio processo sobre um SQLite em arquivo populado
+por `app.database.sintetico` e mede, por dashboard:
+
+- `polling`: CPU de um `GET /computadores/` (com e sem `If-None-Match`
+  válido), multiplicado pelas consultas de um dashboard a cada
+  `--intervalo-polling` segundos;
+- `sse`: com `--clientes` conexões abertas em `GET /eventos`, a memória de
+  cada conexão parada, a CPU de um heartbeat e a CPU para entregar um evento
+  a todos os clientes, projetadas com o intervalo padrão de heartbeat e
+  `--eventos-por-minuto` eventos.
+
+As conexões passam pelo app inteiro (middlewares e `StreamingResponse`), mas
+sem rede: os quadros enviados só são contados. Uso (a partir de `backend/`)::
+
+    python -m benchmarks.eventos --clientes 500 --saida eventos.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+
+class ClienteSSE:
+    """Conexão em `GET /eventos` feita direto pelo ASGI; conta os quadros recebidos."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.quadros = 0
+        self._desconectar = asyncio.Event()
+        self._tarefa: asyncio.Task | None = None
+
+    def conectar(self) -> None:
+        escopo = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': '/eventos', 'raw_path': b'/eventos', 'query_string': b'',
+            'root_path': '', 'headers': [], 'server': ('benchmark', 80), 'client': ('benchmark', 1),
+        }
+
+        async def receber() -> dict:
+            await self._desconectar.wait()
+            return {'type': 'http.disconnect'}
+
+        async def enviar(mensagem: dict) -> None:
+            if mensagem.get('body'):
+                self.quadros += 1
+
+        self._tarefa = asyncio.create_task(self.app(escopo, receber, enviar))
+
+    async def desconectar(self) -> None:
+        self._desconectar.set()
+        await self._tarefa
+
+
+async def aguardar(condicao, limite_segundos: float = 30) -> None:
+    fim = time.monotonic() + limite_segundos
+    while not condicao():
+        if time.monotonic() > fim:
+            raise SystemExit('Os clientes SSE não receberam os quadros a tempo.')
+        await asyncio.sleep(0.001)
+
+
+async def medir_polling(client: httpx.AsyncClient, repeticoes: int) -> dict[str, float]:
+    url = '/computadores/?limit=50'
+    etag = (await client.get(url)).headers['etag']
+
+    async def cpu_por_requisicao(headers: dict[str, str]) -> float:
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.process_time()
+            await client.get(url, headers=headers)
+            tempos.append(time.process_time() - inicio)
+        return statistics.median(tempos)
+
+    return {
+        'cpu_ms_200': await cpu_por_requisicao({}) * 1000,
+        'cpu_ms_304': await cpu_por_requisicao({'If-None-Match': etag}) * 1000,
+    }
+
+
+async def medir_sse(app, clientes: int, eventos: int, janela_segundos: float) -> dict[str, float]:
+    from app.database.enums import TipoEvento
+    from app.services.eventos import barramento
+
+    conexoes = [ClienteSSE(app) for _ in range(clientes)]
+    tracemalloc.start()
+    antes, _ = tracemalloc.get_traced_memory()
+    for conexao in conexoes:
+        conexao.conectar()
+    # O primeiro quadro (`retry`) indica que a assinatura já existe
+    await aguardar(lambda: all(conexao.quadros for conexao in conexoes))
+    depois, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Heartbeats: sem eventos, a CPU da janela é toda de heartbeats (e do loop ocioso)
+    recebidos = sum(conexao.quadros for conexao in conexoes)
+    inicio = time.process_time()
+    await asyncio.sleep(janela_segundos)
+    heartbeats = sum(conexao.quadros for conexao in conexoes) - recebidos
+    cpu_heartbeat = (time.process_time() - inicio) / heartbeats
+
+    # Eventos: cada um entregue a todos os clientes antes do próximo
+    dados = {'computador_id': 1, 'status_id': 2, 'status': 'Em manutenção', 'status_anterior_id': 1}
+    inicio = time.process_time()
+    for _ in range(eventos):
+        recebidos = sum(conexao.quadros for conexao in conexoes)
+        barramento.publicar(TipoEvento.computador_status, 1, dados)
+        await aguardar(lambda: sum(conexao.quadros for conexao in conexoes) >= recebidos + clientes)
+    cpu_evento = (time.process_time() - inicio) / eventos
+
+    for conexao in conexoes:
+        await conexao.desconectar()
+    assert barramento.conectadas == 0
+    return {
+        'memoria_kib_por_conexao': (depois - antes) / clientes / 1024,
+        'cpu_us_por_heartbeat': cpu_heartbeat * 1e6,
+        'cpu_us_evento_por_cliente': cpu_evento / clientes * 1e6,
+    }
+
+
+async def executar(args: argparse.Namespace) -> dict[str, Any]:
+    from app.config import Settings
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+            polling = await medir_polling(client, args.repeticoes)
+        sse = await medir_sse(app, args.clientes, args.eventos, args.janela)
+
+    # CPU por dashboard a cada minuto; no polling, no melhor caso todas as consultas dão 304
+    consultas = 60 / args.intervalo_polling
+    heartbeats = 60 / Settings.model_fields['EVENTOS_HEARTBEAT_SEGUNDOS'].default
+    resumo = {
+        'polling_cpu_ms_por_minuto_304': consultas * polling['cpu_ms_304'],
+        'polling_cpu_ms_por_minuto_200': consultas * polling['cpu_ms_200'],
+        'sse_cpu_ms_por_minuto': (
+            heartbeats * sse['cpu_us_por_heartbeat']
+            + args.eventos_por_minuto * sse['cpu_us_evento_por_cliente']
+        ) / 1000,
+    }
+    print(
+        f'polling a cada {args.intervalo_polling:g}s: {polling["cpu_ms_304"]:.2f} ms (304) / '
+        f'{polling["cpu_ms_200"]:.2f} ms (200) por consulta'
+    )
+    print(
+        f'sse com {args.clientes} clientes: {sse["memoria_kib_por_conexao"]:.1f} KiB por conexão, '
+        f'{sse["cpu_us_por_heartbeat"]:.1f} us por heartbeat, '
+        f'{sse["cpu_us_evento_por_cliente"]:.1f} us por evento, por cliente'
+    )
+    print(
+        f'CPU por dashboard por minuto: polling {resumo["polling_cpu_ms_por_minuto_304"]:.1f}'
+        f'-{resumo["polling_cpu_ms_por_minuto_200"]:.1f} ms, '
+        f'sse {resumo["sse_cpu_ms_por_minuto"]:.2f} ms ({args.eventos_por_minuto:g} eventos/min)'
+    )
+    return {'polling': polling, 'sse': sse, 'por_dashboard': resumo}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--escala', type=float, default=0.01, help='escala do gerador sintético')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--clientes', type=int, default=500, help='conexões SSE abertas')
+    parser.add_argument('--eventos', type=int, default=200, help='eventos publicados na medição')
+    parser.add_argument('--repeticoes', type=int, default=200, help='consultas medidas no polling')
+    parser.add_argument('--janela', type=float, default=2, help='segundos medindo só heartbeats')
+    parser.add_argument('--intervalo-polling', type=float, default=5)
+    parser.add_argument('--eventos-por-minuto', type=float, default=10,
+                        help='eventos de cada dashboard por minuto, na projeção')
+    parser.add_argument('--saida', type=Path, help='grava o resultado em JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = (Path(diretorio) / 'eventos.db').resolve()
+        os.environ['DATABASE_URL'] = f'sqlite:///{caminho}'
+        os.environ['RECALCULO_DIAS_INTERVALO_SEGUNDOS'] = '0'
+        os.environ['EVENTOS_MAXIMO_ASSINATURAS'] = str(args.clientes)
+        # Heartbeats frequentes na medição; a projeção usa o intervalo padrão
+        os.environ['EVENTOS_HEARTBEAT_SEGUNDOS'] = str(args.janela / 4)
+
+        from benchmarks.latencia import preparar_banco
+
+        preparar_banco(caminho, args.escala, args.semente)
+        resultados = asyncio.run(executar(args))
+
+    if args.saida:
+        args.saida.write_text(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Tempo até a primeira requisição de um worker recém-iniciado.
+
+Cada medição roda um processo Python novo que importa `app.main`, executa o
+lifespan (migrações e, no banco vazio, o cadastro inicial) e atende uma
+requisição pelo transporte ASGI. O tempo total conta desde o lançamento do
+processo, então inclui a inicialização do interpretador. São medidos dois
+cenários sobre um SQLite em arquivo:
+
+- `banco_vazio`: primeiro worker de uma instalação nova;
+- `banco_pronto`: worker extra de um autoscaling, com o banco já migrado.
+
+Uso (a partir de `backend/`)::
+
+    python -m benchmarks.inicializacao --repeticoes 5 --saida inicializacao.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Executado no processo filho; imprime as fases em JSON.
+WORKER = '''
+import asyncio, json, os, sys, time
+inicio = float(os.environ['BENCHMARK_INICIO'])
+interpretador = time.time() - inicio
+t = time.perf_counter()
+import httpx
+from app.main import app
+importacao = time.perf_counter() - t
+
+async def main():
+    t = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        lifespan = time.perf_counter() - t
+        t = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+            resposta = await client.get('/laboratorios/')
+        requisicao = time.perf_counter() - t
+        total = time.time() - inicio
+    assert resposta.status_code == 200, resposta.text
+    print(json.dumps({
+        'interpretador': interpretador, 'importacao': importacao, 'lifespan': lifespan,
+        'primeira_requisicao': requisicao, 'total': total,
+    }))
+
+asyncio.run(main())
+'''
+
+
+def medir(banco: Path, ambiente: dict[str, str]) -> dict[str, float]:
+    env = {
+        **os.environ,
+        **ambiente,
+        'DATABASE_URL': f'sqlite:///{banco}',
+        'RECALCULO_DIAS_INTERVALO_SEGUNDOS': '0',
+        'BENCHMARK_INICIO': repr(time.time()),
+    }
+    saida = subprocess.run(
+        [sys.executable, '-c', WORKER],
+        env=env, capture_output=True, text=True, cwd=Path(__file__).parent.parent,
+    )
+    if saida.returncode != 0:
+        raise SystemExit(f'O worker falhou:\n{saida.stderr}')
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--saida', type=Path, help='grava as medianas em JSON')
+    parser.add_argument('--env', action='append', default=[], metavar='CHAVE=VALOR',
+                        help='variável de ambiente extra para os workers (repetível)')
+    args = parser.parse_args()
+    ambiente = dict(item.split('=', 1) for item in args.env)
+
+    cenarios: dict[str, list[dict[str, float]]] = {'banco_vazio': [], 'banco_pronto': []}
+    with tempfile.TemporaryDirectory() as diretorio:
+        for i in range(args.repeticoes):
+            banco = Path(diretorio) / f'inicializacao{i}.db'
+            cenarios['banco_vazio'].append(medir(banco, ambiente))
+            cenarios['banco_pronto'].append(medir(banco, ambiente))
+
+    resultado = {}
+    for cenario, medicoes in cenarios.items():
+        resultado[cenario] = {
+            fase: statistics.median(medicao[fase] for medicao in medicoes)
+            for fase in medicoes[0]
+        }
+        fases = '  '.join(f'{fase} {1000 * valor:7.1f} ms' for fase, valor in resultado[cenario].items())
+        print(f'{cenario:<13} {fases}')
+
+    if args.saida:
+        args.saida.write_text(json.dumps(resultado, indent=2))
+
+
+if __name__ == '__main__':
+    main()
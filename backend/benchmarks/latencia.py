@@ -0,0 +1,286 @@
+"""Latência e vazão ponta a ponta dos fluxos principais da API.
+
+Sobe `app.main:app` no próprio processo (ASGI, sem rede) sobre um SQLite em
+arquivo populado por `app.database.sintetico` e mede, para cada fluxo,
+p50/p95/p99 e requisições por segundo com `--concorrencia` clientes
+simultâneos. O resultado é gravado em JSON para comparar commits::
+
+    python -m benchmarks.latencia --escala 0.01 --saida antes.json
+    # ... alterações ...
+    python -m benchmarks.latencia --escala 0.01 --saida depois.json --comparar antes.json
+
+Com `--banco` o arquivo do banco é mantido e reaproveitado nas execuções
+seguintes (a geração só acontece se ele estiver vazio).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+Requisicao = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def percentis(latencias: list[float]) -> dict[str, float]:
+    cortes = statistics.quantiles(latencias, n=100, method='inclusive')
+    return {
+        'p50_ms': cortes[49] * 1000,
+        'p95_ms': cortes[94] * 1000,
+        'p99_ms': cortes[98] * 1000,
+        'media_ms': statistics.fmean(latencias) * 1000,
+        'max_ms': max(latencias) * 1000,
+    }
+
+
+async def medir(
+    client: httpx.AsyncClient,
+    requisicao: Requisicao,
+    total: int,
+    concorrencia: int,
+    aquecimento: int,
+) -> dict[str, Any]:
+    for i in range(aquecimento):
+        await requisicao(client, i)
+
+    latencias: list[float] = []
+    erros = 0
+    proxima = iter(range(total))
+
+    async def cliente() -> None:
+        nonlocal erros
+        for i in proxima:
+            inicio = time.perf_counter()
+            resposta = await requisicao(client, aquecimento + i)
+            latencias.append(time.perf_counter() - inicio)
+            if resposta.status_code >= 400:
+                erros += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+    return {
+        'requisicoes': total,
+        'erros': erros,
+        **percentis(latencias),
+        'requisicoes_por_segundo': total / duracao,
+    }
+
+
+def preparar_banco(caminho: Path, escala: float, semente: int) -> None:
+    from sqlalchemy import func, select
+
+    from app.database.migracoes import migrar
+    from app.database.models import Computador
+    from app.database.sintetico import GeradorSintetico
+    from app.database.utils import get_engine
+
+    engine = get_engine(f'sqlite:///{caminho}')
+    with engine.begin() as conn:
+        migrar(conn)
+        if not conn.execute(select(func.count(Computador.id))).scalar():
+            GeradorSintetico(conn, escala, semente, date.today()).gerar()
+    engine.dispose()
+
+
+def referencias(caminho: Path) -> dict[str, list]:
+    """Ids usados para montar as requisições dos fluxos."""
+    from sqlalchemy import false, select
+
+    from app.database.models import Computador, RelatoProblema, Status, Tecnico, Usuario
+    from app.database.sintetico import SENHA_HASH_SINTETICA
+    from app.database.utils import get_engine
+
+    engine = get_engine(f'sqlite:///{caminho}')
+    with engine.connect() as conn:
+        def ids(statement) -> list:
+            return list(conn.execute(statement.limit(5000)).scalars())
+
+        dados = {
+            'emails': ids(select(Usuario.email).where(Usuario.senha_hash == SENHA_HASH_SINTETICA)),
+            # A auditoria de relatos exige o token de um técnico
+            'emails_tecnicos': ids(
+                select(Usuario.email)
+                .join(Tecnico, Tecnico.usuario_id == Usuario.id)
+                .where(Usuario.senha_hash == SENHA_HASH_SINTETICA)
+            ),
+            'computadores': ids(select(Computador.id)),
+            'tecnicos': ids(select(Tecnico.id)),
+            'status': ids(select(Status.id)),
+            'relatos_abertos': ids(select(RelatoProblema.id).where(RelatoProblema.auditada == false())),
+        }
+    engine.dispose()
+    return dados
+
+
+def fluxos(dados: dict[str, list], token: str, semente: int) -> dict[str, Requisicao]:
+    rng = random.Random(semente)
+    autorizacao = {'Authorization': f'Bearer {token}'}
+    hoje = date.today().isoformat()
+
+    def escolher(chave: str, i: int) -> Any:
+        return dados[chave][i % len(dados[chave])]
+
+    async def login(client, i):
+        return await client.post('/login/access-token', data={
+            'username': escolher('emails', i), 'password': 'sintetico',
+        })
+
+    async def perfil(client, i):
+        return await client.get('/usuarios/perfil', headers=autorizacao)
+
+    async def lista_computadores(client, i):
+        return await client.get('/computadores/', params={'limit': 50})
+
+    async def detalhe_computador(client, i):
+        return await client.get(f'/computadores/{rng.choice(dados["computadores"])}')
+
+    async def criacao_relato(client, i):
+        computador_id = rng.choice(dados['computadores'])
+        return await client.post('/relato-problemas/', json={
+            'descricao': 'Benchmark',
+            'computador_id': computador_id,
+            'computador_patrimonio': f'S{computador_id:08d}',
+            'usuario_id': 1,
+            'tecnico_id': None,
+        })
+
+    async def auditoria_relato(client, i):
+        return await client.put(f'/relato-problemas/{escolher("relatos_abertos", i)}', json={
+            'aceita': True,
+            'auditada': True,
+            'data_auditada': hoje,
+        })
+
+    async def criacao_alteracao(client, i):
+        return await client.post('/alteracoes/', json={
+            'computador_id': rng.choice(dados['computadores']),
+            'tecnico_id': escolher('tecnicos', i),
+            'status_id': escolher('status', i),
+            'tipo_alteracao': 'Manutenção',
+            'observacao': 'Benchmark',
+            'data_alteracao': hoje,
+        })
+
+    return {
+        'login': login,
+        'perfil': perfil,
+        'computadores_lista': lista_computadores,
+        'computadores_detalhe': detalhe_computador,
+        'relato_criacao': criacao_relato,
+        'relato_auditoria': auditoria_relato,
+        'alteracao_criacao': criacao_alteracao,
+    }
+
+
+async def executar(args: argparse.Namespace, caminho: Path) -> dict[str, Any]:
+    from app.main import app
+
+    dados = referencias(caminho)
+    resultados = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+            resposta = await client.post('/login/access-token', data={
+                'username': dados['emails_tecnicos'][0], 'password': 'sintetico',
+            })
+            resposta.raise_for_status()
+            token = resposta.json()['access_token']
+
+            for nome, requisicao in fluxos(dados, token, args.semente).items():
+                if args.fluxos and nome not in args.fluxos:
+                    continue
+                total = args.requisicoes_login if nome == 'login' else args.requisicoes
+                resultados[nome] = await medir(
+                    client, requisicao, total, args.concorrencia, args.aquecimento,
+                )
+                print(
+                    f'{nome:<22} p50 {resultados[nome]["p50_ms"]:8.2f} ms  '
+                    f'p95 {resultados[nome]["p95_ms"]:8.2f} ms  '
+                    f'p99 {resultados[nome]["p99_ms"]:8.2f} ms  '
+                    f'{resultados[nome]["requisicoes_por_segundo"]:8.1f} req/s  '
+                    f'{resultados[nome]["erros"]} erros'
+                )
+    return resultados
+
+
+def commit_atual() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual: dict[str, Any], anterior: dict[str, Any]) -> None:
+    print(f'\nComparação com {anterior["metadados"].get("commit")}:')
+    for nome, resultado in atual['fluxos'].items():
+        base = anterior['fluxos'].get(nome)
+        if base is None:
+            continue
+        variacoes = '  '.join(
+            f'{chave} {100 * (resultado[chave] - base[chave]) / base[chave]:+6.1f}%'
+            for chave in ('p50_ms', 'p95_ms', 'p99_ms', 'requisicoes_por_segundo')
+            if base[chave]
+        )
+        print(f'{nome:<22} {variacoes}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--escala', type=float, default=0.01, help='escala do gerador sintético')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--requisicoes', type=int, default=500, help='requisições medidas por fluxo')
+    parser.add_argument('--requisicoes-login', type=int, default=50,
+                        help='requisições do fluxo de login (PBKDF2 é caro de propósito)')
+    parser.add_argument('--concorrencia', type=int, default=8)
+    parser.add_argument('--aquecimento', type=int, default=10, help='requisições descartadas por fluxo')
+    parser.add_argument('--fluxos', nargs='*', help='mede apenas estes fluxos')
+    parser.add_argument('--banco', type=Path, help='arquivo SQLite mantido entre execuções')
+    parser.add_argument('--saida', type=Path, help='grava o resultado em JSON')
+    parser.add_argument('--comparar', type=Path, help='JSON de uma execução anterior')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = (args.banco or Path(diretorio) / 'benchmark.db').resolve()
+        # A configuração é lida na importação de `app`, então o ambiente vem antes
+        os.environ['DATABASE_URL'] = f'sqlite:///{caminho}'
+        os.environ['RECALCULO_DIAS_INTERVALO_SEGUNDOS'] = '0'
+
+        inicio = time.perf_counter()
+        preparar_banco(caminho, args.escala, args.semente)
+        print(f'Banco pronto em {time.perf_counter() - inicio:.1f}s ({caminho})')
+        resultados = asyncio.run(executar(args, caminho))
+
+    saida = {
+        'metadados': {
+            'commit': commit_atual(),
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'escala': args.escala,
+            'semente': args.semente,
+            'concorrencia': args.concorrencia,
+        },
+        'fluxos': resultados,
+    }
+    if args.saida:
+        args.saida.write_text(json.dumps(saida, indent=2, ensure_ascii=False))
+    if args.comparar:
+        comparar(saida, json.loads(args.comparar.read_text()))
+
+
+if __name__ == '__main__':
+    main()
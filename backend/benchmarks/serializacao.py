@@ -0,0 +1,192 @@
+"""CPU e memória das listagens: ORM + pydantic contra modelos de leitura + orjson.
+
+Para cada listagem, monta a mesma resposta JSON pelos dois caminhos sobre um
+SQLite em arquivo populado por `app.database.sintetico`:
+
+- `orm`: entidades com os relacionamentos carregados, validadas pelo modelo
+  `*Public` e serializadas como o FastAPI faz com o `response_model`;
+- `leitura`: colunas selecionadas em DTOs com `__slots__` e `orjson.dumps`
+  (`app.services.leitura`, o caminho usado pelas rotas).
+
+O tempo de CPU (mediana de `--repeticoes`) e o pico de memória alocada
+(tracemalloc) são normalizados por 10 mil linhas; em `laboratorios` a linha
+é cada computador embutido na resposta. Uso (a partir de `backend/`)::
+
+    python -m benchmarks.serializacao --escala 0.1 --saida serializacao.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+LINHAS_REFERENCIA = 10_000
+
+# Caminho -> função que recebe a sessão e devolve (corpo JSON, linhas)
+Caminho = Callable[[Any], Awaitable[tuple[bytes, int]]]
+
+
+def caminhos(limite: int) -> dict[str, dict[str, Caminho]]:
+    from pydantic import TypeAdapter
+    from sqlmodel import select
+
+    from app.database.models import (
+        Computador,
+        ComputadorPublic,
+        HistoricoAlteracao,
+        HistoricoAlteracaoPublic,
+        Laboratorio,
+        LaboratorioPublic,
+        RelatoProblema,
+        RelatoProblemaPublic,
+    )
+    from app.routes import alteracoes, computadores, laboratorios, relato_problemas
+    from app.services import leitura
+
+    def serializar_como_fastapi(adapter: TypeAdapter, objetos: list) -> bytes:
+        # `serialize_response` valida a partir dos atributos e o JSONResponse usa o json da stdlib
+        validado = adapter.validate_python(objetos, from_attributes=True)
+        conteudo = adapter.dump_python(validado, mode='json')
+        return json.dumps(conteudo, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode()
+
+    def orm(modelo, publico, relacionamentos) -> Caminho:
+        adapter = TypeAdapter(list[publico])
+
+        async def executar(session) -> tuple[bytes, int]:
+            statement = select(modelo).options(*relacionamentos).order_by(modelo.id).limit(limite)
+            objetos = list((await session.exec(statement)).all())
+            return serializar_como_fastapi(adapter, objetos), len(objetos)
+        return executar
+
+    def por_leitura(consulta, montar, modelo) -> Caminho:
+        async def executar(session) -> tuple[bytes, int]:
+            linhas = (await session.exec(consulta().order_by(modelo.id).limit(limite))).all()
+            itens = montar(linhas)
+            return leitura.RespostaJSON(itens).body, len(itens)
+        return executar
+
+    adapter_laboratorios = TypeAdapter(list[LaboratorioPublic])
+
+    async def laboratorios_orm(session) -> tuple[bytes, int]:
+        statement = (
+            select(Laboratorio)
+            .options(*laboratorios.CARREGAR_RELACIONAMENTOS)
+            .order_by(Laboratorio.id)
+            .limit(limite)
+        )
+        objetos = list((await session.exec(statement)).all())
+        corpo = serializar_como_fastapi(adapter_laboratorios, objetos)
+        return corpo, sum(len(laboratorio.computadores) for laboratorio in objetos)
+
+    async def laboratorios_leitura(session) -> tuple[bytes, int]:
+        statement = leitura.consulta_laboratorios().order_by(Laboratorio.id).limit(limite)
+        itens = await leitura.montar_laboratorios(session, (await session.exec(statement)).all())
+        return leitura.RespostaJSON(itens).body, sum(len(item.computadores) for item in itens)
+
+    return {
+        'computadores': {
+            'orm': orm(Computador, ComputadorPublic, computadores.CARREGAR_RELACIONAMENTOS),
+            'leitura': por_leitura(leitura.consulta_computadores, leitura.montar_computadores, Computador),
+        },
+        'laboratorios': {'orm': laboratorios_orm, 'leitura': laboratorios_leitura},
+        'alteracoes': {
+            'orm': orm(HistoricoAlteracao, HistoricoAlteracaoPublic, alteracoes.CARREGAR_RELACIONAMENTOS),
+            'leitura': por_leitura(leitura.consulta_alteracoes, leitura.montar_alteracoes, HistoricoAlteracao),
+        },
+        'relatos': {
+            'orm': orm(RelatoProblema, RelatoProblemaPublic, relato_problemas.CARREGAR_RELACIONAMENTOS),
+            'leitura': por_leitura(leitura.consulta_relatos, leitura.montar_relatos, RelatoProblema),
+        },
+    }
+
+
+async def medir(engine, caminho: Caminho, repeticoes: int) -> dict[str, float]:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    async def uma_vez() -> tuple[bytes, int]:
+        # Sessão nova a cada execução: o identity map não pode servir de cache
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            return await caminho(session)
+
+    await uma_vez()  # aquecimento (conexões, caches de compilação do SQL)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.process_time()
+        corpo, linhas = await uma_vez()
+        tempos.append(time.process_time() - inicio)
+
+    tracemalloc.start()
+    try:
+        await uma_vez()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    escala = LINHAS_REFERENCIA / max(linhas, 1)
+    return {
+        'linhas': linhas,
+        'bytes_resposta': len(corpo),
+        'cpu_ms_por_10k': statistics.median(tempos) * 1000 * escala,
+        'pico_memoria_mib_por_10k': pico / 2**20 * escala,
+    }
+
+
+async def executar(args: argparse.Namespace, caminho_banco: Path) -> dict[str, Any]:
+    from app.database.utils import get_async_engine
+
+    engine = get_async_engine(f'sqlite:///{caminho_banco}')
+    resultados: dict[str, Any] = {}
+    try:
+        for listagem, variantes in caminhos(args.linhas).items():
+            if args.listagens and listagem not in args.listagens:
+                continue
+            resultados[listagem] = {
+                nome: await medir(engine, caminho, args.repeticoes)
+                for nome, caminho in variantes.items()
+            }
+            orm, leitura = resultados[listagem]['orm'], resultados[listagem]['leitura']
+            print(
+                f'{listagem:<13} {leitura["linhas"]:>6} linhas  '
+                f'CPU {orm["cpu_ms_por_10k"]:8.1f} -> {leitura["cpu_ms_por_10k"]:7.1f} ms/10k  '
+                f'memória {orm["pico_memoria_mib_por_10k"]:7.1f} -> '
+                f'{leitura["pico_memoria_mib_por_10k"]:6.1f} MiB/10k'
+            )
+    finally:
+        await engine.dispose()
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--escala', type=float, default=0.1, help='escala do gerador sintético')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--linhas', type=int, default=LINHAS_REFERENCIA, help='itens por listagem')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--listagens', nargs='*', help='mede apenas estas listagens')
+    parser.add_argument('--banco', type=Path, help='arquivo SQLite mantido entre execuções')
+    parser.add_argument('--saida', type=Path, help='grava o resultado em JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_banco = (args.banco or Path(diretorio) / 'serializacao.db').resolve()
+        os.environ['DATABASE_URL'] = f'sqlite:///{caminho_banco}'
+        # Consultas de 10 mil linhas passam do limite do log de SQL lenta de propósito
+        os.environ.setdefault('SQL_LENTA_MS', '60000')
+
+        from benchmarks.latencia import preparar_banco
+
+        preparar_banco(caminho_banco, args.escala, args.semente)
+        resultados = asyncio.run(executar(args, caminho_banco))
+
+    if args.saida:
+        args.saida.write_text(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
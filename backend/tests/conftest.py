@@ -1,36 +1,143 @@
-from collections.abc import Generator
+import asyncio
+from collections import Counter
+from collections.abc import AsyncGenerator, Callable, Generator, Iterator
+from contextlib import contextmanager
+from pathlib import Path
 
 import pytest
-from sqlmodel import Session, StaticPool, create_engine
+from sqlalchemy import Engine, NullPool, event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette.testclient import TestClient
 
+from app.config import settings
+from app.database.enums import TipoUsuario
+from app.database.instrumentacao import contar_consultas, instrumentar
 from app.database.models import SQLModel
-from app.deps import get_db
+from app.database.utils import populate_db
+from app.deps import get_async_db
 from app.main import app
+from app.services.cache import CacheTTL, caches
+from app.services.usuarios import create_access_token, user_table_from_tipo
 
 
-@pytest.fixture(name='session')
-def session_fixture() -> Generator:
-    """Create a new session as a test fixture."""
+@pytest.fixture(autouse=True)
+def n_mais_um_como_erro(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Nos testes, um N+1 em qualquer rota falha com `ConsultaRepetida`."""
+    monkeypatch.setattr(settings, 'SQL_N_MAIS_UM_MODO', 'erro')
+
+
+@pytest.fixture(autouse=True)
+def caches_vazios() -> None:
+    """Os caches são do processo: cada teste começa sem entradas de outro banco."""
+    for cache in caches.values():
+        if isinstance(cache, CacheTTL):
+            cache.limpar()
+        else:
+            asyncio.run(cache.limpar())
+
+
+@pytest.fixture(name='database_path')
+def database_path_fixture(tmp_path: Path) -> Path:
+    """SQLite file shared by the sync (fixtures) and async (app) engines."""
+    return tmp_path / 'test.db'
+
+
+@pytest.fixture(name='engine')
+def engine_fixture(database_path: Path) -> Generator:
+    """Create a new sync engine as a test fixture."""
     engine = create_engine(
-        'sqlite://',
+        f'sqlite:///{database_path}',
         connect_args={'check_same_thread': False},
-        poolclass=StaticPool,
     )
     SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(name='async_engine')
+def async_engine_fixture(engine: Engine, database_path: Path) -> AsyncEngine:
+    """Create the async engine used by the app, on the same database as `engine`."""
+    async_engine = create_async_engine(f'sqlite+aiosqlite:///{database_path}', poolclass=NullPool)
+    instrumentar(async_engine.sync_engine)
+    return async_engine
+
 
+@pytest.fixture(name='chaves_estrangeiras')
+def chaves_estrangeiras_fixture(async_engine: AsyncEngine) -> None:
+    """Enforce foreign keys on the app's SQLite connections, like Postgres does."""
+    @event.listens_for(async_engine.sync_engine, 'connect')
+    def ativar(dbapi_connection, _connection_record) -> None:
+        dbapi_connection.execute('PRAGMA foreign_keys=ON')
+
+
+@pytest.fixture(name='session')
+def session_fixture(engine: Engine) -> Generator:
+    """Create a new session as a test fixture."""
     with Session(engine) as session:
         yield session
 
 
+@pytest.fixture(name='dados')
+def dados_fixture(session: Session) -> Session:
+    """Banco com os dados de exemplo de `populate_db` (3 laboratórios, 2 computadores)."""
+    populate_db(session)
+    session.expunge_all()
+    return session
+
+
+@pytest.fixture(name='autenticar')
+def autenticar_fixture(dados: Session) -> Callable[[TipoUsuario, int], dict[str, str]]:
+    """Headers com o token de `id_especifico` (Tecnico, Administrador, ...) dos dados de exemplo."""
+    def autenticar(tipo_usuario: TipoUsuario, id_especifico: int) -> dict[str, str]:
+        registro = dados.get(user_table_from_tipo(tipo_usuario), id_especifico)
+        token = create_access_token(registro.usuario, id_especifico, tipo_usuario)
+        return {'Authorization': f'Bearer {token}'}
+
+    return autenticar
+
+
 @pytest.fixture(name='client')
-def client_fixture(session: Session) -> Generator:
-    """Create a new HTTP client as a test fixture."""
-    def get_db_override() -> Session:
-        return session
+def client_fixture(session: Session, async_engine: AsyncEngine) -> Generator:
+    """Create a new HTTP client as a test fixture.
+
+    Data written through `session` must be committed to be seen by the app.
+    """
+    async def get_async_db_override() -> AsyncGenerator[AsyncSession]:
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            yield db
 
-    app.dependency_overrides[get_db] = get_db_override
+    app.dependency_overrides[get_async_db] = get_async_db_override
 
     client = TestClient(app)
     yield client
-    app.dependency_overrides.clear()
\ No newline at end of file
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(name='assert_max_queries')
+def assert_max_queries_fixture(async_engine: AsyncEngine) -> Callable:
+    """Context manager that fails if the block issues more than `n` SQL statements.
+
+    With `repeticoes`, it also fails if any single statement runs more than that
+    many times (a tighter N+1 check than the global `SQL_N_MAIS_UM_REPETICOES`).
+
+    Usage::
+
+        with assert_max_queries(3):
+            client.get('/computadores/')
+    """
+    @contextmanager
+    def assert_max_queries(n: int, repeticoes: int | None = None) -> Iterator[list[str]]:
+        with contar_consultas(async_engine.sync_engine) as statements:
+            yield statements
+        assert len(statements) <= n, (
+            f'Expected at most {n} queries, got {len(statements)}:\n' + '\n'.join(statements)
+        )
+        if repeticoes is not None:
+            statement, vezes = Counter(statements).most_common(1)[0] if statements else ('', 0)
+            assert vezes <= repeticoes, (
+                f'Statement ran {vezes} times (max {repeticoes}):\n{statement}'
+            )
+
+    return assert_max_queries
@@ -0,0 +1,148 @@
+from datetime import date
+
+from sqlalchemy import Engine, delete, text, update
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from app.database.models import Computador, Laboratorio, RelatoProblema
+from app.services.busca import indexacao_adiada, reconstruir_indice_busca
+
+
+def buscar(client: TestClient, q: str, **params) -> list[tuple[str, int]]:
+    resposta = client.get('/busca', params={'q': q, 'limit': 500, **params})
+    assert resposta.status_code == 200, resposta.text
+    return [(item['tipo'], item['id']) for item in resposta.json()]
+
+
+def novo_computador(**campos) -> dict:
+    return {
+        'patrimonio': 'BUS1', 'hostname': 'zeta-01', 'marca': 'Lenovo', 'ano_aquisicao': 2024,
+        'sistema_operacional': 'linux', 'data_ultima_alteracao': date.today().isoformat(),
+        'status_nome': 'disponivel', 'status_descricao': 'Disponível',
+        'laboratorio_nome': 'Lab de Extensão 1', 'laboratorio_local': 'STI', 'tecnico_id': 1,
+        **campos,
+    }
+
+
+def abrir_relato(client: TestClient, computador_id: int, descricao: str) -> int:
+    resposta = client.post('/relato-problemas/', json={
+        'descricao': descricao, 'computador_id': computador_id,
+        'computador_patrimonio': None, 'usuario_id': 1, 'tecnico_id': None,
+    })
+    assert resposta.status_code == 200, resposta.text
+    return resposta.json()['id']
+
+
+def test_indice_acompanha_insercoes_alteracoes_e_exclusoes(client: TestClient, dados: Session):
+    resposta = client.post('/computadores/', json=novo_computador())
+    assert resposta.status_code == 200, resposta.text
+    computador_id = resposta.json()['id']
+    relato_id = abrir_relato(client, computador_id, 'Teclado quebrado')
+    resposta = client.put('/laboratorios/3', json={
+        'nome': 'Lab de Robótica', 'local': 'STI', 'administrador_id': 1,
+    })
+    assert resposta.status_code == 200, resposta.text
+
+    assert buscar(client, 'zeta') == [('computador', computador_id)]
+    assert buscar(client, 'bus1 lenovo') == [('computador', computador_id)]
+    assert buscar(client, 'teclado') == [('relato', relato_id)]
+    # Acentos são ignorados; o nome antigo sai do índice
+    assert buscar(client, 'robotica') == [('laboratorio', 3)]
+    assert buscar(client, 'extensao', tipo='laboratorio') == [('laboratorio', 1)]
+
+    dados.exec(update(Computador).where(Computador.id == computador_id).values(hostname='omega-01'))
+    dados.exec(update(RelatoProblema).where(RelatoProblema.id == relato_id).values(descricao='Mouse solto'))
+    dados.commit()
+    assert buscar(client, 'zeta') == []
+    assert buscar(client, 'omega') == [('computador', computador_id)]
+    assert buscar(client, 'teclado') == []
+    assert buscar(client, 'mouse') == [('relato', relato_id)]
+
+    dados.exec(delete(RelatoProblema).where(RelatoProblema.id == relato_id))
+    dados.exec(delete(Computador).where(Computador.id == computador_id))
+    dados.exec(delete(Laboratorio).where(Laboratorio.id == 3))
+    dados.commit()
+    assert buscar(client, 'omega') == []
+    assert buscar(client, 'mouse') == []
+    assert buscar(client, 'robotica') == []
+
+
+def test_todos_os_termos_como_prefixo_e_filtro_por_tipo(client: TestClient, dados: Session):
+    relato_id = abrir_relato(client, 1, 'Lab sem internet')
+
+    assert sorted(buscar(client, 'lab ext')) == [('laboratorio', 1), ('laboratorio', 3)]
+    assert buscar(client, 'lab hard') == [('laboratorio', 2)]
+    assert buscar(client, 'ext ccet') == []
+
+    laboratorios = [('laboratorio', 1), ('laboratorio', 2), ('laboratorio', 3)]
+    assert sorted(buscar(client, 'lab')) == [*laboratorios, ('relato', relato_id)]
+    assert sorted(buscar(client, 'lab', tipo='laboratorio')) == laboratorios
+    assert buscar(client, 'lab', tipo='relato') == [('relato', relato_id)]
+    assert sorted(buscar(client, 'lab', tipo=['relato', 'computador'])) == [('relato', relato_id)]
+    assert client.get('/busca', params={'q': '!!'}).status_code == 400
+
+
+def test_paginas_de_um_resultado_sem_repeticoes_nem_lacunas(client: TestClient, dados: Session):
+    for i in range(4):
+        abrir_relato(client, 1 + i % 2, f'Lab {i} sem rede')
+    todos = buscar(client, 'lab')
+    assert len(todos) == 7
+
+    paginas: list[tuple[str, int]] = []
+    cursor = None
+    while True:
+        resposta = client.get('/busca', params={'q': 'lab', 'limit': 1, 'cursor': cursor})
+        assert resposta.status_code == 200, resposta.text
+        assert len(resposta.json()) <= 1
+        paginas += [(item['tipo'], item['id']) for item in resposta.json()]
+        cursor = resposta.headers.get('x-proximo-cursor')
+        if cursor is None:
+            break
+
+    assert paginas == todos
+
+
+def test_computadores_importados_aparecem_na_busca(client: TestClient, dados: Session):
+    resposta = client.post('/computadores/bulk', headers={'Content-Type': 'text/csv'}, content=(
+        'patrimonio,hostname,marca,ano_aquisicao,sistema_operacional,data_ultima_alteracao,'
+        'status_nome,status_descricao,laboratorio_nome,laboratorio_local,tecnico_id\n'
+        'IMP1,kappa-01,Positivo,2020,linux,2024-01-10,Disponível,Disponível,Lab de Extensão 1,STI,1\n'
+        'IMP2,kappa-02,Positivo,2020,linux,2024-01-10,Disponível,Disponível,Lab de Hardware,CCET,1\n'
+    ).encode())
+    assert resposta.status_code == 200, resposta.text
+    assert resposta.json()['inseridos'] == 2
+
+    resultados = client.get('/busca', params={'q': 'kappa positivo'}).json()
+    assert sorted(item['titulo'] for item in resultados) == ['kappa-01 (IMP1)', 'kappa-02 (IMP2)']
+
+
+def test_indexacao_adiada_reindexa_no_fim_da_carga(client: TestClient, dados: Session, engine: Engine):
+    indexados = text("SELECT count(*) FROM busca WHERE tipo = 'computador'")
+    with engine.begin() as conn:
+        antes = conn.execute(indexados).scalar()
+        with indexacao_adiada(conn):
+            conn.execute(Computador.__table__.insert(), [
+                {
+                    'patrimonio': f'CAR{i}', 'hostname': f'carga-{i}', 'marca': 'Dell', 'ano_aquisicao': 2020,
+                    'sistema_operacional': 'linux', 'status_id': 1, 'laboratorio_id': 1,
+                    'dias_desde_alteracao': 0,
+                }
+                for i in range(3)
+            ])
+            # Sem os triggers, a carga não passa pelo índice
+            assert conn.execute(indexados).scalar() == antes
+        assert conn.execute(indexados).scalar() == antes + 3
+    assert len(buscar(client, 'carga')) == 3
+
+    # Os triggers voltaram
+    resposta = client.post('/computadores/', json=novo_computador(hostname='carga-9'))
+    assert resposta.status_code == 200, resposta.text
+    assert len(buscar(client, 'carga')) == 4
+
+    with engine.begin() as conn:
+        conn.execute(text('DELETE FROM busca'))
+    assert buscar(client, 'carga') == []
+    with engine.begin() as conn:
+        reconstruir_indice_busca(conn)
+    assert len(buscar(client, 'carga')) == 4
+    assert len(buscar(client, 'lab', tipo='laboratorio')) == 3
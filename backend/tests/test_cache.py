@@ -0,0 +1,122 @@
+import time
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import jwt
+import pytest
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from app.config import settings
+from app.database.enums import TipoUsuario
+from app.services import cache
+from app.services.usuarios import cache_usuarios
+
+
+def contadores(client: TestClient, nome: str) -> tuple[int, int]:
+    estatisticas = client.get('/cache').json()[nome]
+    return estatisticas['hits'], estatisticas['misses']
+
+
+def test_troca_de_senha_invalida_o_usuario_em_cache(client: TestClient, dados: Session, autenticar):
+    headers = autenticar(TipoUsuario.tecnico, 1)
+    hits, misses = contadores(client, 'usuarios')
+    assert client.post('/login/test-token', headers=headers).status_code == 200
+    assert client.post('/login/test-token', headers=headers).status_code == 200
+    hits, misses = hits + 1, misses + 1
+    assert contadores(client, 'usuarios') == (hits, misses)
+
+    resposta = client.post('/login/trocar-senha', headers=headers, json={
+        'senha_atual': 'nilton', 'nova_senha': 'nova-senha-123',
+    })
+    assert resposta.status_code == 200, resposta.text
+    # A própria troca ainda foi atendida pelo cache
+    assert contadores(client, 'usuarios') == (hits + 1, misses)
+
+    assert client.post('/login/test-token', headers=headers).status_code == 200
+    assert contadores(client, 'usuarios') == (hits + 1, misses + 1)
+    assert client.post('/login/access-token', data={
+        'username': 'nilton@exemplo.com', 'password': 'nova-senha-123',
+    }).status_code == 200
+
+
+def test_usuario_em_cache_expira_junto_com_o_token(
+    client: TestClient, dados: Session, autenticar, monkeypatch: pytest.MonkeyPatch,
+):
+    # O TTL do cache é maior que a validade restante do token
+    monkeypatch.setattr(cache_usuarios, 'ttl_segundos', 3600)
+    valido = autenticar(TipoUsuario.tecnico, 1)['Authorization'].removeprefix('Bearer ')
+    payload = jwt.decode(valido, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    payload['exp'] = datetime.now(timezone.utc) + timedelta(seconds=60)
+    headers = {'Authorization': f'Bearer {jwt.encode(payload, settings.SECRET_KEY, settings.ALGORITHM)}'}
+
+    hits, misses = contadores(client, 'usuarios')
+    client.post('/login/test-token', headers=headers)
+    client.post('/login/test-token', headers=headers)
+    assert contadores(client, 'usuarios') == (hits + 1, misses + 1)
+
+    # 90 s depois para o cache (o token continua válido para o JWT): a entrada
+    # venceu no `exp` do token, antes do TTL
+    relogio = SimpleNamespace(time=time.time, monotonic=lambda: time.monotonic() + 90)
+    monkeypatch.setattr(cache, 'time', relogio)
+    assert client.post('/login/test-token', headers=headers).status_code == 200
+    assert contadores(client, 'usuarios') == (hits + 1, misses + 2)
+
+
+def cadastrar_computador(client: TestClient, patrimonio: str, nome: str, local: str):
+    return client.post('/computadores/', json={
+        'patrimonio': patrimonio, 'hostname': patrimonio.lower(), 'marca': 'Dell', 'ano_aquisicao': 2024,
+        'sistema_operacional': 'linux', 'data_ultima_alteracao': date.today().isoformat(),
+        'status_nome': 'disponivel', 'status_descricao': 'Disponível',
+        'laboratorio_nome': nome, 'laboratorio_local': local, 'tecnico_id': 1,
+    })
+
+
+def test_alterar_laboratorio_invalida_o_cache_de_referencias(client: TestClient, dados: Session):
+    hits, misses = contadores(client, 'laboratorios')
+    assert cadastrar_computador(client, 'REF1', 'Lab de Extensão 1', 'STI').status_code == 200
+    assert cadastrar_computador(client, 'REF2', 'Lab de Extensão 1', 'STI').status_code == 200
+    assert contadores(client, 'laboratorios') == (hits + 1, misses + 1)
+
+    resposta = client.put('/laboratorios/1', json={
+        'nome': 'Lab Renomeado', 'local': 'Bloco C', 'administrador_id': 1,
+    })
+    assert resposta.status_code == 200, resposta.text
+
+    # Com o cache ainda aquecido, o nome antigo continuaria resolvendo para o laboratório 1
+    antigo = cadastrar_computador(client, 'REF3', 'Lab de Extensão 1', 'STI')
+    assert antigo.status_code == 404
+    novo = cadastrar_computador(client, 'REF4', 'Lab Renomeado', 'Bloco C')
+    assert novo.status_code == 200, novo.text
+    laboratorio = novo.json()['laboratorio']
+    assert (laboratorio['id'], laboratorio['nome'], laboratorio['local']) == (1, 'Lab Renomeado', 'Bloco C')
+    assert contadores(client, 'laboratorios') == (hits + 1, misses + 3)
+
+
+def test_criar_laboratorio_invalida_o_cache_de_referencias(client: TestClient, dados: Session):
+    assert cadastrar_computador(client, 'REF1', 'Lab de Hardware', 'CCET').status_code == 200
+    hits, misses = contadores(client, 'laboratorios')
+
+    resposta = client.post('/laboratorios/', json={
+        'nome': 'Lab Novo', 'local': 'Bloco D', 'administrador_id': 1,
+    })
+    assert resposta.status_code == 200, resposta.text
+
+    assert cadastrar_computador(client, 'REF2', 'Lab de Hardware', 'CCET').status_code == 200
+    assert cadastrar_computador(client, 'REF3', 'Lab Novo', 'Bloco D').status_code == 200
+    assert contadores(client, 'laboratorios') == (hits, misses + 2)
+
+
+def test_criar_status_invalida_o_cache_de_referencias(client: TestClient, dados: Session):
+    url = '/status/Disponível/Disponível/'
+    hits, misses = contadores(client, 'status')
+    assert client.get(url).json()['id'] == 1
+    assert client.get(url).json()['id'] == 1
+    assert contadores(client, 'status') == (hits + 1, misses + 1)
+
+    resposta = client.post('/status/', json={'nome': 'Reservado', 'descricao': 'Reservado'})
+    assert resposta.status_code == 200, resposta.text
+
+    assert client.get(url).json()['id'] == 1
+    assert client.get('/status/Reservado/Reservado/').json()['id'] == resposta.json()['id']
+    assert contadores(client, 'status') == (hits + 1, misses + 3)
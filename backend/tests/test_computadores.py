@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+
+import pytest
+
+from sqlmodel import Session, func, select
+from starlette.testclient import TestClient
+
+from app.database.models import Computador
+from app.services import computadores
+
+
+def cadastrar(session: Session, dias: list[int | None]) -> None:
+    """Computadores com a última alteração há `dias`; a coluna gravada fica desatualizada."""
+    for i, dia in enumerate(dias):
+        session.add(Computador(
+            patrimonio=f'ORD{i}',
+            hostname=f'ORD{i}',
+            marca='Dell',
+            ano_aquisicao=2020,
+            sistema_operacional='linux',
+            status_id=1,
+            laboratorio_id=1,
+            data_ultima_alteracao=None if dia is None else date.today() - timedelta(days=dia),
+            dias_desde_alteracao=0,
+        ))
+    session.commit()
+
+
+def listar_paginas(client: TestClient, **params) -> list[dict]:
+    itens: list[dict] = []
+    cursor = None
+    while True:
+        resposta = client.get('/computadores/', params={**params, 'limit': 2, 'cursor': cursor})
+        assert resposta.status_code == 200, resposta.text
+        itens += resposta.json()
+        cursor = resposta.headers.get('x-proximo-cursor')
+        if cursor is None:
+            return itens
+
+
+def test_ordena_pelos_dias_calculados_na_leitura(client: TestClient, dados: Session):
+    cadastrar(dados, [30, 3, 300, 3, 0, 90])
+
+    crescente = listar_paginas(client, ordenar_por='dias_desde_alteracao', laboratorio_id=1)
+    dias = [item['dias_desde_alteracao'] for item in crescente if item['patrimonio'].startswith('ORD')]
+    assert dias == [0, 3, 3, 30, 90, 300]
+    assert len({item['id'] for item in crescente}) == len(crescente)
+
+    decrescente = listar_paginas(
+        client, ordenar_por='dias_desde_alteracao', ordem='desc', laboratorio_id=1,
+    )
+    assert [item['id'] for item in decrescente] == [item['id'] for item in reversed(crescente)]
+
+
+def test_computador_sem_data_fica_por_ultimo_na_ordem_crescente(client: TestClient, dados: Session):
+    cadastrar(dados, [None, 10])
+
+    itens = listar_paginas(client, ordenar_por='dias_desde_alteracao', laboratorio_id=1)
+    assert itens[-1]['patrimonio'] == 'ORD0'
+
+
+def novo_computador(**campos) -> dict:
+    return {
+        'patrimonio': 'NOVO1', 'hostname': 'novo1', 'marca': 'Dell', 'ano_aquisicao': 2024,
+        'sistema_operacional': 'linux', 'data_ultima_alteracao': date.today().isoformat(),
+        'status_nome': 'disponivel', 'status_descricao': 'Disponível',
+        'laboratorio_nome': 'Lab de Extensão 1', 'laboratorio_local': 'STI', 'tecnico_id': 1,
+        **campos,
+    }
+
+
+def contar_computadores(session: Session) -> int:
+    return session.exec(select(func.count()).select_from(Computador)).one()
+
+
+def test_patrimonio_repetido_retorna_409(client: TestClient, dados: Session):
+    antes = contar_computadores(dados)
+
+    resposta = client.post('/computadores/', json=novo_computador(patrimonio='12345'))
+
+    assert resposta.status_code == 409
+    assert resposta.json()['detail'] == 'Já existe um computador com este patrimônio.'
+    assert contar_computadores(dados) == antes
+
+
+def test_tecnico_inexistente_retorna_404(client: TestClient, dados: Session, chaves_estrangeiras):
+    antes = contar_computadores(dados)
+
+    resposta = client.post('/computadores/', json=novo_computador(tecnico_id=99))
+
+    assert resposta.status_code == 404
+    assert resposta.json()['detail'] == 'Técnico não encontrado'
+    assert contar_computadores(dados) == antes
+    assert client.post('/computadores/', json=novo_computador()).status_code == 200
+
+
+def test_recalculo_periodico_continua_depois_de_uma_falha(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture,
+):
+    rodadas = []
+
+    async def recalcular(_session) -> int:
+        rodadas.append(len(rodadas))
+        if len(rodadas) == 1:
+            raise RuntimeError('banco indisponível')
+        if len(rodadas) == 3:
+            raise asyncio.CancelledError
+        return 0
+
+    monkeypatch.setattr(computadores, 'recalcular_dias_desde_alteracao', recalcular)
+
+    with caplog.at_level(logging.ERROR, logger='app.computadores'), pytest.raises(asyncio.CancelledError):
+        asyncio.run(computadores.recalculo_periodico(0))
+
+    assert rodadas == [0, 1, 2]
+    [registro] = caplog.records
+    assert registro.exc_info[0] is RuntimeError
@@ -0,0 +1,31 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from app.config import Settings
+from app.database.utils import get_async_engine, get_engine
+
+
+def test_url_padrao_compartilha_o_banco_entre_as_engines(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.chdir(tmp_path)
+    url = Settings.model_fields['DATABASE_URL'].default
+    engine = get_engine(url)
+    async_engine = get_async_engine(url)
+
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE marcador (valor INTEGER)'))
+        conn.execute(text('INSERT INTO marcador VALUES (42)'))
+
+    async def ler() -> int:
+        async with async_engine.connect() as conn:
+            return (await conn.execute(text('SELECT valor FROM marcador'))).scalar_one()
+
+    try:
+        assert asyncio.run(ler()) == 42
+    finally:
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
@@ -0,0 +1,76 @@
+from datetime import date
+
+import pytest
+from sqlmodel import Session, select
+from starlette.testclient import TestClient
+
+from app.database.enums import TipoAlteracao
+from app.database.models import (
+    Computador,
+    HistoricoAlteracao,
+    RelatoProblema,
+    Tecnico,
+    Usuario,
+)
+
+ROTAS = [
+    '/computadores/',
+    '/computadores/1',
+    '/laboratorios/',
+    '/laboratorios/1',
+    '/alteracoes/',
+    '/alteracoes/{alteracao}',
+    '/relato-problemas/',
+    '/relato-problemas/{relato}',
+    '/usuarios/tecnicos',
+]
+
+
+def semear(session: Session, quantidade: int) -> None:
+    """Acrescenta `quantidade` técnicos, computadores, alterações e relatos nos dados de exemplo."""
+    inicio = session.exec(select(Usuario.id).order_by(Usuario.id.desc())).first()
+    for i in range(inicio + 1, inicio + 1 + quantidade):
+        usuario = Usuario(nome=f'Técnico {i}', email=f'tecnico{i}@exemplo.com')
+        tecnico = Tecnico(matricula=f'T{i}', usuario=usuario, administrador_id=1 + i % 2)
+        computador = Computador(
+            patrimonio=f'N{i}', hostname=f'n{i}', marca='Dell', ano_aquisicao=2020,
+            sistema_operacional='linux', status_id=1 + i % 2, laboratorio_id=1 + i % 3,
+            tecnico=tecnico, data_ultima_alteracao=date.today(), dias_desde_alteracao=0,
+        )
+        session.add_all([
+            HistoricoAlteracao(
+                computador=computador, tecnico=tecnico, status_id=computador.status_id,
+                tipo_alteracao=TipoAlteracao.cadastro, data_alteracao=date.today(), observacao=None,
+            ),
+            RelatoProblema(
+                computador=computador, usuario=usuario, tecnico=tecnico,
+                computador_patrimonio=None, auditada=False,
+            ),
+        ])
+    session.commit()
+
+
+@pytest.mark.parametrize('rota', ROTAS)
+def test_consultas_nao_crescem_com_as_linhas(
+    client: TestClient, dados: Session, assert_max_queries, rota: str,
+):
+    semear(dados, 2)
+    url = rota.format(
+        alteracao=dados.exec(select(HistoricoAlteracao.id)).first(),
+        relato=dados.exec(select(RelatoProblema.id)).first(),
+    )
+    with assert_max_queries(20) as consultas:
+        resposta = client.get(url)
+        assert resposta.status_code == 200
+    poucas_linhas = len(consultas)
+    tamanho = len(resposta.content)
+
+    semear(dados, 30)
+    # Com 15x mais linhas, nenhum comando a mais e nenhum repetido
+    with assert_max_queries(poucas_linhas, repeticoes=1):
+        resposta = client.get(url, params={'limit': 500} if rota.endswith('/') else None)
+        assert resposta.status_code == 200
+    if rota.endswith('/'):
+        # A listagem (ou os computadores aninhados) trouxe as linhas novas
+        assert len(resposta.content) > 5 * tamanho
+
@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from starlette.testclient import TestClient
+
+from app.config import settings
+from app.database.enums import TipoEvento
+from app.main import app
+from app.services.eventos import barramento
+
+EM_MANUTENCAO = {'status_nome': 'em_manutencao', 'status_descricao': 'Em Manutenção'}
+DISPONIVEL = {'status_nome': 'disponivel', 'status_descricao': 'Disponível'}
+
+
+async def ler_sse(query: bytes, quadros: int, durante) -> list[bytes]:
+    """Abre `GET /eventos` pelo ASGI, executa `durante()` e desconecta após `quadros` quadros.
+
+    O TestClient só devolve a resposta quando o corpo termina, o que nunca
+    acontece num stream; por isso a conexão é feita direto no app.
+    """
+    recebidos: list[bytes] = []
+    completo = asyncio.Event()
+
+    async def receber() -> dict:
+        await completo.wait()
+        return {'type': 'http.disconnect'}
+
+    async def enviar(mensagem: dict) -> None:
+        if mensagem.get('body'):
+            recebidos.append(mensagem['body'])
+            if len(recebidos) >= quadros:
+                completo.set()
+
+    escopo = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': '/eventos', 'raw_path': b'/eventos', 'query_string': query,
+        'root_path': '', 'headers': [], 'server': ('teste', 80), 'client': ('teste', 1),
+    }
+    conexao = asyncio.create_task(app(escopo, receber, enviar))
+    while not recebidos:
+        await asyncio.sleep(0.01)
+    await durante()
+    await asyncio.wait_for(conexao, timeout=5)
+    return recebidos
+
+
+def test_sse_filtra_por_laboratorio_e_encerra_ao_desconectar(client: TestClient, dados):
+    async def cenario() -> list[bytes]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://teste') as cliente:
+            async def alterar_status() -> None:
+                # Computador 2 fica no laboratório 2: não entra no stream do laboratório 1
+                await cliente.put('/computadores/2', params=DISPONIVEL)
+                resposta = await cliente.put('/computadores/1', params=EM_MANUTENCAO)
+                assert resposta.status_code == 200
+
+            return await ler_sse(b'laboratorio_id=1', 2, alterar_status)
+
+    retry, evento = asyncio.run(cenario())
+    assert retry == b'retry: 5000\n\n'
+    assert evento.startswith(b'id: ')
+    assert b'event: computador.status\n' in evento
+    assert b'"laboratorio_id":1' in evento
+    assert b'"computador_id":1' in evento
+    assert barramento.conectadas == 0
+
+
+def test_sse_envia_heartbeat(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, 'EVENTOS_HEARTBEAT_SEGUNDOS', 0.05)
+
+    async def nada() -> None:
+        pass
+
+    quadros = asyncio.run(ler_sse(b'', 3, nada))
+    assert quadros[1:] == [b': heartbeat\n\n', b': heartbeat\n\n']
+
+
+def test_sse_descarta_os_mais_antigos(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, 'EVENTOS_BUFFER', 2)
+
+    async def publicar_sem_consumir() -> None:
+        for i in range(5):
+            barramento.publicar(TipoEvento.relato_criado, 1, {'i': i})
+
+    quadros = asyncio.run(ler_sse(b'', 3, publicar_sem_consumir))
+    assert quadros[1] == b'event: descartados\ndata: {"tipo":"descartados","quantidade":3}\n\n'
+    assert b'"dados":{"i":3}' in quadros[2] and b'"dados":{"i":4}' in quadros[2]
+    assert b'"i":2' not in quadros[2]
+
+
+def test_websocket_recebe_eventos_do_laboratorio(client: TestClient, dados):
+    with client.websocket_connect('/eventos/ws?laboratorio_id=1') as ws:
+        # Sem troca de status não há evento; a troca seguinte é a primeira mensagem
+        client.put('/computadores/1', params=DISPONIVEL)
+        client.put('/computadores/2', params=DISPONIVEL)
+        client.put('/computadores/1', params=EM_MANUTENCAO)
+        mensagem = ws.receive_json()
+
+    assert mensagem['tipo'] == 'computador.status'
+    assert mensagem['laboratorio_id'] == 1
+    assert mensagem['dados']['computador_id'] == 1
+    assert mensagem['dados']['status_anterior_id'] == 1
+    assert mensagem['dados']['status_id'] == 2
+
+
+def test_websocket_troca_de_laboratorios(client: TestClient, dados):
+    relato = {
+        'descricao': 'Não liga', 'computador_id': 2, 'usuario_id': 1,
+        'computador_patrimonio': None, 'tecnico_id': None,
+    }
+    with client.websocket_connect('/eventos/ws?laboratorio_id=1') as ws:
+        ws.send_json({'laboratorios': [2]})
+        # A troca é aplicada por outra tarefa; espera até valer antes de escrever
+        for _ in range(100):
+            if 2 in barramento._assinaturas:
+                break
+            time.sleep(0.01)
+        assert client.post('/relato-problemas/', json=relato).status_code == 200
+        mensagem = ws.receive_json()
+
+    assert mensagem['tipo'] == 'relato.criado'
+    assert mensagem['laboratorio_id'] == 2
+
+
+def test_websocket_fecha_com_mensagem_invalida(client: TestClient):
+    with client.websocket_connect('/eventos/ws') as ws:
+        ws.send_text('[1, 2]')
+        fechamento = ws.receive()
+
+    assert fechamento['type'] == 'websocket.close'
+    assert fechamento['code'] == 1003
+    assert barramento.conectadas == 0
@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+from datetime import date
+
+import pandas as pd
+import pytest
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from app.database.enums import TipoAlteracao
+from app.database.models import HistoricoAlteracao
+from app.services import exportacao
+
+COLUNAS = [
+    'id', 'data_alteracao', 'tipo_alteracao', 'observacao', 'computador_id',
+    'computador_patrimonio', 'computador_hostname', 'laboratorio_id', 'laboratorio_nome',
+    'laboratorio_local', 'tecnico_id', 'tecnico_nome', 'status_id', 'status_nome', 'status_descricao',
+]
+
+
+@pytest.fixture(name='historico')
+def historico_fixture(dados: Session, monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """Alterações em janeiro, fevereiro e março nos computadores 1 (lab 1) e 2 (lab 2)."""
+    # Partes pequenas: o arquivo é montado a partir de várias partes
+    monkeypatch.setattr(exportacao, 'TAMANHO_PARTE', 2)
+    alteracoes = [
+        HistoricoAlteracao(
+            computador_id=computador_id, tecnico_id=1, status_id=computador_id,
+            tipo_alteracao=TipoAlteracao.manutencao, data_alteracao=date(2024, mes, 10),
+            observacao=f'Troca de peça, "lote {mes}"\nsegunda linha',
+        )
+        for mes in (1, 2, 3)
+        for computador_id in (1, 2)
+    ]
+    dados.add_all(alteracoes)
+    dados.commit()
+    return [alteracao.id for alteracao in alteracoes]
+
+
+def exportar(client: TestClient, formato: str, **params) -> bytes:
+    resposta = client.get('/alteracoes/export', params={'format': formato, **params})
+    assert resposta.status_code == 200, resposta.text
+    assert f'alteracoes.{formato}' in resposta.headers['content-disposition']
+    return resposta.content
+
+
+def ler_csv(conteudo: bytes) -> list[dict]:
+    leitor = csv.DictReader(io.StringIO(conteudo.decode()))
+    linhas = list(leitor)
+    assert leitor.fieldnames == COLUNAS
+    return linhas
+
+
+def test_csv_tem_todas_as_linhas_e_colunas(client: TestClient, historico: list[int]):
+    linhas = ler_csv(exportar(client, 'csv'))
+
+    assert [int(linha['id']) for linha in linhas] == historico
+    primeira = linhas[0]
+    assert primeira['data_alteracao'] == '2024-01-10'
+    assert primeira['tipo_alteracao'] == 'Manutenção'
+    assert primeira['observacao'] == 'Troca de peça, "lote 1"\nsegunda linha'
+    assert (primeira['computador_patrimonio'], primeira['laboratorio_nome']) == ('12345', 'Lab de Extensão 1')
+    assert primeira['status_nome'] == 'Disponível'
+
+
+def test_ndjson_tem_todas_as_linhas_e_colunas(client: TestClient, historico: list[int]):
+    linhas = [json.loads(linha) for linha in exportar(client, 'ndjson').decode().splitlines()]
+
+    assert [linha['id'] for linha in linhas] == historico
+    assert all(list(linha) == COLUNAS for linha in linhas)
+    assert linhas[1]['data_alteracao'] == '2024-01-10'
+    assert (linhas[1]['laboratorio_id'], linhas[1]['laboratorio_local']) == (2, 'CCET')
+    assert linhas[1]['status_descricao'] == 'Em Manutenção'
+
+
+def test_parquet_lido_com_pandas(client: TestClient, historico: list[int]):
+    df = pd.read_parquet(io.BytesIO(exportar(client, 'parquet')))
+
+    assert list(df.columns) == COLUNAS
+    assert df['id'].tolist() == historico
+    assert df['data_alteracao'].tolist() == [date(2024, mes, 10) for mes in (1, 1, 2, 2, 3, 3)]
+    assert df['laboratorio_id'].tolist() == [1, 2] * 3
+    assert set(df['tipo_alteracao']) == {'Manutenção'}
+    # Todas as alterações são do técnico 1
+    assert df['tecnico_nome'].notna().all() and df['tecnico_nome'].nunique() == 1
+
+
+@pytest.mark.parametrize('formato', ['csv', 'ndjson', 'parquet'])
+def test_filtros_de_data_e_laboratorio(client: TestClient, historico: list[int], formato: str):
+    params = {'from': '2024-02-01', 'to': '2024-03-10', 'laboratorio_id': 2}
+    conteudo = exportar(client, formato, **params)
+    if formato == 'csv':
+        ids = [int(linha['id']) for linha in ler_csv(conteudo)]
+    elif formato == 'ndjson':
+        ids = [json.loads(linha)['id'] for linha in conteudo.decode().splitlines()]
+    else:
+        ids = pd.read_parquet(io.BytesIO(conteudo))['id'].tolist()
+
+    # Fevereiro e março (o limite `to` é inclusivo), só o computador 2
+    assert ids == [historico[3], historico[5]]
+
+
+@pytest.mark.parametrize('formato', ['csv', 'ndjson', 'parquet'])
+def test_exportacao_vazia(client: TestClient, historico: list[int], formato: str):
+    conteudo = exportar(client, formato, **{'from': '2030-01-01'})
+    if formato == 'csv':
+        assert ler_csv(conteudo) == []
+    elif formato == 'ndjson':
+        assert conteudo == b''
+    else:
+        df = pd.read_parquet(io.BytesIO(conteudo))
+        assert (list(df.columns), len(df)) == (COLUNAS, 0)
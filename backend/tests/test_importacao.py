@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, select
+from starlette.testclient import TestClient
+
+from app.database.models import Computador
+from app.services import importacao
+
+CABECALHO = (
+    'patrimonio,hostname,marca,ano_aquisicao,sistema_operacional,data_ultima_alteracao,'
+    'status_nome,status_descricao,laboratorio_nome,laboratorio_local,tecnico_id\n'
+)
+
+
+def linha_csv(patrimonio: str, marca: str = 'Dell') -> str:
+    return (
+        f'{patrimonio},pc-{patrimonio},{marca},2020,linux,2024-01-10,'
+        'Disponível,Disponível,Lab de Extensão 1,STI,1\n'
+    )
+
+
+def importar(client: TestClient, corpo: str) -> dict:
+    resposta = client.post(
+        '/computadores/bulk', content=corpo.encode(), headers={'Content-Type': 'text/csv'},
+    )
+    assert resposta.status_code == 200, resposta.text
+    return resposta.json()
+
+
+def test_campo_entre_aspas_com_quebra_de_linha(client: TestClient, dados: Session):
+    corpo = (
+        CABECALHO
+        + linha_csv('IMP1', marca='"Dell\nOptiPlex, 7010"')
+        + '\n'
+        + linha_csv('IMP2', marca='""')[:-1] + ',coluna extra\n'
+        + linha_csv('IMP3')
+    )
+
+    resultado = importar(client, corpo)
+
+    assert resultado['inseridos'] == 2
+    # O primeiro registro ocupa as linhas 2 e 3; a linha 4 está em branco
+    assert resultado['erros'] == [
+        {'linha': 5, 'erro': 'Esperadas 11 colunas, encontradas 12.'},
+    ]
+    marca = dados.exec(select(Computador.marca).where(Computador.patrimonio == 'IMP1')).one()
+    assert marca == 'Dell\nOptiPlex, 7010'
+
+
+def test_aspas_nao_fechadas_no_fim_do_arquivo(client: TestClient, dados: Session):
+    resultado = importar(client, CABECALHO + linha_csv('IMP1', marca='"Dell'))
+
+    assert resultado['inseridos'] == 0
+    assert resultado['erros'] == [{'linha': 2, 'erro': 'Campo entre aspas não foi fechado.'}]
+
+
+def test_lista_de_erros_limitada(
+    client: TestClient, dados: Session, monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(importacao, 'MAXIMO_ERROS_LISTADOS', 2)
+    corpo = CABECALHO + ''.join(f'INV{i},sem colunas\n' for i in range(5)) + linha_csv('IMP1')
+
+    resultado = importar(client, corpo)
+
+    assert resultado['total'] == 6
+    assert resultado['inseridos'] == 1
+    assert resultado['total_erros'] == 5
+    assert [erro['linha'] for erro in resultado['erros']] == [2, 3]
+
+
+def test_lote_com_falha_no_banco_confirma_as_demais_em_um_commit(
+    client: TestClient, dados: Session, async_engine: AsyncEngine,
+):
+    commits: list[None] = []
+
+    @event.listens_for(async_engine.sync_engine, 'commit')
+    def contar_commit(_conn) -> None:
+        commits.append(None)
+
+    # 12345 já está cadastrado e IMP2 se repete: o executemany do lote falha
+    patrimonios = ['IMP1', '12345', 'IMP2', 'IMP2', 'IMP3']
+    resultado = importar(client, CABECALHO + ''.join(map(linha_csv, patrimonios)))
+
+    assert resultado['inseridos'] == 3
+    assert [erro['linha'] for erro in resultado['erros']] == [3, 5]
+    assert all('UNIQUE' in erro['erro'] for erro in resultado['erros'])
+    assert len(commits) == 1
+    importados = dados.exec(
+        select(Computador.patrimonio).where(Computador.patrimonio.startswith('IMP'))
+    ).all()
+    assert sorted(importados) == ['IMP1', 'IMP2', 'IMP3']
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from app.config import settings
+from app.database.instrumentacao import ConsultaRepetida, contar_consultas, instrumentar, rastrear_consultas
+
+
+def test_detector_de_n_mais_um_levanta_no_modo_erro(monkeypatch: pytest.MonkeyPatch):
+    # O modo `erro` vem da fixture automática `n_mais_um_como_erro`
+    monkeypatch.setattr(settings, 'SQL_N_MAIS_UM_REPETICOES', 2)
+    engine = create_engine('sqlite://')
+    instrumentar(engine)
+
+    with engine.connect() as conn, rastrear_consultas(lambda: 'GET /teste'):
+        for _ in range(2):
+            conn.execute(text('SELECT 1'))
+        with pytest.raises(ConsultaRepetida, match='GET /teste'):
+            conn.execute(text('SELECT 1'))
+
+
+def test_assert_max_queries_falha_com_comando_repetido(
+    client: TestClient, dados: Session, assert_max_queries,
+):
+    with pytest.raises(AssertionError, match='ran 2 times'):
+        with assert_max_queries(10, repeticoes=1):
+            client.get('/computadores/1')
+            client.get('/computadores/2')
+
+
+def test_contar_consultas_lista_os_comandos_do_bloco():
+    engine = create_engine('sqlite://')
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+        with contar_consultas(engine) as comandos:
+            conn.execute(text('SELECT 2'))
+        conn.execute(text('SELECT 3'))
+    assert comandos == ['SELECT 2']
+
+
+def test_requisicao_soma_os_comandos_e_o_tempo_no_banco():
+    engine = create_engine('sqlite://')
+    instrumentar(engine)
+
+    with engine.connect() as conn, rastrear_consultas(lambda: 'GET /teste') as consultas:
+        conn.execute(text('SELECT 1'))
+        conn.execute(text('SELECT 2'))
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 3'))
+
+    # Base das séries `http_request_db_*` de `/metrics`
+    assert consultas.consultas == 2
+    assert consultas.segundos > 0
@@ -0,0 +1,73 @@
+import jwt
+import pytest
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from app.config import settings
+from app.database.enums import TipoUsuario
+
+# Rotas restritas a um papel: qualquer outro papel recebe 401
+ROTAS_POR_PAPEL = [
+    (TipoUsuario.tecnico, 'POST', '/relato-problemas/claim'),
+    (TipoUsuario.tecnico, 'PUT', '/relato-problemas/1'),
+    (TipoUsuario.administrador, 'PUT', '/relato-problemas/lote'),
+]
+
+
+def login(client: TestClient, email: str, senha: str):
+    return client.post('/login/access-token', data={'username': email, 'password': senha})
+
+
+def decodificar(token: str) -> dict:
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+@pytest.mark.parametrize(('email', 'tipo_usuario'), [
+    ('julio@exemplo.com', TipoUsuario.administrador),
+    ('nilton@exemplo.com', TipoUsuario.tecnico),
+    ('rodolfo@exemplo.com', TipoUsuario.professor),
+    ('luisa@exemplo.com', TipoUsuario.aluno),
+])
+def test_login_resolve_o_papel_com_uma_consulta(
+    client: TestClient, dados: Session, assert_max_queries, email: str, tipo_usuario: TipoUsuario,
+):
+    with assert_max_queries(5) as consultas:
+        resposta = login(client, email, email.split('@')[0])
+
+    assert resposta.status_code == 200, resposta.text
+    payload = decodificar(resposta.json()['access_token'])
+    assert (payload['tipo_usuario'], payload['id_especifico'], payload['email']) == (tipo_usuario, 1, email)
+    # Os quatro papéis são procurados num único UNION ALL
+    assert sum('UNION ALL' in consulta for consulta in consultas) == 1
+
+
+def test_usuario_sem_papel_recebe_403(client: TestClient, dados: Session):
+    resposta = login(client, 'gustavo@exemplo.com', 'gustavo')
+
+    assert resposta.status_code == 403
+    assert resposta.json()['detail'] == 'Usuário sem perfil associado.'
+
+
+def test_senha_errada_recebe_400(client: TestClient, dados: Session):
+    assert login(client, 'julio@exemplo.com', 'nilton').status_code == 400
+
+
+@pytest.mark.parametrize(('papel', 'metodo', 'url'), ROTAS_POR_PAPEL)
+def test_token_de_outro_papel_recebe_401(
+    client: TestClient, dados: Session, autenticar, papel: TipoUsuario, metodo: str, url: str,
+):
+    for tipo_usuario in TipoUsuario:
+        if tipo_usuario == papel:
+            continue
+        resposta = client.request(metodo, url, json={}, headers=autenticar(tipo_usuario, 1))
+        assert resposta.status_code == 401, tipo_usuario
+        assert resposta.json()['detail'] == 'Usuário não autorizado.'
+
+
+def test_token_com_papel_desconhecido_recebe_401(client: TestClient, dados: Session, autenticar):
+    payload = decodificar(autenticar(TipoUsuario.tecnico, 1)['Authorization'].removeprefix('Bearer '))
+    token = jwt.encode({**payload, 'tipo_usuario': 'visitante'}, settings.SECRET_KEY, settings.ALGORITHM)
+
+    resposta = client.post('/relato-problemas/claim', headers={'Authorization': f'Bearer {token}'})
+
+    assert resposta.status_code == 401
@@ -0,0 +1,99 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import Engine, create_engine, inspect, select
+from sqlmodel import SQLModel
+
+from app.database.enums import TipoUsuario
+from app.database.esquema_inicial import administrador, computador, professor, tecnico, usuario
+from app.database.migracoes import ErroMigracao, migrar, versoes_aplicadas
+from app.database.models import MatriculaFuncionario
+
+
+@pytest.fixture(name='banco')
+def banco_fixture() -> Engine:
+    return create_engine('sqlite://')
+
+
+def test_banco_novo_migrado_tem_o_esquema_dos_modelos(banco: Engine):
+    with banco.begin() as conn:
+        migrar(conn)
+        inspetor = inspect(conn)
+        for tabela in SQLModel.metadata.sorted_tables:
+            colunas = {coluna['name'] for coluna in inspetor.get_columns(tabela.name)}
+            assert colunas == {coluna.name for coluna in tabela.columns}, tabela.name
+            indices = {indice['name'] for indice in inspetor.get_indexes(tabela.name)}
+            assert {indice.name for indice in tabela.indexes} <= indices, tabela.name
+
+
+def test_esquema_inicial_nao_acompanha_os_modelos(banco: Engine):
+    with banco.begin() as conn:
+        migrar(conn, ate=1)
+        inspetor = inspect(conn)
+        colunas = {coluna['name'] for coluna in inspetor.get_columns('relato_problema')}
+        assert 'reservado_por_id' not in colunas
+        assert not inspetor.has_table('matricula_funcionario')
+
+
+def test_duplicatas_impedem_o_indice_unico_com_mensagem_clara(banco: Engine):
+    with banco.begin() as conn:
+        migrar(conn, ate=1)
+        conn.execute(computador.insert(), [
+            {
+                'patrimonio': patrimonio, 'hostname': f'pc{i}', 'marca': 'Dell',
+                'ano_aquisicao': 2020, 'sistema_operacional': 'linux',
+                'data_ultima_alteracao': date(2024, 1, 1), 'dias_desde_alteracao': 0,
+            }
+            for i, patrimonio in enumerate(['123', '456', '123'])
+        ])
+
+    with pytest.raises(ErroMigracao, match=r"ix_computador_patrimonio.*'123' \(2 linhas\)"):
+        with banco.begin() as conn:
+            migrar(conn)
+
+    with banco.begin() as conn:
+        assert versoes_aplicadas(conn) == {1}
+        indices = {indice['name'] for indice in inspect(conn).get_indexes('computador')}
+        assert 'ix_computador_patrimonio' not in indices
+
+
+def cadastrar_funcionarios(banco: Engine, matriculas: dict[str, str]) -> None:
+    """Funcionários de um banco anterior ao registro de matrículas: `{matricula: tabela}`."""
+    tabelas = {'administrador': administrador, 'tecnico': tecnico, 'professor': professor}
+    with banco.begin() as conn:
+        migrar(conn, ate=6)
+        conn.execute(usuario.insert(), [{'id': 1, 'nome': 'Ana', 'email': 'ana@exemplo.com'}])
+        conn.execute(administrador.insert(), [{'id': 1, 'matricula': 'A0', 'usuario_id': 1}])
+        for i, (matricula, tabela) in enumerate(matriculas.items(), start=2):
+            campos = {'id': i, 'matricula': matricula, 'usuario_id': 1}
+            if tabela != 'administrador':
+                campos['administrador_id'] = 1
+            conn.execute(tabelas[tabela].insert(), [campos])
+
+
+def test_registro_de_matriculas_e_preenchido_na_migracao(banco: Engine):
+    cadastrar_funcionarios(banco, {'T1': 'tecnico', 'P1': 'professor'})
+
+    with banco.begin() as conn:
+        migrar(conn)
+        registro = conn.execute(
+            select(MatriculaFuncionario).order_by(MatriculaFuncionario.matricula)
+        ).all()
+
+    assert registro == [
+        ('A0', TipoUsuario.administrador, 1),
+        ('P1', TipoUsuario.professor, 3),
+        ('T1', TipoUsuario.tecnico, 2),
+    ]
+
+
+def test_matricula_repetida_entre_funcionarios_impede_o_registro(banco: Engine):
+    cadastrar_funcionarios(banco, {'A0': 'tecnico', 'P1': 'professor'})
+
+    with pytest.raises(ErroMigracao, match=r"matrículas repetidas.*'A0' \(administrador, tecnico\)"):
+        with banco.begin() as conn:
+            migrar(conn)
+
+    with banco.begin() as conn:
+        assert versoes_aplicadas(conn) == {1, 2, 3, 4, 5, 6}
+        assert not inspect(conn).has_table('matricula_funcionario')
@@ -0,0 +1,179 @@
+import asyncio
+from datetime import date
+
+import httpx
+from sqlmodel import Session, select
+from starlette.testclient import TestClient
+
+from app.database.enums import TipoUsuario
+from app.database.models import RelatoProblema
+from app.main import app
+
+
+def cadastrar_relatos(session: Session, computadores: list[int]) -> list[int]:
+    relatos = [
+        RelatoProblema(usuario_id=1, computador_id=computador_id, computador_patrimonio=None, auditada=False)
+        for computador_id in computadores
+    ]
+    session.add_all(relatos)
+    session.commit()
+    return [relato.id for relato in relatos]
+
+
+def auditoria(**campos) -> dict:
+    return {'aceita': True, 'auditada': True, 'data_auditada': date.today().isoformat(), **campos}
+
+
+def test_atualizar_relato_exige_tecnico(client: TestClient, dados: Session, autenticar):
+    [relato_id] = cadastrar_relatos(dados, [1])
+
+    assert client.put(f'/relato-problemas/{relato_id}', json=auditoria()).status_code == 401
+    resposta = client.put(
+        f'/relato-problemas/{relato_id}', json=auditoria(),
+        headers=autenticar(TipoUsuario.administrador, 1),
+    )
+    assert resposta.status_code == 401
+
+
+def test_reserva_confere_o_tecnico_do_token(client: TestClient, dados: Session, autenticar):
+    [relato_id] = cadastrar_relatos(dados, [1])
+    reserva = client.post('/relato-problemas/claim', headers=autenticar(TipoUsuario.tecnico, 1))
+    assert [relato['id'] for relato in reserva.json()['relatos']] == [relato_id]
+
+    # O corpo diz que é o técnico 1, mas o token é do técnico 2
+    resposta = client.put(
+        f'/relato-problemas/{relato_id}', json=auditoria(tecnico_id=1),
+        headers=autenticar(TipoUsuario.tecnico, 2),
+    )
+    assert resposta.status_code == 409
+    assert resposta.json()['detail'] == 'Relato reservado por outro técnico'
+
+
+def test_auditoria_usa_o_tecnico_do_token_e_encerra_a_reserva(
+    client: TestClient, dados: Session, autenticar,
+):
+    [relato_id] = cadastrar_relatos(dados, [1])
+    tecnico = autenticar(TipoUsuario.tecnico, 2)
+    client.post('/relato-problemas/claim', headers=tecnico)
+
+    resposta = client.put(f'/relato-problemas/{relato_id}', json=auditoria(tecnico_id=1), headers=tecnico)
+
+    assert resposta.status_code == 200, resposta.text
+    assert resposta.json()['tecnico']['id'] == 2
+    dados.expire_all()
+    relato = dados.get(RelatoProblema, relato_id)
+    assert (relato.auditada, relato.tecnico_id) == (True, 2)
+    assert (relato.reservado_por_id, relato.reservado_ate) == (None, None)
+
+
+def test_relato_auditado_nao_e_auditado_de_novo(client: TestClient, dados: Session, autenticar):
+    [relato_id] = cadastrar_relatos(dados, [1])
+    url = f'/relato-problemas/{relato_id}'
+    assert client.put(url, json=auditoria(), headers=autenticar(TipoUsuario.tecnico, 1)).status_code == 200
+
+    resposta = client.put(url, json=auditoria(aceita=False), headers=autenticar(TipoUsuario.tecnico, 2))
+
+    assert resposta.status_code == 409
+    assert resposta.json()['detail'] == 'Relato já auditado'
+    dados.expire_all()
+    relato = dados.get(RelatoProblema, relato_id)
+    assert (relato.aceita, relato.tecnico_id) == (True, 1)
+    resposta = client.put('/relato-problemas/999', json=auditoria(), headers=autenticar(TipoUsuario.tecnico, 1))
+    assert resposta.status_code == 404
+
+
+def test_tecnicos_reservam_e_auditam_ao_mesmo_tempo(client: TestClient, dados: Session, autenticar):
+    ids = cadastrar_relatos(dados, [1, 2, 1, 2, 1, 2])
+    tecnicos = {tecnico_id: autenticar(TipoUsuario.tecnico, tecnico_id) for tecnico_id in (1, 2)}
+
+    async def cenario() -> tuple[dict[int, list[int]], dict[tuple[int, int], int]]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://teste') as cliente:
+            async def reservar(tecnico_id: int) -> list[int]:
+                resposta = await cliente.post(
+                    '/relato-problemas/claim', params={'n': 3}, headers=tecnicos[tecnico_id],
+                )
+                assert resposta.status_code == 200, resposta.text
+                return [relato['id'] for relato in resposta.json()['relatos']]
+
+            reservas = dict(zip(tecnicos, await asyncio.gather(*map(reservar, tecnicos))))
+
+            # Cada técnico tenta auditar todos os relatos, os dois ao mesmo tempo
+            async def auditar(tecnico_id: int, relato_id: int) -> int:
+                resposta = await cliente.put(
+                    f'/relato-problemas/{relato_id}', json=auditoria(),
+                    headers=tecnicos[tecnico_id],
+                )
+                return resposta.status_code
+
+            pares = [(tecnico_id, relato_id) for relato_id in ids for tecnico_id in tecnicos]
+            codigos = await asyncio.gather(*(auditar(*par) for par in pares))
+            return reservas, dict(zip(pares, codigos))
+
+    reservas, codigos = asyncio.run(cenario())
+
+    assert sorted(reservas[1] + reservas[2]) == ids
+    for tecnico_id, reservados in reservas.items():
+        for relato_id in ids:
+            esperado = 200 if relato_id in reservados else 409
+            assert codigos[tecnico_id, relato_id] == esperado, (tecnico_id, relato_id)
+
+    auditores = dict(dados.exec(select(RelatoProblema.id, RelatoProblema.tecnico_id)).all())
+    assert {relato_id: auditores[relato_id] for relato_id in reservas[1]} == dict.fromkeys(reservas[1], 1)
+    assert {relato_id: auditores[relato_id] for relato_id in reservas[2]} == dict.fromkeys(reservas[2], 2)
+
+
+def test_auditoria_em_lote_exige_administrador(client: TestClient, dados: Session, autenticar):
+    [relato_id] = cadastrar_relatos(dados, [1])
+    lote = {'itens': [{'id': relato_id, 'aceita': True, 'tecnico_id': 1}]}
+
+    assert client.put('/relato-problemas/lote', json=lote).status_code == 401
+    resposta = client.put('/relato-problemas/lote', json=lote, headers=autenticar(TipoUsuario.tecnico, 1))
+    assert resposta.status_code == 401
+
+
+def test_auditoria_em_lote_por_itens(client: TestClient, dados: Session, autenticar):
+    livre, reservado, auditado = cadastrar_relatos(dados, [1, 1, 2])
+    client.post('/relato-problemas/claim', params={'n': 3}, headers=autenticar(TipoUsuario.tecnico, 2))
+    dados.get(RelatoProblema, livre).reservado_por_id = None
+    dados.get(RelatoProblema, auditado).auditada = True
+    dados.commit()
+
+    resposta = client.put('/relato-problemas/lote', headers=autenticar(TipoUsuario.administrador, 1), json={
+        'itens': [
+            {'id': livre, 'aceita': True, 'tecnico_id': 1},
+            {'id': reservado, 'aceita': True, 'tecnico_id': 1},
+            {'id': auditado, 'aceita': False, 'tecnico_id': 1},
+            {'id': 999, 'aceita': True, 'tecnico_id': 1},
+        ],
+    })
+
+    assert resposta.status_code == 200, resposta.text
+    corpo = resposta.json()
+    assert corpo['auditados'] == 1
+    assert corpo['itens'] == [
+        {'id': livre, 'resultado': 'auditado'},
+        {'id': reservado, 'resultado': 'reservado'},
+        {'id': auditado, 'resultado': 'ja_auditado'},
+        {'id': 999, 'resultado': 'nao_encontrado'},
+    ]
+    dados.expire_all()
+    relato = dados.get(RelatoProblema, livre)
+    assert (relato.auditada, relato.aceita, relato.tecnico_id) == (True, True, 1)
+
+
+def test_auditoria_em_lote_por_filtro(client: TestClient, dados: Session, autenticar):
+    ids = cadastrar_relatos(dados, [1, 2, 1])
+
+    resposta = client.put('/relato-problemas/lote', headers=autenticar(TipoUsuario.administrador, 1), json={
+        'filtro': {'laboratorio_id': 1}, 'aceita': False, 'tecnico_id': 2,
+        'data_auditada': '2024-05-01',
+    })
+
+    assert resposta.status_code == 200, resposta.text
+    corpo = resposta.json()
+    assert corpo['data_auditada'] == '2024-05-01'
+    # Computador 1 fica no laboratório 1; o relato do computador 2 continua aberto
+    assert corpo['itens'] == [{'id': ids[0], 'resultado': 'auditado'}, {'id': ids[2], 'resultado': 'auditado'}]
+    abertos = client.get('/relato-problemas/').json()
+    assert [relato['id'] for relato in abertos] == [ids[1]]
@@ -0,0 +1,104 @@
+from datetime import date
+
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from app.database.enums import StatusComputador, TipoUsuario
+from app.services.resumo import consulta_resumo, recalcular_resumos
+
+
+def recontagem(session: Session) -> dict[int, dict]:
+    """O resumo calculado direto das tabelas de origem, no formato da rota."""
+    session.expire_all()
+    return {
+        linha.laboratorio_id: {
+            'total_computadores': linha.total_computadores,
+            'computadores_por_status': {status.value: getattr(linha, status.name) for status in StatusComputador},
+            'relatos_abertos': linha.relatos_abertos,
+        }
+        for linha in session.exec(consulta_resumo())
+    }
+
+
+def resumo(client: TestClient) -> dict[int, dict]:
+    resposta = client.get('/laboratorios/resumo')
+    assert resposta.status_code == 200, resposta.text
+    return {
+        item['laboratorio_id']: {
+            chave: item[chave] for chave in ('total_computadores', 'computadores_por_status', 'relatos_abertos')
+        }
+        for item in resposta.json()
+    }
+
+
+def abrir_relato(client: TestClient, computador_id: int) -> int:
+    resposta = client.post('/relato-problemas/', json={
+        'descricao': 'Não liga', 'computador_id': computador_id,
+        'computador_patrimonio': None, 'usuario_id': 1, 'tecnico_id': None,
+    })
+    assert resposta.status_code == 200, resposta.text
+    return resposta.json()['id']
+
+
+def test_resumo_acompanha_as_escritas(client: TestClient, dados: Session, autenticar):
+    # Como `init_db`, que recalcula o resumo depois de popular o banco
+    recalcular_resumos(dados.connection())
+    dados.commit()
+    assert resumo(client) == recontagem(dados)
+
+    # Laboratório novo: ainda sem linha no resumo, aparece zerado
+    laboratorio = client.post('/laboratorios/', json={
+        'nome': 'Lab Novo', 'local': 'Bloco B', 'administrador_id': 1,
+    })
+    assert laboratorio.status_code == 200, laboratorio.text
+    assert resumo(client) == recontagem(dados)
+
+    # Primeiro computador do laboratório novo cria a linha
+    computador = client.post('/computadores/', json={
+        'patrimonio': 'RES1', 'hostname': 'res1', 'marca': 'Dell', 'ano_aquisicao': 2024,
+        'sistema_operacional': 'linux', 'data_ultima_alteracao': date.today().isoformat(),
+        'status_nome': 'disponivel', 'status_descricao': 'Disponível',
+        'laboratorio_nome': 'Lab Novo', 'laboratorio_local': 'Bloco B', 'tecnico_id': 1,
+    })
+    assert computador.status_code == 200, computador.text
+    computador_id = computador.json()['id']
+    assert resumo(client) == recontagem(dados)
+
+    resposta = client.put(f'/computadores/{computador_id}', params={
+        'status_nome': 'em_manutencao', 'status_descricao': 'Em Manutenção',
+    })
+    assert resposta.status_code == 200, resposta.text
+    assert resumo(client) == recontagem(dados)
+
+    relato_id = abrir_relato(client, computador_id)
+    assert resumo(client) == recontagem(dados)
+
+    resposta = client.put(f'/relato-problemas/{relato_id}', headers=autenticar(TipoUsuario.tecnico, 1), json={
+        'aceita': True, 'auditada': True, 'data_auditada': date.today().isoformat(),
+    })
+    assert resposta.status_code == 200, resposta.text
+    assert resumo(client) == recontagem(dados)
+
+    resposta = client.post('/computadores/bulk', headers={'Content-Type': 'text/csv'}, content=(
+        'patrimonio,hostname,marca,ano_aquisicao,sistema_operacional,data_ultima_alteracao,'
+        'status_nome,status_descricao,laboratorio_nome,laboratorio_local,tecnico_id\n'
+        'RES2,res2,Dell,2020,linux,2024-01-10,Disponível,Disponível,Lab Novo,Bloco B,1\n'
+        'RES3,res3,Dell,2020,linux,2024-01-10,Em manutenção,Em Manutenção,Lab de Hardware,CCET,1\n'
+        'RES4,res4,Dell,2020,linux,2024-01-10,Disponível,Disponível,Lab de Extensão 2,STI,1\n'
+    ).encode())
+    assert resposta.status_code == 200, resposta.text
+    assert resposta.json()['inseridos'] == 3
+    assert resumo(client) == recontagem(dados)
+
+    for computador_id in (1, 2, 2):
+        abrir_relato(client, computador_id)
+    assert resumo(client) == recontagem(dados)
+
+    resposta = client.put('/relato-problemas/lote', headers=autenticar(TipoUsuario.administrador, 1), json={
+        'filtro': {'laboratorio_id': 2}, 'aceita': True, 'tecnico_id': 1,
+    })
+    assert resposta.status_code == 200, resposta.text
+    assert resposta.json()['auditados'] == 2
+    contagem = recontagem(dados)
+    assert resumo(client) == contagem
+    assert [contagem[laboratorio_id]['relatos_abertos'] for laboratorio_id in (1, 2)] == [1, 0]
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from app.services import senhas
+from app.services.senhas import ServicoSenhas
+
+
+def test_falha_nao_conta_como_concluida():
+    servico = ServicoSenhas(processos=0, fila_maxima=4)
+
+    async def cenario() -> None:
+        assert await servico.verificar('segredo', await servico.hash('segredo'))
+        with pytest.raises(ValueError):
+            await servico.verificar('segredo', 'não é um hash')
+
+    asyncio.run(cenario())
+    estatisticas = servico.estatisticas()
+    assert estatisticas['concluidas'] == 2
+    assert estatisticas['falhas'] == 1
+    assert estatisticas['em_andamento'] == 0
+
+
+class ContextoFalso:
+    def hash(self, senha: str) -> str:
+        return 'herdado do processo pai'
+
+
+def test_pool_de_processos_usa_spawn(monkeypatch: pytest.MonkeyPatch):
+    # Um processo criado com fork herdaria esta troca; com spawn o módulo é importado de novo
+    monkeypatch.setattr(senhas, 'contexto_senhas', ContextoFalso)
+    servico = ServicoSenhas(processos=1, fila_maxima=4)
+    assert servico.metodo_inicio == 'spawn'
+    try:
+        senha_hash = asyncio.run(servico.hash('segredo'))
+    finally:
+        servico.encerrar()
+    monkeypatch.undo()
+    assert asyncio.run(ServicoSenhas(processos=0, fila_maxima=1).verificar('segredo', senha_hash))
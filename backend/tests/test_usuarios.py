@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import func
+from sqlmodel import Session, select
+from starlette.testclient import TestClient
+
+from app.database.enums import TipoUsuario
+from app.database.models import Usuario
+from app.services import usuarios
+
+
+def novo_tecnico(**campos) -> dict:
+    return {
+        'nome': 'Dandara', 'email': 'dandara@exemplo.com',
+        'matricula': '9090', 'administrador_id': 1, **campos,
+    }
+
+
+def contar_usuarios(session: Session) -> int:
+    return session.exec(select(func.count()).select_from(Usuario)).one()
+
+
+def test_matricula_registrada_durante_o_cadastro_retorna_409(
+    client: TestClient, dados: Session, monkeypatch: pytest.MonkeyPatch,
+):
+    async def sem_verificacao(*_args) -> None:
+        pass
+
+    # Simula a corrida: a verificação prévia não vê a matrícula que já está no banco
+    monkeypatch.setattr(usuarios, 'check_existing_matricula', sem_verificacao)
+    antes = contar_usuarios(dados)
+
+    resposta = client.post('/usuarios/tecnicos/', json=novo_tecnico(matricula='2021'))
+
+    assert resposta.status_code == 409
+    assert resposta.json()['detail'] == 'Matrícula já cadastrada.'
+    assert contar_usuarios(dados) == antes
+
+
+def test_administrador_inexistente_retorna_404(client: TestClient, dados: Session, chaves_estrangeiras):
+    antes = contar_usuarios(dados)
+
+    resposta = client.post('/usuarios/tecnicos/', json=novo_tecnico(administrador_id=99))
+
+    assert resposta.status_code == 404
+    assert resposta.json()['detail'] == 'Administrador não encontrado.'
+    assert contar_usuarios(dados) == antes
+
+
+def chaves(valor) -> set[str]:
+    """Todas as chaves dos objetos JSON aninhados em `valor`."""
+    if isinstance(valor, dict):
+        return set(valor).union(*map(chaves, valor.values()))
+    if isinstance(valor, list):
+        return set().union(*map(chaves, valor))
+    return set()
+
+
+def test_respostas_de_usuarios_nao_expoem_senha_hash(
+    client: TestClient, dados: Session, autenticar,
+):
+    respostas = [
+        client.get('/usuarios/'),
+        client.post('/usuarios/', json={'nome': 'Zumbi', 'email': 'zumbi@exemplo.com', 'senha': 'x'}),
+        client.get('/usuarios/tecnicos'),
+        client.get('/usuarios/administradores'),
+        client.get('/usuarios/professores'),
+        client.post('/usuarios/tecnicos/', json=novo_tecnico()),
+        client.post('/usuarios/administradores/', json={
+            'nome': 'Luiz', 'email': 'luiz@exemplo.com', 'matricula': '9191',
+        }),
+        client.post('/usuarios/professores/', json={
+            'nome': 'Carolina', 'email': 'carolina@exemplo.com', 'matricula': '9292',
+            'administrador_id': 1,
+        }),
+        client.post('/usuarios/alunos/', json={
+            'nome': 'Maria', 'email': 'maria@exemplo.com', 'matricula': '9393', 'senha': 'x',
+        }),
+    ]
+    respostas += [
+        client.get(f'/usuarios/funcionarios/{matricula}') for matricula in ('2021', '4444', '8964')
+    ]
+    respostas += [
+        client.get('/usuarios/perfil', headers=autenticar(tipo_usuario, 1))
+        for tipo_usuario in TipoUsuario
+    ]
+
+    for resposta in respostas:
+        assert resposta.status_code == 200, (resposta.request.url, resposta.text)
+        corpo = resposta.json()
+        assert 'senha_hash' not in chaves(corpo), resposta.request.url
+        if isinstance(corpo, dict) and 'usuario' in corpo:
+            assert set(corpo['usuario']) == {'id', 'nome', 'email'}
@@ -0,0 +1,34 @@
+from sqlmodel import Session, select
+from starlette.testclient import TestClient
+
+from app.database.models import VersaoColecao
+
+EM_MANUTENCAO = {'status_nome': 'em_manutencao', 'status_descricao': 'Em Manutenção'}
+
+
+def test_sem_escrita_o_etag_continua_valido(client: TestClient, dados: Session):
+    etag = client.get('/computadores/').headers['etag']
+
+    resposta = client.get('/computadores/', headers={'If-None-Match': etag})
+
+    assert resposta.status_code == 304
+    assert resposta.headers['etag'] == etag
+
+
+def test_escrita_cria_o_contador_e_invalida_o_etag(client: TestClient, dados: Session):
+    # O banco dos testes vem do `create_all`: não há linhas em `versao_colecao`
+    assert dados.exec(select(VersaoColecao)).all() == []
+    etag = client.get('/computadores/').headers['etag']
+
+    assert client.put('/computadores/1', params=EM_MANUTENCAO).status_code == 200
+    resposta = client.get('/computadores/', headers={'If-None-Match': etag})
+
+    assert resposta.status_code == 200
+    assert resposta.headers['etag'] != etag
+    assert client.get(
+        '/computadores/', headers={'If-None-Match': resposta.headers['etag']},
+    ).status_code == 304
+
+    assert client.put('/computadores/1', params=EM_MANUTENCAO).status_code == 200
+    versao = dados.exec(select(VersaoColecao.versao).where(VersaoColecao.nome == 'computadores')).one()
+    assert versao == 2
@@ -28,14 +28,15 @@ class _ListarComputadoresPageState extends State<ListarComputadoresPage> {
 
   Future<void> fetchComputadores() async {
     final api = getApi(context);
-    final response = await api.get('/computadores/');
+    // A API pagina as listagens; os filtros da tela precisam de todos os computadores
+    final (response, todos) = await api.getTodasPaginas('/computadores/');
 
     if (!is2xx(response.statusCode)) {
       await treatResponse(context, response);
       return;
     }
     setState(() {
-      computadores = decodeResponse(response);
+      computadores = todos;
     });
   }
 
@@ -245,6 +245,28 @@ class ApiService with ChangeNotifier {
     return _sendRequest(() => http.get(uri, headers: _headers()), uri);
   }
 
+  /// Busca todas as páginas de uma listagem da API, seguindo o header
+  /// `X-Proximo-Cursor` até a última página.
+  /// Retorna a última resposta recebida (para tratar erros) e os itens lidos.
+  Future<(http.Response, List<dynamic>)> getTodasPaginas(
+    String path, {
+    Map<String, dynamic>? queryParams,
+    int limite = 500,
+  }) async {
+    final itens = <dynamic>[];
+    final params = {...?queryParams, 'limit': '$limite'};
+    while (true) {
+      final response = await get(path, queryParams: params);
+      if (response.statusCode < 200 || response.statusCode >= 300) {
+        return (response, itens);
+      }
+      itens.addAll(decodeResponse(response));
+      final cursor = response.headers['x-proximo-cursor'];
+      if (cursor == null || cursor.isEmpty) return (response, itens);
+      params['cursor'] = cursor;
+    }
+  }
+
   Future<http.Response> post(
     String path,
     dynamic body, {